@@ -0,0 +1,52 @@
+import json
+import os
+import statistics
+import sys
+import time
+from src.binance_announcements import fetch_announcements, parse_announcement_page, parse_announcement_payload
+from src.browser_pool import BrowserPool
+from src.market_data import build_http_client
+from src.news_scanner import NewsScanner
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'data')
+
+def timed(fn, runs):
+    samples = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            result = e
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples, result
+
+def report(name, samples, result):
+    n = len(result) if isinstance(result, list) else 0
+    err = f"  error: {result}" if isinstance(result, Exception) else ""
+    print(f"{name:<28} median {statistics.median(samples):>9.1f} ms   max {max(samples):>9.1f} ms   items {n}{err}")
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with open(os.path.join(DATA, 'binance_announcements_sample.json'), 'r', encoding='utf-8') as f:
+        payload = json.load(f)
+    with open(os.path.join(DATA, 'binance_announcement_page_sample.html'), 'r', encoding='utf-8') as f:
+        html = f.read()
+    report("parse JSON fixture", *timed(lambda: parse_announcement_payload(payload, 50), 200))
+    report("parse __APP_DATA fixture", *timed(lambda: parse_announcement_page(html, 50), 200))
+
+    http = build_http_client(timeout=10)
+    report("HTTP JSON (live)", *timed(lambda: fetch_announcements(http, 50), runs))
+    http.close()
+
+    scanner = NewsScanner(browser=BrowserPool(max_pages=1))
+    try:
+        # the first browser call includes the Chromium launch; later ones reuse the pooled browser
+        report("Playwright cold (live)", *timed(lambda: scanner._fetch_binance_announcements_browser(50), 1))
+        report("Playwright pooled (live)", *timed(lambda: scanner._fetch_binance_announcements_browser(50), runs))
+    finally:
+        scanner.close()
+
+if __name__ == "__main__":
+    main()
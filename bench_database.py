@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from src.config import Config
+from src.database import Database
+
+def legacy_claim(path, link, source):
+    # the previous connect / execute / commit / close pattern
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute("INSERT OR IGNORE INTO processed_news (link, source) VALUES (?, ?)", (link, source))
+    conn.commit()
+    ok = cursor.rowcount == 1
+    conn.close()
+    return ok
+
+def run(name, claim, threads, per_thread):
+    def worker(n):
+        for i in range(per_thread):
+            claim(f"https://example.com/{name}/{n}/{i}", "bench")
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+    total = threads * per_thread
+    print(f"{name:<22} {total} claims in {elapsed * 1000:8.1f} ms   {total / elapsed:9.0f}/s")
+
+def burst(db, n, batched):
+    # one check_news round: claim, queue and approve n articles
+    links = [(f"https://example.com/burst/{batched}/{i}", "bench") for i in range(n)]
+    texts = [f"burst {batched} {i}" for i in range(n)]
+    start = time.perf_counter()
+    if batched:
+        claimed = db.claim_news_batch(links)
+        db.enqueue_posts(texts[:len(claimed)], approved=True)
+    else:
+        for (link, source), text in zip(links, texts):
+            if db.claim_news_if_new(link, source):
+                post_id = db.add_square_post(text)
+                db.mark_square_post_approved(post_id)
+    elapsed = time.perf_counter() - start
+    print(f"{'batched' if batched else 'per article':<22} {n}-article burst in {elapsed * 1000:8.1f} ms")
+
+def main():
+    per_thread = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    with tempfile.TemporaryDirectory() as d:
+        legacy_path = os.path.join(d, 'legacy.db')
+        Config.DB_PATH = legacy_path
+        db = Database()
+        db.close()
+        # the legacy run gets a rollback-journal file, as before this change
+        conn = sqlite3.connect(legacy_path)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+        run("connect per call", lambda link, src: legacy_claim(legacy_path, link, src), 4, per_thread)
+
+        Config.DB_PATH = os.path.join(d, 'pooled.db')
+        db = Database()
+        run("pooled WAL", db.claim_news_if_new, 4, per_thread)
+        burst(db, 50, False)
+        burst(db, 50, True)
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import random
+import re
+import sys
+import time
+from src.event_matcher import EventMatcher
+from src.news_scanner import NewsScanner
+
+def naive_detect(rules, text):
+    # the per-pattern re.search loop EventMatcher replaced
+    hits = []
+    for i, rule in enumerate(rules):
+        for pat in rule['patterns']:
+            if re.search(pat, text, flags=re.IGNORECASE):
+                hits.append(i)
+                break
+    return hits
+
+def synthetic_rules(base, n_patterns, seed=7):
+    rng = random.Random(seed)
+    rules = [dict(r, patterns=list(r['patterns'])) for r in base]
+    words = ['airdrop', 'staking', 'mainnet', 'bridge', 'burn', 'buyback', 'governance', 'testnet', 'upgrade', 'fork', '空投', '质押', '主网', '回购', '销毁', '升级']
+    i = 0
+    while sum(len(r['patterns']) for r in rules) < n_patterns:
+        w = rng.choice(words)
+        pats = [rf'\b{w}{i}\b', rf'{w}\s+v{i}', f'{w}{i}号']
+        rules.append({'kind': rng.choice(['bullish', 'bearish']), 'label': f'{w}{i}', 'weight': rng.randint(5, 40), 'patterns': pats})
+        i += 1
+    return rules
+
+def sample_articles(n=400, seed=11):
+    rng = random.Random(seed)
+    pieces = [
+        'Binance will list XYZ in the Innovation Zone', '币安将上线 ABC 现货交易', 'Protocol hacked, $20M exploit under investigation',
+        'Token unlock of 5% supply next week', 'SEC approval for spot ETF', '某项目宣布与交易所合作', 'Market recap: BTC holds 60k',
+        'Weekly AMA with the core team', '大额解锁带来抛压', 'Mainnet upgrade scheduled', 'Nothing to see here, just a long update about the roadmap and community'
+    ]
+    return [" ".join(rng.choice(pieces) for _ in range(rng.randint(2, 8))) for _ in range(n)]
+
+def bench(n_patterns, articles, base):
+    rules = synthetic_rules(base, n_patterns)
+    matcher = EventMatcher(rules)
+    for text in articles:
+        assert matcher.matched_rules(text) == naive_detect(rules, text)
+    re.purge()
+    start = time.perf_counter()
+    for text in articles:
+        naive_detect(rules, text)
+    naive = (time.perf_counter() - start) / len(articles)
+    start = time.perf_counter()
+    for text in articles:
+        matcher.matched_rules(text)
+    compiled = (time.perf_counter() - start) / len(articles)
+    return matcher.pattern_count, naive, compiled
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [0, 50, 100, 200, 400, 800]
+    scanner = NewsScanner()
+    base_rules = scanner.event_rules
+    scanner.close()
+    articles = sample_articles()
+    print(f"{'patterns':>9} {'re.search loop':>16} {'EventMatcher':>14} {'speedup':>8}")
+    for n in sizes:
+        count, naive, compiled = bench(n, articles, base_rules)
+        print(f"{count:>9} {naive * 1e6:>13.1f} us {compiled * 1e6:>11.1f} us {naive / compiled:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
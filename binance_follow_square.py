@@ -13,6 +13,7 @@ except Exception:
     class Config:
         LOG_LEVEL = "INFO"
         LOG_MAX_LEN = 1000
+from src.square_queue import DEFAULT_LEASE_SECONDS, claim_posts, ensure_claim_schema
 
 URL = "https://www.binance.com/zh-CN/square"
 PROFILE_URL = "https://www.binance.com/zh-CN/square/profile/square-creator-3c1df46e1b0ed"
@@ -77,6 +78,7 @@ def ensure_square_queue_schema():
             cur.execute("ALTER TABLE square_queue ADD COLUMN next_try_at TIMESTAMP")
         if 'bot_approved' not in cols:
             cur.execute("ALTER TABLE square_queue ADD COLUMN bot_approved INTEGER DEFAULT 0")
+        ensure_claim_schema(cur)
         conn.commit()
     finally:
         conn.close()
@@ -282,24 +284,8 @@ def fetch_pending(limit=5):
 
 def claim_pending(limit=5):
     conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    claimed = []
     try:
-        cur.execute("""
-            SELECT id, text, attempts FROM square_queue
-            WHERE status = 'pending'
-              AND (next_try_at IS NULL OR next_try_at <= CURRENT_TIMESTAMP)
-              AND bot_approved = 1
-            ORDER BY created_at ASC
-            LIMIT ?
-        """, (limit,))
-        rows = cur.fetchall()
-        for pid, text, attempts in rows:
-            cur.execute("UPDATE square_queue SET status = 'processing' WHERE id = ? AND status = 'pending'", (pid,))
-            if cur.rowcount and cur.rowcount > 0:
-                claimed.append((pid, text, attempts))
-        conn.commit()
-        return claimed
+        return claim_posts(conn, limit=limit, lease_seconds=getattr(Config, "SQUARE_LEASE_SECONDS", DEFAULT_LEASE_SECONDS))
     finally:
         conn.close()
 
@@ -307,7 +293,7 @@ def mark_sent(post_id):
     conn = sqlite3.connect(DB_PATH)
     cur = conn.cursor()
     try:
-        cur.execute("UPDATE square_queue SET status = 'sent', sent_at = CURRENT_TIMESTAMP, next_try_at = NULL WHERE id = ?", (post_id,))
+        cur.execute("UPDATE square_queue SET status = 'sent', sent_at = CURRENT_TIMESTAMP, next_try_at = NULL, lease_until = NULL WHERE id = ?", (post_id,))
         conn.commit()
     finally:
         conn.close()
@@ -326,9 +312,9 @@ def reset_pending(post_id, delay_seconds=None):
     cur = conn.cursor()
     try:
         if delay_seconds and delay_seconds > 0:
-            cur.execute("UPDATE square_queue SET status = 'pending', next_try_at = datetime('now', ?) WHERE id = ?", (f'+{int(delay_seconds)} seconds', post_id))
+            cur.execute("UPDATE square_queue SET status = 'pending', next_try_at = datetime('now', ?), lease_until = NULL WHERE id = ?", (f'+{int(delay_seconds)} seconds', post_id))
         else:
-            cur.execute("UPDATE square_queue SET status = 'pending', next_try_at = NULL WHERE id = ?", (post_id,))
+            cur.execute("UPDATE square_queue SET status = 'pending', next_try_at = NULL, lease_until = NULL WHERE id = ?", (post_id,))
         conn.commit()
     finally:
         conn.close()
@@ -337,7 +323,7 @@ def mark_failed(post_id):
     conn = sqlite3.connect(DB_PATH)
     cur = conn.cursor()
     try:
-        cur.execute("UPDATE square_queue SET status = 'failed' WHERE id = ?", (post_id,))
+        cur.execute("UPDATE square_queue SET status = 'failed', lease_until = NULL WHERE id = ?", (post_id,))
         conn.commit()
     finally:
         conn.close()
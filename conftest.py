@@ -0,0 +1,11 @@
+import pytest
+from src.config import Config
+from src.database import Database
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'DB_PATH', str(tmp_path / 'bot.db'))
+    database = Database()
+    yield database
+    database.close()
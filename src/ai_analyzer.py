@@ -1,16 +1,141 @@
-import requests
+import hashlib
 import json
 import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import requests
 from .config import Config
 
 logger = logging.getLogger(__name__)
 
+ANALYSIS_TYPES = ('Listing', 'Delisting', 'General', 'Partnership', 'Tech', 'Regulation')
+ITEMS_MARKER = "新闻列表(JSON):"
+MAX_CONTENT_CHARS = 1500
+MAX_CACHE_ENTRIES = 5000
+
+_TAGS = re.compile(r'<[^>]+>')
+_SPACES = re.compile(r'\s+')
+
+def _default_analysis(content):
+    return {
+        'impact': 'Unknown',
+        'type': 'General',
+        'summary': (content or '')[:100] + '...',
+        'coins': [],
+        'score': 0
+    }
+
+def content_key(title, content):
+    """
+    Cache key for one article: sha256 of title + content with markup, case and whitespace
+    normalised, so the same story syndicated by several feeds hashes the same.
+    """
+    text = _TAGS.sub(' ', f"{title}\n{content}")
+    text = _SPACES.sub(' ', text).strip().casefold()
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def _strip_fences(content_str):
+    content_str = content_str.strip()
+    # Remove markdown code block markers if present
+    if content_str.startswith("```"):
+        content_str = content_str.split('\n', 1)[1] if '\n' in content_str else content_str[3:]
+    if content_str.endswith("```"):
+        content_str = content_str[:-3]
+    return content_str.strip()
+
+def _normalise(item, content):
+    impact = item.get('impact')
+    if impact not in ('High', 'Medium', 'Low'):
+        return None
+    out = _default_analysis(content)
+    out['impact'] = impact
+    if item.get('type') in ANALYSIS_TYPES:
+        out['type'] = item['type']
+    if isinstance(item.get('summary'), str) and item['summary'].strip():
+        out['summary'] = item['summary'].strip()
+    coins = item.get('coins')
+    if isinstance(coins, list):
+        out['coins'] = [str(c).upper() for c in coins if c]
+    try:
+        out['score'] = max(0, min(100, int(float(item.get('score', 0)))))
+    except (TypeError, ValueError):
+        out['score'] = 0
+    return out
+
 class AIAnalyzer:
-    def __init__(self):
-        self.api_key = Config.AI_API_KEY
-        self.base_url = Config.AI_BASE_URL.rstrip('/')
-        self.model = Config.AI_MODEL
-        self.enabled = Config.AI_ANALYSIS_ENABLED
+    """
+    LLM news classification over an OpenAI-compatible /chat/completions endpoint.
+
+    analyze_news_batch() packs up to batch_size articles into one prompt and asks for a
+    JSON array back, one object per article id. Chunks go out concurrently on a shared
+    pool of `concurrency` workers over one keep-alive requests.Session. Results are cached
+    by content_key() for cache_ttl seconds, so a headline already seen (on another feed or
+    in an earlier round) is not sent again. Articles the model left out, or whose chunk
+    failed, get the default 'Unknown' analysis and are not cached.
+    """
+
+    def __init__(self, api_key=None, base_url=None, model=None, enabled=None,
+                 batch_size=None, concurrency=None, cache_ttl=None, timeout=None):
+        self.api_key = Config.AI_API_KEY if api_key is None else api_key
+        self.base_url = (base_url or Config.AI_BASE_URL).rstrip('/')
+        self.model = model or Config.AI_MODEL
+        self.enabled = Config.AI_ANALYSIS_ENABLED if enabled is None else enabled
+        self.batch_size = max(1, batch_size or Config.AI_BATCH_SIZE)
+        self.concurrency = max(1, concurrency or Config.AI_CONCURRENCY)
+        self.cache_ttl = Config.AI_CACHE_TTL if cache_ttl is None else cache_ttl
+        self.timeout = timeout or Config.AI_REQUEST_TIMEOUT
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="ai")
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.requests_sent = 0
+        self.cache_hits = 0
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+
+    def _chat(self, messages, temperature, timeout):
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        data = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature
+        }
+        self.requests_sent += 1
+        response = self.session.post(f"{self.base_url}/chat/completions", headers=headers, json=data, timeout=timeout)
+        response.raise_for_status()
+        result = response.json()
+        return result['choices'][0]['message']['content'].strip()
+
+    def _cache_get(self, key, now):
+        with self._cache_lock:
+            hit = self._cache.get(key)
+            if hit is None:
+                return None
+            if hit[0] < now:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return dict(hit[1])
+
+    def _cache_put(self, key, analysis, now):
+        if self.cache_ttl <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = (now + self.cache_ttl, dict(analysis))
+            self._cache.move_to_end(key)
+            while len(self._cache) > MAX_CACHE_ENTRIES:
+                self._cache.popitem(last=False)
 
     def analyze_news(self, title, content):
         """
@@ -22,25 +147,64 @@ class AIAnalyzer:
         - coins: List of related coins (e.g., ['BTC', 'ETH'])
         - score: 0-100 impact score
         """
+        return self.analyze_news_batch([{'title': title, 'summary': content}])[0]
+
+    def analyze_news_batch(self, articles):
+        """
+        analyze_news for many articles ({'title', 'summary'} dicts) at once. Returns one
+        analysis dict per article, in input order.
+        """
+        articles = list(articles)
         if not self.enabled or not self.api_key:
-            return {
-                'impact': 'Unknown',
-                'type': 'General',
-                'summary': content[:100] + '...',
-                'coins': [],
-                'score': 0
-            }
+            return [_default_analysis(a.get('summary', '')) for a in articles]
+
+        now = time.time()
+        keys = [content_key(a.get('title', ''), a.get('summary', '')) for a in articles]
+        results = {}
+        pending = {}
+        for key, article in zip(keys, articles):
+            if key in results or key in pending:
+                continue
+            cached = self._cache_get(key, now)
+            if cached is not None:
+                self.cache_hits += 1
+                results[key] = cached
+            else:
+                pending[key] = article
 
+        if pending:
+            items = list(pending.items())
+            chunks = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+            futures = [self._pool.submit(self._analyze_chunk, chunk) for chunk in chunks]
+            for fut in futures:
+                try:
+                    results.update(fut.result())
+                except Exception as e:
+                    logger.error(f"AI batch analysis failed: {e}")
+            done = time.time()
+            for key in pending:
+                if key in results:
+                    self._cache_put(key, results[key], done)
+
+        out = []
+        for key, article in zip(keys, articles):
+            analysis = results.get(key)
+            out.append(dict(analysis) if analysis is not None else _default_analysis(article.get('summary', '')))
+        return out
+
+    def _analyze_chunk(self, chunk):
+        payload = [
+            {'id': i, 'title': a.get('title', ''), 'content': (a.get('summary', '') or '')[:MAX_CONTENT_CHARS]}
+            for i, (_, a) in enumerate(chunk)
+        ]
         prompt = f"""
-        你是一个专业的加密货币市场分析师。请分析以下新闻，并以JSON格式返回结果。
-        
-        新闻标题: {title}
-        新闻内容: {content}
+        你是一个专业的加密货币市场分析师。请逐条分析下面列表中的新闻，并以JSON数组格式返回结果。
         
-        请评估该新闻对市场的影响程度，并提取关键信息。
+        请评估每条新闻对市场的影响程度，并提取关键信息。
         
-        JSON格式要求:
+        数组中每条新闻对应一个对象，格式要求:
         {{
+            "id": 新闻的id（原样返回）,
             "impact": "High" | "Medium" | "Low",  // 只有极具影响力的消息（如主要交易所上币/下币、重大监管政策、知名项目重大更新）才算High
             "type": "Listing" | "Delisting" | "General" | "Partnership" | "Tech" | "Regulation",
             "summary": "简短的中文摘要（50字以内）",
@@ -48,48 +212,40 @@ class AIAnalyzer:
             "score": 0-100 // 0为无影响，100为极度重要
         }}
         
-        只返回JSON，不要有其他废话。
+        只返回JSON数组，不要有其他废话。
+        
+        {ITEMS_MARKER}
+        {json.dumps(payload, ensure_ascii=False)}
         """
-
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            data = {
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": "You are a helpful assistant that outputs JSON only."},
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.3
-            }
-            
-            response = requests.post(f"{self.base_url}/chat/completions", headers=headers, json=data, timeout=10)
-            response.raise_for_status()
-            
-            result = response.json()
-            content_str = result['choices'][0]['message']['content'].strip()
-            
-            # Remove markdown code block markers if present
-            if content_str.startswith("```json"):
-                content_str = content_str[7:]
-            if content_str.endswith("```"):
-                content_str = content_str[:-3]
-            
-            analysis = json.loads(content_str)
-            return analysis
-            
-        except Exception as e:
-            logger.error(f"AI analysis failed: {e}")
-            return {
-                'impact': 'Unknown',
-                'type': 'General',
-                'summary': content[:100] + '...',
-                'coins': [],
-                'score': 0
-            }
+        content_str = self._chat(
+            [
+                {"role": "system", "content": "You are a helpful assistant that outputs JSON only."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            timeout=self.timeout
+        )
+        parsed = json.loads(_strip_fences(content_str))
+        if isinstance(parsed, dict):
+            # some models wrap the array ({"results": [...]}) or answer a single item bare
+            parsed = next((v for v in parsed.values() if isinstance(v, list)), [parsed])
+        out = {}
+        for item in parsed:
+            if not isinstance(item, dict):
+                continue
+            try:
+                idx = int(item.get('id', 0 if len(chunk) == 1 else -1))
+            except (TypeError, ValueError):
+                continue
+            if not 0 <= idx < len(chunk):
+                continue
+            key, article = chunk[idx]
+            analysis = _normalise(item, article.get('summary', ''))
+            if analysis is not None:
+                out[key] = analysis
+        if len(out) < len(chunk):
+            logger.warning(f"AI batch returned {len(out)}/{len(chunk)} usable analyses")
+        return out
 
     def generate_post(self, topic, length=200):
         """
@@ -110,26 +266,14 @@ class AIAnalyzer:
         """
 
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            data = {
-                "model": self.model,
-                "messages": [
+            return self._chat(
+                [
                     {"role": "system", "content": "You are a helpful crypto social media assistant."},
                     {"role": "user", "content": prompt}
                 ],
-                "temperature": 0.7
-            }
-            
-            response = requests.post(f"{self.base_url}/chat/completions", headers=headers, json=data, timeout=15)
-            response.raise_for_status()
-            
-            result = response.json()
-            content = result['choices'][0]['message']['content'].strip()
-            return content
+                temperature=0.7,
+                timeout=15
+            )
             
         except Exception as e:
             logger.error(f"AI post generation failed: {e}")
@@ -0,0 +1,199 @@
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r'[A-Za-z0-9]{2,12}')
+
+class ArticleIndex:
+    """
+    In-process store of recently ingested articles with a symbol -> posting list index.
+
+    Every ingestion path (RSS, nitter, page scrapers) adds articles here, keyed by link.
+    Each article is posted under the tickers SymbolIndex extracts from it plus any listed
+    ticker written in lower/mixed case, matching the old case-insensitive whole-word
+    search. Queries walk one posting list newest-first. Articles older than the retention
+    window, or beyond max_articles, are dropped together with their postings. With
+    fts_path set, articles are also written to an SQLite FTS5 table for older history.
+    """
+
+    def __init__(self, symbol_index, max_articles=None, retention_hours=None, fts_path=None):
+        self.symbol_index = symbol_index
+        self.max_articles = max_articles or Config.ARTICLE_INDEX_MAX_ARTICLES
+        self.retention = (retention_hours or Config.ARTICLE_INDEX_RETENTION_HOURS) * 3600.0
+        self._articles = OrderedDict()
+        self._postings = {}
+        self._lock = threading.Lock()
+        self._fts = None
+        self._fts_lock = threading.Lock()
+        if fts_path:
+            self._open_fts(fts_path)
+
+    def __len__(self):
+        return len(self._articles)
+
+    def _open_fts(self, path):
+        try:
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS article_fts USING fts5(
+                    link UNINDEXED, source, author, title, summary, symbols, published UNINDEXED, ingested_at UNINDEXED
+                )
+            ''')
+            # FTS5 tables cannot be unique on link; this keeps re-ingestion after a restart from duplicating rows
+            conn.execute('CREATE TABLE IF NOT EXISTS article_fts_links (link TEXT PRIMARY KEY)')
+            conn.commit()
+            self._fts = conn
+        except Exception as e:
+            logger.warning(f"Article history (FTS5) disabled: {e}")
+            self._fts = None
+
+    def close(self):
+        if self._fts is not None:
+            with self._fts_lock:
+                self._fts.close()
+                self._fts = None
+
+    def _terms(self, article):
+        text = f"{article.get('title', '')} {article.get('summary', '')}"
+        terms = set(self.symbol_index.extract(text))
+        universe = self.symbol_index.symbols()
+        for tok in _TOKEN.findall(text):
+            up = tok.upper()
+            if up in universe:
+                terms.add(up)
+        return terms
+
+    def add_many(self, articles, now=None):
+        """
+        Adds articles given newest first (feed order); links already stored are skipped.
+        Returns how many were new.
+        """
+        now = time.time() if now is None else now
+        fresh = []
+        for article in reversed(list(articles)):
+            link = article.get('link')
+            if not link or link in self._articles:
+                continue
+            fresh.append((link, dict(article), self._terms(article)))
+        if not fresh:
+            return 0
+        with self._lock:
+            added = []
+            for link, article, terms in fresh:
+                if link in self._articles:
+                    continue
+                article['ingested_at'] = now
+                article['symbols'] = sorted(terms)
+                self._articles[link] = article
+                for term in terms:
+                    posting = self._postings.get(term)
+                    if posting is None:
+                        posting = self._postings[term] = OrderedDict()
+                    posting[link] = None
+                added.append(article)
+            self._expire(now)
+        if added and self._fts is not None:
+            self._write_history(added)
+        return len(added)
+
+    def _expire(self, now):
+        while self._articles:
+            link, article = next(iter(self._articles.items()))
+            if len(self._articles) <= self.max_articles and now - article['ingested_at'] <= self.retention:
+                break
+            del self._articles[link]
+            for term in article['symbols']:
+                posting = self._postings.get(term)
+                if posting is None:
+                    continue
+                posting.pop(link, None)
+                if not posting:
+                    del self._postings[term]
+
+    def _write_history(self, articles):
+        rows = [
+            (a['link'], a.get('source', ''), a.get('author', ''), a.get('title', ''), a.get('summary', ''),
+             " ".join(a['symbols']), a.get('published', ''), a['ingested_at'])
+            for a in articles
+        ]
+        try:
+            with self._fts_lock:
+                if self._fts is None:
+                    return
+                cur = self._fts.cursor()
+                for row in rows:
+                    cur.execute("INSERT OR IGNORE INTO article_fts_links (link) VALUES (?)", (row[0],))
+                    if cur.rowcount == 1:
+                        cur.execute(
+                            "INSERT INTO article_fts (link, source, author, title, summary, symbols, published, ingested_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            row
+                        )
+                self._fts.commit()
+        except Exception as e:
+            logger.error(f"Error writing article history: {e}")
+
+    def search(self, symbol, limit=10):
+        """
+        Newest retained articles mentioning symbol (e.g. 'BTC', 'BTC/USDT').
+        """
+        base = symbol.split('/')[0].upper().replace('USDT', '')
+        if not base:
+            return []
+        listed = base in self.symbol_index.symbols()
+        with self._lock:
+            posting = self._postings.get(base)
+            if posting is not None or listed:
+                links = list(islice(reversed(posting), limit)) if posting else []
+                return [self._public(self._articles[link]) for link in links]
+            # not a listed ticker, so it was never indexed: scan what is retained
+            pattern = re.compile(rf'\b{re.escape(base)}\b', re.IGNORECASE)
+            found = []
+            for article in reversed(self._articles.values()):
+                if pattern.search(f"{article.get('title', '')} {article.get('summary', '')}"):
+                    found.append(self._public(article))
+                    if len(found) >= limit:
+                        break
+            return found
+
+    def search_history(self, symbol, limit=10, exclude=()):
+        """
+        Older articles from the FTS5 table (empty when history is disabled).
+        """
+        if self._fts is None:
+            return []
+        base = symbol.split('/')[0].upper().replace('USDT', '')
+        if not base or not base.isalnum():
+            return []
+        try:
+            with self._fts_lock:
+                rows = self._fts.execute(
+                    "SELECT link, source, author, title, summary, published FROM article_fts WHERE article_fts MATCH ? ORDER BY ingested_at DESC LIMIT ?",
+                    (f'symbols:"{base}"', limit + len(exclude))
+                ).fetchall()
+        except Exception as e:
+            logger.error(f"Error searching article history: {e}")
+            return []
+        skip = set(exclude)
+        out = []
+        for link, source, author, title, summary, published in rows:
+            if link in skip:
+                continue
+            skip.add(link)
+            item = {'source': source, 'title': title, 'link': link, 'summary': summary, 'published': published}
+            if author:
+                item['author'] = author
+            out.append(item)
+            if len(out) >= limit:
+                break
+        return out
+
+    @staticmethod
+    def _public(article):
+        return {k: v for k, v in article.items() if k not in ('ingested_at', 'symbols')}
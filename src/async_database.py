@@ -0,0 +1,118 @@
+import asyncio
+import bisect
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+# Database methods that only read; everything else is serialised on the writer thread
+READ_METHODS = frozenset({
+    'get_user', 'get_recent_signals', 'get_all_users', 'is_news_processed',
+    'get_pending_square_posts', 'load_news_state', 'get_onchain_position',
+})
+
+class LatencyHistogram:
+    """
+    Fixed log-spaced buckets (milliseconds). Percentiles are reported as the upper bound
+    of the bucket they fall in, which is all a "is the DB stalling the bot" check needs.
+    """
+    BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+
+    def __init__(self):
+        self.counts = [0] * len(self.BOUNDS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, ms):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+            self.count += 1
+            self.total_ms += ms
+            if ms > self.max_ms:
+                self.max_ms = ms
+
+    def percentile(self, p):
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = p / 100.0 * self.count
+            seen = 0
+            for bound, n in zip(self.BOUNDS_MS, self.counts):
+                seen += n
+                if seen >= rank and n:
+                    return min(bound, self.max_ms)
+            return self.max_ms
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max_ms, 3),
+        }
+
+class AsyncDatabase:
+    """
+    Awaitable front for Database, so bot coroutines never run SQLite on the event loop.
+
+    `await adb.add_square_post(text)` calls Database.add_square_post with the same
+    arguments. Writes go through a single writer thread (a one-worker executor, i.e. a
+    thread plus a FIFO request queue), so they never contend with each other for the write
+    lock. Methods in READ_METHODS run on a small reader pool instead; under WAL those read
+    a consistent snapshot in parallel with the writer. Each thread has its own persistent
+    connection (see ConnectionManager). Time from submit to result, queue wait included,
+    goes into a LatencyHistogram per method.
+    """
+
+    def __init__(self, db, readers=None):
+        self.db = db
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._readers = ThreadPoolExecutor(max_workers=readers or Config.DB_READER_THREADS, thread_name_prefix="db-reader")
+        self.latency = {}
+        self._latency_lock = threading.Lock()
+
+    def __getattr__(self, name):
+        method = getattr(self.db, name)
+        if name.startswith('_') or not callable(method):
+            raise AttributeError(name)
+        pool = self._readers if name in READ_METHODS else self._writer
+
+        async def call(*args, **kwargs):
+            return await self._submit(pool, name, functools.partial(method, *args, **kwargs))
+
+        call.__name__ = name
+        return call
+
+    def _histogram(self, name):
+        hist = self.latency.get(name)
+        if hist is None:
+            with self._latency_lock:
+                hist = self.latency.setdefault(name, LatencyHistogram())
+        return hist
+
+    async def _submit(self, pool, name, fn):
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, fn)
+        finally:
+            self._histogram(name).record((time.perf_counter() - start) * 1000.0)
+
+    def stats(self):
+        return {name: hist.snapshot() for name, hist in sorted(self.latency.items())}
+
+    def log_stats(self):
+        for name, s in self.stats().items():
+            logger.info(f"DB {name}: n={s['count']} mean={s['mean_ms']}ms p95<={s['p95_ms']}ms p99<={s['p99_ms']}ms max={s['max_ms']}ms")
+
+    def close(self):
+        # queued writes are finished before the connections go away
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
@@ -0,0 +1,91 @@
+import json
+import logging
+import re
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+ANNOUNCEMENT_PAGE_URL = "https://www.binance.com/zh-CN/support/announcement"
+ANNOUNCEMENT_LIST_URL = "https://www.binance.com/bapi/composite/v1/public/cms/article/list/query"
+ARTICLE_URL = "https://www.binance.com/zh-CN/support/announcement/{code}"
+
+_APP_DATA = re.compile(r'<script[^>]*id="__APP_DATA"[^>]*>(.*?)</script>', re.S)
+
+def _walk_articles(node, catalog=None, out=None):
+    # article lists sit under catalogs[*].articles in the JSON API and somewhere inside __APP_DATA
+    if out is None:
+        out = []
+    if isinstance(node, dict):
+        name = node.get('catalogName', catalog)
+        for a in node.get('articles') or ():
+            if isinstance(a, dict) and a.get('code') and a.get('title'):
+                out.append((a, name))
+        for k, v in node.items():
+            if k != 'articles' and isinstance(v, (dict, list)):
+                _walk_articles(v, name, out)
+    elif isinstance(node, list):
+        for v in node:
+            _walk_articles(v, catalog, out)
+    return out
+
+def parse_announcement_payload(payload, limit=20):
+    """
+    Turns the cms article list JSON (or the decoded __APP_DATA blob) into the scraper's
+    article dicts, newest first, one per article code.
+    """
+    seen = set()
+    rows = []
+    for a, catalog in _walk_articles(payload):
+        code = a['code']
+        if code in seen:
+            continue
+        seen.add(code)
+        rows.append((a.get('releaseDate') or 0, a, catalog))
+    rows.sort(key=lambda r: r[0], reverse=True)
+    items = []
+    for ts, a, catalog in rows[:limit]:
+        published = datetime.fromtimestamp(ts / 1000).strftime("%Y-%m-%d %H:%M:%S") if ts else datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        title = a['title'].strip() or "Binance 公告"
+        items.append({
+            'source': 'Binance公告',
+            'title': title,
+            'link': ARTICLE_URL.format(code=a['code']),
+            'summary': f"{title} {catalog}" if catalog else title,
+            'published': published
+        })
+    return items
+
+def parse_announcement_page(html, limit=20):
+    m = _APP_DATA.search(html or "")
+    if not m:
+        return []
+    try:
+        return parse_announcement_payload(json.loads(m.group(1)), limit)
+    except Exception:
+        return []
+
+def fetch_announcements(http, limit=20):
+    """
+    Announcement listing over plain HTTP: the public cms JSON endpoint first, then the
+    __APP_DATA JSON embedded in the support page. Returns [] if neither yields articles.
+    """
+    try:
+        r = http.get(
+            ANNOUNCEMENT_LIST_URL,
+            params={'type': 1, 'pageNo': 1, 'pageSize': max(limit, 20)},
+            headers={'lang': 'zh-CN', 'clienttype': 'web'},
+            timeout=8
+        )
+        if r.status_code == 200:
+            items = parse_announcement_payload(r.json(), limit)
+            if items:
+                return items
+    except Exception as e:
+        logger.warning(f"Binance announcement API failed: {e}")
+    try:
+        r = http.get(ANNOUNCEMENT_PAGE_URL, timeout=8)
+        if r.status_code == 200:
+            return parse_announcement_page(r.text, limit)
+    except Exception as e:
+        logger.warning(f"Binance announcement page fetch failed: {e}")
+    return []
@@ -11,6 +11,7 @@ import sys
 from dotenv import load_dotenv
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.config import Config
+from src.square_queue import claim_posts, ensure_claim_schema
 fmt = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 logging.basicConfig(format=fmt, level=getattr(logging, getattr(Config, "LOG_LEVEL", "INFO")), stream=sys.stdout)
 class TruncatingFormatter(logging.Formatter):
@@ -504,31 +505,15 @@ def ensure_square_queue_schema():
             cur.execute("ALTER TABLE square_queue ADD COLUMN next_try_at TIMESTAMP")
         if 'bot_approved' not in cols:
             cur.execute("ALTER TABLE square_queue ADD COLUMN bot_approved INTEGER DEFAULT 0")
+        ensure_claim_schema(cur)
         conn.commit()
     finally:
         conn.close()
 
 def claim_pending(limit=5):
     conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    claimed = []
     try:
-        cur.execute("""
-            SELECT id, text, attempts FROM square_queue
-            WHERE status = 'pending'
-              AND bot_approved = 1
-              AND (next_try_at IS NULL OR next_try_at <= CURRENT_TIMESTAMP)
-            ORDER BY created_at ASC
-            LIMIT 1
-        """)
-        row = cur.fetchone()
-        if row:
-            pid, text, attempts = row
-            cur.execute("UPDATE square_queue SET status = 'processing' WHERE id = ? AND status = 'pending'", (pid,))
-            if cur.rowcount and cur.rowcount > 0:
-                claimed.append((pid, text, attempts))
-        conn.commit()
-        return claimed
+        return claim_posts(conn, limit=limit, lease_seconds=Config.SQUARE_LEASE_SECONDS)
     finally:
         conn.close()
 
@@ -536,7 +521,7 @@ def mark_sent(post_id):
     conn = sqlite3.connect(DB_PATH)
     cur = conn.cursor()
     try:
-        cur.execute("UPDATE square_queue SET status = 'sent', sent_at = CURRENT_TIMESTAMP, next_try_at = NULL WHERE id = ?", (post_id,))
+        cur.execute("UPDATE square_queue SET status = 'sent', sent_at = CURRENT_TIMESTAMP, next_try_at = NULL, lease_until = NULL WHERE id = ?", (post_id,))
         conn.commit()
     finally:
         conn.close()
@@ -555,9 +540,9 @@ def reset_pending(post_id, delay_seconds=None):
     cur = conn.cursor()
     try:
         if delay_seconds and delay_seconds > 0:
-            cur.execute("UPDATE square_queue SET status = 'pending', next_try_at = datetime('now', ?) WHERE id = ?", (f'+{int(delay_seconds)} seconds', post_id))
+            cur.execute("UPDATE square_queue SET status = 'pending', next_try_at = datetime('now', ?), lease_until = NULL WHERE id = ?", (f'+{int(delay_seconds)} seconds', post_id))
         else:
-            cur.execute("UPDATE square_queue SET status = 'pending', next_try_at = NULL WHERE id = ?", (post_id,))
+            cur.execute("UPDATE square_queue SET status = 'pending', next_try_at = NULL, lease_until = NULL WHERE id = ?", (post_id,))
         conn.commit()
     finally:
         conn.close()
@@ -566,7 +551,7 @@ def mark_failed(post_id):
     conn = sqlite3.connect(DB_PATH)
     cur = conn.cursor()
     try:
-        cur.execute("UPDATE square_queue SET status = 'failed' WHERE id = ?", (post_id,))
+        cur.execute("UPDATE square_queue SET status = 'failed', lease_until = NULL WHERE id = ?", (post_id,))
         conn.commit()
     finally:
         conn.close()
@@ -0,0 +1,58 @@
+import hashlib
+import math
+import threading
+
+class BloomFilter:
+    """
+    Plain Bloom filter over strings, sized for `capacity` items at `error_rate`.
+
+    Bit positions come from double hashing (h1 + i*h2) of one blake2b digest per item.
+    `x in f` is False only if x was never added; True may be a false positive, so callers
+    confirm positives elsewhere. Items cannot be removed: rebuild to forget.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(1, int(capacity))
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / self.capacity * math.log(2))))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def add(self, item):
+        positions = self._positions(item)
+        with self._lock:
+            bits = self._bits
+            new = False
+            for p in positions:
+                mask = 1 << (p & 7)
+                if not bits[p >> 3] & mask:
+                    bits[p >> 3] |= mask
+                    new = True
+            if new:
+                self.count += 1
+
+    def __contains__(self, item):
+        bits = self._bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def memory_bytes(self):
+        return len(self._bits)
+
+    def estimated_fp_rate(self):
+        """
+        (1 - e^(-k*n/m))^k for the n items added so far.
+        """
+        return (1.0 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
@@ -4,10 +4,12 @@ from telegram.ext import ApplicationBuilder, ContextTypes, CommandHandler
 from .config import Config
 from .engines import SignalEngine
 from .database import Database
+from .async_database import AsyncDatabase
 from .trading import TradingEngine
 from .onchain import OnChainTradingEngine
 from .missions import BinanceMissions
 from .polymarket_watcher import PolymarketWatcher
+from .singleflight import SingleFlight
 import os
 import time
 import asyncio
@@ -20,6 +22,8 @@ class TrendPulseBot:
         self.token = Config.TELEGRAM_BOT_TOKEN
         self.engine = SignalEngine()
         self.db = Database()
+        # coroutines go through adb so SQLite never blocks the event loop
+        self.adb = AsyncDatabase(self.db)
         try:
             purged = self.db.purge_virtual_pending_posts()
             if purged > 0:
@@ -29,7 +33,17 @@ class TrendPulseBot:
         self.whale_threshold_usd = Config.WHALE_THRESHOLD_USD
         self.trader = TradingEngine()
         self.onchain = OnChainTradingEngine()
-        self.polymarket = PolymarketWatcher()
+        self.polymarket = PolymarketWatcher(db=self.db)
+        self.flights = SingleFlight()
+        self._news_state_version = None
+        try:
+            heat_rows, cursors = self.db.load_news_state()
+            self.engine.news.restore_state(heat_rows, cursors)
+            self._news_state_version = self.engine.news.state_version()
+            if heat_rows or cursors:
+                logger.info(f"Restored heat for {len(heat_rows)} symbols and {len(cursors)} news cursors.")
+        except Exception as e:
+            logger.error(f"Error restoring news state: {e}")
     
     def _is_group(self, update: Update):
         return update.effective_chat and update.effective_chat.type in ('group', 'supergroup')
@@ -40,7 +54,7 @@ class TrendPulseBot:
             print("ERROR: Telegram Bot Token not set. Please set TELEGRAM_BOT_TOKEN in .env")
             return
 
-        application = ApplicationBuilder().token(self.token).build()
+        application = ApplicationBuilder().token(self.token).post_shutdown(self.on_shutdown).build()
         
         # Add JobQueue
         job_queue = application.job_queue
@@ -49,6 +63,7 @@ class TrendPulseBot:
         # Schedule whale alerts check every 2 minutes
         job_queue.run_repeating(self.check_whale_alerts, interval=120, first=20)
         job_queue.run_repeating(self.housekeeping_cleanup, interval=21600, first=120)
+        job_queue.run_repeating(self.snapshot_news_state, interval=Config.NEWS_STATE_SNAPSHOT_INTERVAL, first=Config.NEWS_STATE_SNAPSHOT_INTERVAL)
         job_queue.run_repeating(self.post_advertisement, interval=Config.AD_INTERVAL_SECONDS, first=10)
         job_queue.run_repeating(self.check_funding_rates, interval=180, first=30)
         job_queue.run_repeating(self.check_binance_alpha, interval=300, first=40)
@@ -80,11 +95,43 @@ class TrendPulseBot:
         print("Bot is running...")
         application.run_polling()
 
+    async def _save_news_state(self):
+        version = self.engine.news.state_version()
+        if version == self._news_state_version:
+            return
+        heat_rows, cursors = self.engine.news.export_state()
+        if await self.adb.save_news_state(heat_rows, cursors):
+            self._news_state_version = version
+
+    async def snapshot_news_state(self, context: ContextTypes.DEFAULT_TYPE):
+        try:
+            await self._save_news_state()
+        except Exception as e:
+            logger.error(f"Error in snapshot_news_state job: {e}")
+
+    async def on_shutdown(self, application):
+        try:
+            await self._save_news_state()
+        except Exception as e:
+            logger.error(f"Error saving news state on shutdown: {e}")
+        try:
+            await self.engine.aclose()
+        except Exception as e:
+            logger.error(f"Error closing async market clients: {e}")
+        try:
+            self.engine.close()
+        except Exception as e:
+            logger.error(f"Error closing signal engine: {e}")
+        self.adb.log_stats()
+        self.adb.close()
+        self.db.close()
+
     async def check_news(self, context: ContextTypes.DEFAULT_TYPE):
         """Background task to check for new news"""
         logger.info("Scheduler: Checking for new news...")
         try:
-            articles = self.engine.news.fetch_latest_news()
+            loop = asyncio.get_running_loop()
+            articles = await loop.run_in_executor(None, self.engine.news.fetch_latest_news)
             if not articles:
                 logger.info("Scheduler: No new articles found.")
                 return
@@ -92,16 +139,24 @@ class TrendPulseBot:
             logger.info(f"Scheduler: Found {len(articles)} new articles. Preparing to broadcast.")
             
             # Get all subscribed users (broadcasting to all for now)
-            user_ids = self.db.get_all_users()
+            user_ids = await self.adb.get_all_users()
             if not user_ids:
                 return
 
-            for article in reversed(articles): # Send oldest to newest among the new ones
-                # Atomically claim this news to avoid races across multiple bot instances
-                if not self.db.claim_news_if_new(article['link'], article.get('source', 'Unknown')):
+            ordered = list(reversed(articles)) # Send oldest to newest among the new ones
+            # Atomically claim the whole round in one transaction to avoid races across multiple bot instances
+            claimed = set(await self.adb.claim_news_batch([(a['link'], a.get('source', 'Unknown')) for a in ordered]))
+            fresh = []
+            for article in ordered:
+                if article['link'] in claimed:
+                    claimed.discard(article['link'])
+                    fresh.append(article)
+                else:
                     logger.info(f"Skipping duplicate (already processed): {article.get('title', '')}")
-                    continue
-                    
+            # Square posts for the round are queued (already approved) in one transaction as well
+            await self.adb.enqueue_posts([article.get('summary') or f"{article['title']}" for article in fresh], approved=True)
+
+            for article in fresh:
                 source_emojis = {
                     'BlockBeats': "📰",
                     'PANews': "📢",
@@ -137,8 +192,11 @@ class TrendPulseBot:
                                  f"类型: {type_emoji} {analysis['type']}\n" \
                                  f"摘要: {analysis['summary']}\n"
 
+                sources = article.get('sources') or []
+                source_line = f"\n📡 多源报道: {'、'.join(sources)}" if len(sources) > 1 else ""
+
                 msg = f"""
-{source_emoji} **{article.get('source', 'News')} 快讯**
+{source_emoji} **{article.get('source', 'News')} 快讯**{source_line}
 
 **{article['title']}**
 
@@ -147,9 +205,6 @@ class TrendPulseBot:
 {ai_section}
 🔗 [查看原文]({article['link']})
                 """
-                square_msg = article.get('summary') or f"{article['title']}"
-                post_id = self.db.add_square_post(square_msg)
-                
                 for user_id in user_ids:
                     try:
                         chat = await context.bot.get_chat(user_id)
@@ -158,11 +213,6 @@ class TrendPulseBot:
                     except Exception as e:
                         logger.error(f"Failed to send news to {user_id}: {e}")
                         # In real app, might want to remove invalid users
-                if post_id is not None:
-                    try:
-                        self.db.mark_square_post_approved(post_id)
-                    except Exception:
-                        pass
                 
         except Exception as e:
             logger.error(f"Error in check_news job: {e}")
@@ -189,6 +239,17 @@ class TrendPulseBot:
                     logger.info(f"Housekeeping removed {removed} old fail screenshots")
         except Exception as e:
             logger.error(f"Error in housekeeping_cleanup: {e}")
+        try:
+            pruned = await self.adb.prune_processed_news()
+            f = self.db.processed_filter_stats()
+            logger.info(
+                f"Housekeeping pruned {pruned} processed_news rows; filter {f.get('entries', 0)} links, "
+                f"{f.get('memory_kb', 0)} KB, est. FP {f.get('estimated_fp_rate', 0):.5f}, observed FP {f['observed_fp_rate']:.5f}, "
+                f"{f['definitely_new']} lookups skipped"
+            )
+        except Exception as e:
+            logger.error(f"Error pruning processed_news: {e}")
+        self.adb.log_stats()
 
     async def test_push(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Manually trigger a test push of the latest news"""
@@ -256,7 +317,7 @@ class TrendPulseBot:
             await context.bot.send_message(chat_id=update.effective_chat.id, text="该机器人仅在群组中可用。请在群聊中使用。")
             return
         chat_id = update.effective_chat.id
-        self.db.add_user(chat_id)
+        await self.adb.add_user(chat_id)
         
         welcome_text = f"TrendPulse.Ai 已激活!\n\n本群将接收自动行情推送 (聪明钱/推特监控)。\n使用 /help 查看可用命令。"
             
@@ -301,21 +362,27 @@ class TrendPulseBot:
         await context.bot.send_message(chat_id=update.effective_chat.id, text=f"🔍 正在全维度扫描 {symbol}...")
         
         try:
-            signal = self.engine.analyze_symbol(symbol)
+            signal = await self.flights.do(('analyze', symbol), lambda: self._analyze_and_record(symbol))
             if not signal:
                 await context.bot.send_message(chat_id=update.effective_chat.id, text=f"无法获取 {symbol} 的数据。")
                 return
 
             response = self._format_signal_message(signal)
             
-            # Save signal if it's interesting (simplified logic)
-            self.db.add_signal(signal)
-            
             await context.bot.send_message(chat_id=update.effective_chat.id, text=response)
         except Exception as e:
             logger.error(f"Error in analyze: {e}")
             await context.bot.send_message(chat_id=update.effective_chat.id, text="扫描过程中发生错误。")
 
+    async def _analyze_and_record(self, symbol):
+        # the one factory behind every ('analyze', symbol) flight (/trend, /risk, auto-trade), so
+        # whichever caller starts it, the shared result is saved once
+        signal = await self.engine.analyze_symbol_async(symbol)
+        if signal:
+            # Save signal if it's interesting (simplified logic)
+            await self.adb.add_signal(signal)
+        return signal
+
     async def scan_social(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         if not self._is_group(update):
             await context.bot.send_message(chat_id=update.effective_chat.id, text="该机器人仅在群组中可用。请在群聊中使用。")
@@ -331,7 +398,8 @@ class TrendPulseBot:
             base = base.replace('USDT', '')
         await context.bot.send_message(chat_id=update.effective_chat.id, text=f"🔎 正在扫描 {base} 社交网络最新动态...")
         try:
-            items = self.engine.news.search_symbol_news(raw)
+            loop = asyncio.get_running_loop()
+            items = await self.flights.do(('scan', base), lambda: loop.run_in_executor(None, self.engine.news.search_symbol_news, raw))
             if not items:
                 await context.bot.send_message(chat_id=update.effective_chat.id, text=f"未找到与 {base} 相关的最新动态。")
                 return
@@ -357,11 +425,13 @@ class TrendPulseBot:
     async def check_polymarket(self, context: ContextTypes.DEFAULT_TYPE):
         """Background task to check for Polymarket alerts"""
         try:
-            alerts = self.polymarket.check_market_movements()
+            # the HTTP fetch and the processed_news claims are blocking
+            loop = asyncio.get_running_loop()
+            alerts = await loop.run_in_executor(None, self.polymarket.check_market_movements)
             if not alerts:
                 return
             
-            user_ids = self.db.get_all_users()
+            user_ids = await self.adb.get_all_users()
             if not user_ids:
                 return
                 
@@ -385,7 +455,7 @@ class TrendPulseBot:
                 # Also add to Square/X queue
                 # Strip markdown for external platforms
                 plain_msg = f"【Polymarket 预测警报】\n\n事件: {alert['event_title']}\n问题: {alert['question']}\n结果: {alert['outcome']} 概率突升至 {price_pct:.1f}% 🔥\n\n查看: {alert['link']}"
-                self.db.add_square_post(plain_msg)
+                await self.adb.add_square_post(plain_msg)
                 
         except Exception as e:
             logger.error(f"Error in check_polymarket: {e}")
@@ -395,7 +465,7 @@ class TrendPulseBot:
             symbols = self.engine.market.list_usdt_pairs(limit=100)
             if not symbols:
                 symbols = ['BTC/USDT', 'ETH/USDT', 'SOL/USDT', 'PEPE/USDT', 'WIF/USDT']
-            user_ids = self.db.get_all_users()
+            user_ids = await self.adb.get_all_users()
             if not user_ids:
                 return
             for symbol in symbols:
@@ -414,7 +484,7 @@ class TrendPulseBot:
 ━━━━━━━━━━━━━━
                 """
                 square_msg = f"鲸鱼异动 {symbol} | {whale_data['summary']} | {whale_data['details']}"
-                post_id = self.db.add_square_post(square_msg)
+                post_id = await self.adb.add_square_post(square_msg)
                 for user_id in user_ids:
                     try:
                         chat = await context.bot.get_chat(user_id)
@@ -424,24 +494,32 @@ class TrendPulseBot:
                         logger.error(f"Failed to send whale alert to {user_id}: {e}")
                 if post_id is not None:
                     try:
-                        self.db.mark_square_post_approved(post_id)
+                        await self.adb.mark_square_post_approved(post_id)
                     except Exception:
                         pass
         except Exception as e:
             logger.error(f"Error in check_whale_alerts: {e}")
     
+    async def _refresh_funding_snapshot(self):
+        # through FundingSnapshot.refresh so it never races the opportunity workers' refresh
+        if self.engine.funding.is_stale():
+            await asyncio.get_running_loop().run_in_executor(None, self.engine.funding.refresh)
+
     async def check_funding_rates(self, context: ContextTypes.DEFAULT_TYPE):
         try:
-            user_ids = self.db.get_all_users()
+            user_ids = await self.adb.get_all_users()
             if not user_ids:
                 return
             min_daily_volume = float(getattr(Config, "FUNDING_MIN_DAILY_VOLUME_USD", 10000000))
             top_n = 5
-            all_symbols = self.engine.market.list_futures_usdt_pairs(limit=2000)
+            all_symbols, _, quote_volumes = await asyncio.gather(
+                self.engine.amarket.list_futures_usdt_pairs(limit=2000),
+                self._refresh_funding_snapshot(),
+                self.engine.amarket.fetch_futures_24h_quote_volumes()
+            )
             if not all_symbols:
                 return
-            funding_rates = self.engine.market.fetch_all_funding_rates()
-            quote_volumes = self.engine.market.fetch_futures_24h_quote_volumes()
+            funding_rates = self.engine.funding.rates(refresh=False)
             ranked = []
             for symbol in all_symbols:
                 rate = funding_rates.get(symbol)
@@ -468,10 +546,10 @@ class TrendPulseBot:
                 except Exception as e:
                     logger.error(f"Failed to send funding alert to {user_id}: {e}")
             square_msg = "资金费率前五 | " + " ; ".join([f"{i+1}.{s}" for i, (s, _, _) in enumerate(ranked)])
-            post_id = self.db.add_square_post(square_msg)
+            post_id = await self.adb.add_square_post(square_msg)
             if post_id is not None:
                 try:
-                    self.db.mark_square_post_approved(post_id)
+                    await self.adb.mark_square_post_approved(post_id)
                 except Exception:
                     pass
         except Exception as e:
@@ -484,7 +562,7 @@ class TrendPulseBot:
             items = self.engine.news.scan_binance_alpha_listings(limit=8)
             if not items:
                 return
-            user_ids = self.db.get_all_users()
+            user_ids = await self.adb.get_all_users()
             if not user_ids:
                 return
             for a in items:
@@ -497,7 +575,7 @@ class TrendPulseBot:
 ━━━━━━━━━━━━━━
                 """
                 square_msg = f"币安新币 {a.get('title','')}"
-                post_id = self.db.add_square_post(square_msg)
+                post_id = await self.adb.add_square_post(square_msg)
                 for user_id in user_ids:
                     try:
                         chat = await context.bot.get_chat(user_id)
@@ -507,7 +585,7 @@ class TrendPulseBot:
                         logger.error(f"Failed to send alpha alert to {user_id}: {e}")
                 if post_id is not None:
                     try:
-                        self.db.mark_square_post_approved(post_id)
+                        await self.adb.mark_square_post_approved(post_id)
                     except Exception:
                         pass
         except Exception as e:
@@ -518,7 +596,7 @@ class TrendPulseBot:
             events = self.engine.whale.scan_large_transfers()
             if not events:
                 return
-            user_ids = self.db.get_all_users()
+            user_ids = await self.adb.get_all_users()
             if not user_ids:
                 return
             for e in events:
@@ -536,7 +614,7 @@ class TrendPulseBot:
 ━━━━━━━━━━━━━━
                 """
                 square_msg = f"大额转账 | {e.get('title','')} | ${amt:,.0f}"
-                post_id = self.db.add_square_post(square_msg)
+                post_id = await self.adb.add_square_post(square_msg)
                 for user_id in user_ids:
                     try:
                         chat = await context.bot.get_chat(user_id)
@@ -546,7 +624,7 @@ class TrendPulseBot:
                         logger.error(f"Failed to send transfer alert to {user_id}: {ex}")
                 if post_id is not None:
                     try:
-                        self.db.mark_square_post_approved(post_id)
+                        await self.adb.mark_square_post_approved(post_id)
                     except Exception:
                         pass
         except Exception as e:
@@ -557,11 +635,14 @@ class TrendPulseBot:
             await context.bot.send_message(chat_id=update.effective_chat.id, text="该机器人仅在群组中可用。请在群聊中使用。")
             return
         try:
-            opps = self.engine.generate_opportunities()
+            loop = asyncio.get_running_loop()
+            opps, partial = await loop.run_in_executor(None, self.engine.generate_opportunities)
             if not opps:
                 await context.bot.send_message(chat_id=update.effective_chat.id, text="当前暂无高置信度机会。")
                 return
             lines = ["🚀 **实时机会清单**", ""]
+            if partial:
+                lines.insert(1, f"⚠️ 部分数据源超时未返回: {', '.join(partial)}")
             for o in opps[:8]:
                 t = o.get('type')
                 if t == 'funding_rate_extreme':
@@ -586,16 +667,16 @@ class TrendPulseBot:
             if not syms:
                 return
             for s in syms:
-                sig = self.engine.analyze_symbol(s)
+                sig = await self.flights.do(('analyze', s), lambda s=s: self._analyze_and_record(s))
                 if not sig:
                     continue
                 o = self.trader.act_on_signal(s, sig)
                 if o:
                     square_msg = f"AutoTrade {s} | {o.get('id','')} | {o.get('side','')}"
-                    post_id = self.db.add_square_post(square_msg)
+                    post_id = await self.adb.add_square_post(square_msg)
                     if post_id is not None:
                         try:
-                            self.db.mark_square_post_approved(post_id)
+                            await self.adb.mark_square_post_approved(post_id)
                         except Exception:
                             pass
         except Exception as e:
@@ -605,7 +686,8 @@ class TrendPulseBot:
         try:
             if not self.onchain.enabled:
                 return
-            opps = self.engine.generate_opportunities()
+            loop = asyncio.get_running_loop()
+            opps, _ = await loop.run_in_executor(None, self.engine.generate_opportunities)
             if not opps:
                 return
             wl = self.onchain.whitelist
@@ -615,12 +697,12 @@ class TrendPulseBot:
                 if o.get('type') == 'large_transfer' and o.get('direction') == 'inflow':
                     tx = self.onchain.buy_token_usdt(wl[0], min(self.onchain.max_usd, 10))
                     if tx:
-                        self.db.record_onchain_buy(wl[0], tx.get('received_wei', 0), tx.get('decimals', 18), tx.get('cost_usdt', 0), tx_hash=tx.get('hash',''))
+                        await self.adb.record_onchain_buy(wl[0], tx.get('received_wei', 0), tx.get('decimals', 18), tx.get('cost_usdt', 0), tx_hash=tx.get('hash',''))
                         square_msg = f"OnChain Buy | {tx.get('hash','')}"
-                        post_id = self.db.add_square_post(square_msg)
+                        post_id = await self.adb.add_square_post(square_msg)
                         if post_id is not None:
                             try:
-                                self.db.mark_square_post_approved(post_id)
+                                await self.adb.mark_square_post_approved(post_id)
                             except Exception:
                                 pass
                     break
@@ -664,7 +746,7 @@ class TrendPulseBot:
             pct = float(context.args[1])
             tx = self.onchain.sell_token_to_usdt(addr, pct)
             if tx:
-                pnl = self.db.record_onchain_sell(addr, tx.get('sold_wei', 0), tx.get('received_usdt', 0), tx_hash=tx.get('hash',''))
+                pnl = await self.adb.record_onchain_sell(addr, tx.get('sold_wei', 0), tx.get('received_usdt', 0), tx_hash=tx.get('hash',''))
                 await context.bot.send_message(chat_id=update.effective_chat.id, text=f"卖出成功: {tx.get('hash','')} | 实现盈亏: ${pnl:,.2f}")
             else:
                 await context.bot.send_message(chat_id=update.effective_chat.id, text="卖出失败或未满足白名单/余额。")
@@ -682,11 +764,7 @@ class TrendPulseBot:
             # naive monitor: check the first token's current USDT value vs cost
             token = wl[0]
             # Fetch position
-            conn = self.db.get_connection()
-            cur = conn.cursor()
-            cur.execute("SELECT amount_wei, total_cost_usdt, decimals FROM onchain_positions WHERE token_address = ?", (token,))
-            row = cur.fetchone()
-            conn.close()
+            row = await self.adb.get_onchain_position(token)
             if not row:
                 return
             amt_wei, total_cost, dec = row
@@ -700,12 +778,12 @@ class TrendPulseBot:
             if change_pct <= -Config.STOP_LOSS_PCT or change_pct >= Config.TAKE_PROFIT_PCT:
                 tx = self.onchain.sell_token_to_usdt(token, 1.0)
                 if tx:
-                    pnl = self.db.record_onchain_sell(token, tx.get('sold_wei', 0), tx.get('received_usdt', 0), tx_hash=tx.get('hash',''))
+                    pnl = await self.adb.record_onchain_sell(token, tx.get('sold_wei', 0), tx.get('received_usdt', 0), tx_hash=tx.get('hash',''))
                     square_msg = f"OnChain Exit | {tx.get('hash','')} | PnL ${pnl:,.2f}"
-                    post_id = self.db.add_square_post(square_msg)
+                    post_id = await self.adb.add_square_post(square_msg)
                     if post_id is not None:
                         try:
-                            self.db.mark_square_post_approved(post_id)
+                            await self.adb.mark_square_post_approved(post_id)
                         except Exception:
                             pass
         except Exception as e:
@@ -716,15 +794,15 @@ class TrendPulseBot:
             if not Config.MISSIONS_ENABLED:
                 return
             loop = asyncio.get_running_loop()
-            res = await loop.run_in_executor(None, BinanceMissions().run)
+            res = await loop.run_in_executor(None, BinanceMissions(browser=self.engine.news.browser).run)
             if res and res.get("ok"):
                 msg = "任务中心已尝试完成可点击任务"
             else:
                 msg = "任务执行失败或未安装Playwright"
-            post_id = self.db.add_square_post(msg)
+            post_id = await self.adb.add_square_post(msg)
             if post_id is not None:
                 try:
-                    self.db.mark_square_post_approved(post_id)
+                    await self.adb.mark_square_post_approved(post_id)
                 except Exception:
                     pass
         except Exception as e:
@@ -740,9 +818,9 @@ class TrendPulseBot:
             if not enabled:
                 return
             ad = os.getenv("AD_TEXT", Config.AD_TEXT)
-            post_id = self.db.add_square_ad_post(ad)
+            post_id = await self.adb.add_square_ad_post(ad)
             if post_id is not None:
-                self.db.mark_square_post_approved(post_id)
+                await self.adb.mark_square_post_approved(post_id)
         except Exception as e:
             logger.error(f"Error in post_advertisement: {e}")
 
@@ -750,7 +828,7 @@ class TrendPulseBot:
         if not self._is_group(update):
             await context.bot.send_message(chat_id=update.effective_chat.id, text="该机器人仅在群组中可用。请在群聊中使用。")
             return
-        signals = self.db.get_recent_signals()
+        signals = await self.adb.get_recent_signals()
         if not signals:
             await context.bot.send_message(chat_id=update.effective_chat.id, text="未找到最近的信号。")
             return
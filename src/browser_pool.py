@@ -0,0 +1,217 @@
+import asyncio
+import logging
+import os
+import threading
+from .config import Config
+try:
+    from playwright.async_api import async_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except Exception:
+    async_playwright = None
+    PLAYWRIGHT_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+def _descendant_pids(root):
+    children = {}
+    try:
+        for name in os.listdir('/proc'):
+            if not name.isdigit():
+                continue
+            try:
+                with open(f'/proc/{name}/stat', 'rb') as f:
+                    stat = f.read().decode('utf-8', 'replace')
+                ppid = int(stat[stat.rindex(')') + 2:].split()[1])
+            except Exception:
+                continue
+            children.setdefault(ppid, []).append(int(name))
+    except Exception:
+        return []
+    out = []
+    stack = [root]
+    while stack:
+        for pid in children.get(stack.pop(), ()):
+            out.append(pid)
+            stack.append(pid)
+    return out
+
+def child_rss_mb(root=None):
+    """
+    Resident memory (MB) of every process below root (default: this process), i.e. the
+    Playwright driver and the Chromium tree it started. 0 where /proc is not available.
+    """
+    total = 0
+    for pid in _descendant_pids(root or os.getpid()):
+        try:
+            with open(f'/proc/{pid}/statm', 'r') as f:
+                total += int(f.read().split()[1])
+        except Exception:
+            continue
+    return total * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024) if total else 0.0
+
+class BrowserPool:
+    """
+    One long-lived headless Chromium shared by the Playwright scrapers.
+
+    The browser lives on its own thread with its own event loop (Playwright objects
+    are bound to the loop that created them), so jobs can be submitted from any worker
+    thread with run(job, key). A job is an async callable taking a fresh Page. Pages are
+    opened in a per-key BrowserContext that is kept between jobs, so cookies/storage
+    are isolated per scraper but not rebuilt every call. At most max_pages jobs run at
+    once. The browser is relaunched if it disconnects, and recycled once it has served
+    max_uses pages or the Chromium tree grows past max_rss_mb. Nothing is launched until
+    the first job.
+    """
+
+    def __init__(self, max_pages=None, max_uses=None, max_rss_mb=None, launch_options=None):
+        self.max_pages = max_pages or Config.BROWSER_MAX_PAGES
+        self.max_uses = max_uses or Config.BROWSER_MAX_USES
+        self.max_rss_mb = max_rss_mb or Config.BROWSER_MAX_RSS_MB
+        self.launch_options = launch_options or {'headless': True}
+        self.uses = 0
+        self.launches = 0
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._playwright = None
+        self._browser = None
+        self._contexts = {}
+        self._active = 0
+        self._sem = None
+        self._browser_lock = None
+        self._recycle = False
+
+    def run(self, job, key='default', setup=None, timeout=None):
+        """
+        Runs await job(page) on the pool and returns its result. setup(context) is awaited
+        once when the context for key is created (e.g. to add cookies).
+        """
+        if not PLAYWRIGHT_AVAILABLE:
+            raise RuntimeError("playwright_not_available")
+        loop = self._ensure_loop()
+        fut = asyncio.run_coroutine_threadsafe(self._run(job, key, setup), loop)
+        try:
+            return fut.result(timeout or Config.BROWSER_JOB_TIMEOUT)
+        except BaseException:
+            fut.cancel()
+            raise
+
+    def close(self):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(15)
+        except Exception as e:
+            logger.error(f"Error closing browser pool: {e}")
+        try:
+            loop.call_soon_threadsafe(loop.stop)
+        except RuntimeError:
+            pass
+        if self._thread:
+            self._thread.join(10)
+        self._loop = None
+
+    def stats(self):
+        return {
+            'launches': self.launches,
+            'uses': self.uses,
+            'active_pages': self._active,
+            'contexts': len(self._contexts),
+            'rss_mb': round(child_rss_mb(), 1)
+        }
+
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is not None and not self._loop.is_closed():
+                return self._loop
+            ready = threading.Event()
+
+            def main():
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                self._loop = loop
+                self._sem = asyncio.Semaphore(self.max_pages)
+                self._browser_lock = asyncio.Lock()
+                ready.set()
+                try:
+                    loop.run_forever()
+                finally:
+                    loop.close()
+
+            self._thread = threading.Thread(target=main, name="browser-pool", daemon=True)
+            self._thread.start()
+            ready.wait(10)
+            return self._loop
+
+    async def _ensure_browser(self):
+        async with self._browser_lock:
+            healthy = self._browser is not None and self._browser.is_connected()
+            if healthy and self._recycle and self._active == 0:
+                logger.info(f"Recycling browser after {self.uses} pages")
+                await self._close_browser()
+                healthy = False
+            if healthy:
+                return
+            if self._browser is not None:
+                logger.warning("Browser disconnected, relaunching")
+                await self._close_browser()
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(**self.launch_options)
+            self._contexts = {}
+            self._recycle = False
+            self.uses = 0
+            self.launches += 1
+
+    async def _context(self, key, setup):
+        ctx = self._contexts.get(key)
+        if ctx is None:
+            ctx = await self._browser.new_context()
+            if setup is not None:
+                await setup(ctx)
+            self._contexts[key] = ctx
+        return ctx
+
+    async def _run(self, job, key, setup):
+        async with self._sem:
+            await self._ensure_browser()
+            self._active += 1
+            page = None
+            try:
+                ctx = await self._context(key, setup)
+                page = await ctx.new_page()
+                return await job(page)
+            finally:
+                self._active -= 1
+                self.uses += 1
+                if page is not None:
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
+                if self.uses >= self.max_uses or child_rss_mb() > self.max_rss_mb:
+                    self._recycle = True
+
+    async def _close_browser(self):
+        for ctx in list(self._contexts.values()):
+            try:
+                await ctx.close()
+            except Exception:
+                pass
+        self._contexts = {}
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+        self._browser = None
+
+    async def _shutdown(self):
+        await self._close_browser()
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
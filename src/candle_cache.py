@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from .config import Config
+from .candle_store import CandleBuffer, CandleView
+
+logger = logging.getLogger(__name__)
+
+TIMEFRAME_SECONDS = {
+    '1m': 60, '3m': 180, '5m': 300, '15m': 900, '30m': 1800,
+    '1h': 3600, '2h': 7200, '4h': 14400, '6h': 21600, '8h': 28800, '12h': 43200,
+    '1d': 86400, '3d': 259200, '1w': 604800
+}
+
+class CandleCache:
+    """
+    Per-(symbol, timeframe) OHLCV cache with delta fetches, backed by CandleBuffer rings.
+
+    Callers ask plan() what to fetch, do the exchange call themselves (sync or async),
+    then hand the rows to merge(). Only candles from the last cached bar onwards are
+    re-requested; that bar may still have been open when it was stored. Views handed
+    out are snapshots, so later merges or live bars never change a caller's arrays.
+    """
+
+    def __init__(self, capacity=None, max_entries=None, max_age=None, min_refresh=None):
+        self.capacity = capacity or Config.OHLCV_CACHE_BARS
+        self.max_entries = max_entries or Config.OHLCV_CACHE_MAX_SYMBOLS
+        self.max_age = max_age or Config.OHLCV_CACHE_MAX_AGE_SECONDS
+        self.min_refresh = Config.OHLCV_CACHE_MIN_REFRESH_SECONDS if min_refresh is None else min_refresh
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.delta_fetches = 0
+        self.full_fetches = 0
+
+    def plan(self, symbol, timeframe, limit):
+        """
+        Returns (view, since). view is the cached CandleView when no fetch is needed;
+        otherwise view is None and since is the start of the delta (None means a full fetch).
+        """
+        now = time.time()
+        key = (symbol, timeframe)
+        with self._lock:
+            self._evict_expired(now)
+            entry = self._entries.get(key)
+            if entry is None or not len(entry['candles']) or (len(entry['candles']) < limit and not entry['complete']):
+                self.full_fetches += 1
+                return None, None
+            self._entries.move_to_end(key)
+            entry['last_access'] = now
+            candles = entry['candles']
+            if now - entry['fetched_at'] < self.min_refresh or now < entry.get('live_until', 0):
+                self.hits += 1
+                # copied under the lock: merge() and the stream's apply_live_bar() rewrite the ring in place
+                return candles.view(limit).copy(), None
+            tf_seconds = TIMEFRAME_SECONDS.get(timeframe, 900)
+            last_ts = candles.last_timestamp()
+            if (now * 1000 - last_ts) / 1000.0 > tf_seconds * self.capacity:
+                # too far behind for a delta to be cheaper than a reload
+                self.full_fetches += 1
+                return None, None
+            self.delta_fetches += 1
+            return None, last_ts
+
+    def merge(self, symbol, timeframe, new_rows, since, limit):
+        now = time.time()
+        key = (symbol, timeframe)
+        new_rows = new_rows or []
+        with self._lock:
+            entry = self._entries.get(key)
+            if since is not None and entry is None:
+                # evicted while the delta was in flight; a delta alone is not a usable history
+                return CandleView.from_rows(new_rows[-limit:])
+            if since is None:
+                candles = CandleBuffer(self.capacity)
+                # the exchange had fewer bars than we asked for (fresh listing), so shorter is all there is
+                complete = len(new_rows) < self.capacity
+            else:
+                candles = entry['candles']
+                complete = entry['complete']
+            candles.extend(new_rows)
+            self._entries[key] = {
+                'candles': candles,
+                'fetched_at': now,
+                'last_access': now,
+                'complete': complete
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return candles.view(limit).copy()
+
+    def apply_live_bar(self, symbol, timeframe, row, ttl):
+        """
+        Upserts one streamed bar into an already-loaded series and keeps the entry authoritative for ttl seconds.
+        Returns False (and drops the live flag) when the series is cold or the bar would leave a gap.
+        """
+        now = time.time()
+        key = (symbol, timeframe)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not len(entry['candles']):
+                return False
+            last_ts = entry['candles'].last_timestamp()
+            tf_ms = TIMEFRAME_SECONDS.get(timeframe, 900) * 1000
+            if row[0] < last_ts:
+                return True
+            if row[0] > last_ts + tf_ms:
+                entry['live_until'] = 0
+                return False
+            entry['candles'].extend([row])
+            entry['live_until'] = now + ttl
+            return True
+
+    def invalidate(self, symbol=None, timeframe=None):
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == symbol and (timeframe is None or k[1] == timeframe)]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': sum(e['candles'].nbytes for e in self._entries.values()),
+                'hits': self.hits,
+                'delta_fetches': self.delta_fetches,
+                'full_fetches': self.full_fetches
+            }
+
+    def _evict_expired(self, now):
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if now - entry['last_access'] <= self.max_age:
+                break
+            self._entries.popitem(last=False)
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+class CandleView:
+    """
+    Read-only column arrays for the newest bars of a CandleBuffer (or over a one-off array).
+    CandleBuffer.view() aliases the ring's memory, so the next update can change it; CandleCache
+    only hands out copy() snapshots of those views, which callers may keep as long as they like.
+    """
+    __slots__ = FIELDS
+
+    def __init__(self, timestamp, open, high, low, close, volume):
+        self.timestamp = timestamp
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    @classmethod
+    def from_rows(cls, rows):
+        data = np.asarray(rows, dtype=np.float64).reshape(-1, len(FIELDS))
+        return cls(data[:, 0].astype(np.int64), data[:, 1], data[:, 2], data[:, 3], data[:, 4], data[:, 5])
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    @property
+    def empty(self):
+        return len(self.timestamp) == 0
+
+    def copy(self):
+        return CandleView(*(getattr(self, f).copy() for f in FIELDS))
+
+    def to_frame(self):
+        df = pd.DataFrame({f: getattr(self, f) for f in FIELDS}, columns=list(FIELDS))
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+
+class CandleBuffer:
+    """
+    Fixed-capacity OHLCV ring buffer, one NumPy array per field.
+
+    Every bar is written twice (slot i and i + capacity), so the newest n bars always
+    sit in one contiguous slice and views never need a copy. Memory is
+    2 * capacity * 6 * 8 bytes whatever the symbol's history looks like.
+    """
+    __slots__ = ('capacity', '_ts', '_ohlcv', '_end', '_size')
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self._ts = np.zeros(2 * self.capacity, dtype=np.int64)
+        self._ohlcv = np.zeros((5, 2 * self.capacity), dtype=np.float64)
+        self._end = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        return self._ts.nbytes + self._ohlcv.nbytes
+
+    def last_timestamp(self):
+        if not self._size:
+            return None
+        return int(self._ts[(self._end - 1) % self.capacity])
+
+    def clear(self):
+        self._end = 0
+        self._size = 0
+
+    def extend(self, rows):
+        """
+        Appends exchange rows ([ts, o, h, l, c, v], ascending). Bars at or after the first
+        incoming timestamp are dropped first, so a re-sent open bar replaces the stale copy.
+        """
+        if not rows:
+            return
+        first_ts = rows[0][0]
+        while self._size and self._ts[(self._end - 1) % self.capacity] >= first_ts:
+            self._end = (self._end - 1) % self.capacity
+            self._size -= 1
+        for row in rows[-self.capacity:]:
+            i = self._end
+            j = i + self.capacity
+            self._ts[i] = self._ts[j] = int(row[0])
+            self._ohlcv[:, i] = self._ohlcv[:, j] = row[1:6]
+            self._end = (i + 1) % self.capacity
+            self._size = min(self.capacity, self._size + 1)
+
+    def view(self, limit=None):
+        n = self._size if limit is None else max(0, min(int(limit), self._size))
+        start = (self._end - n) % self.capacity
+        stop = start + n
+        cols = [self._ts[start:stop]] + [self._ohlcv[k, start:stop] for k in range(5)]
+        for c in cols:
+            c.flags.writeable = False
+        return CandleView(*cols)
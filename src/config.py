@@ -8,6 +8,17 @@ class Config:
     BINANCE_API_KEY = os.getenv("BINANCE_API_KEY")
     BINANCE_API_SECRET = os.getenv("BINANCE_API_SECRET")
     DB_PATH = os.getenv("DB_PATH", "trendpulse.db")
+    # SQLite: how long a writer waits for the lock (ms) and the per-connection page cache (KB)
+    DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+    DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "16384"))
+    # Threads serving read queries for the bot's coroutines (writes always use one writer thread)
+    DB_READER_THREADS = int(os.getenv("DB_READER_THREADS", "4"))
+    # processed_news: days a claimed link/alert id is kept, and the in-memory Bloom filter in front of it
+    PROCESSED_NEWS_RETENTION_DAYS = float(os.getenv("PROCESSED_NEWS_RETENTION_DAYS", "30"))
+    PROCESSED_NEWS_FILTER_CAPACITY = int(os.getenv("PROCESSED_NEWS_FILTER_CAPACITY", "200000"))
+    PROCESSED_NEWS_FILTER_ERROR_RATE = float(os.getenv("PROCESSED_NEWS_FILTER_ERROR_RATE", "0.001"))
+    # Seconds a Square worker holds a claimed post before another claim may take it back (crash recovery)
+    SQUARE_LEASE_SECONDS = int(os.getenv("SQUARE_LEASE_SECONDS", "600"))
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     WHALE_THRESHOLD_USD = int(os.getenv("WHALE_THRESHOLD_USD", "10000000"))
     TWITTER_REAL_MODE = os.getenv("TWITTER_REAL_MODE", "false").lower() in ("1", "true", "yes")
@@ -21,6 +32,8 @@ class Config:
     FUNDING_SYMBOLS = os.getenv("FUNDING_SYMBOLS", "BTCUSDT,ETHUSDT,SOLUSDT")
     FUNDING_RATE_THRESHOLD = float(os.getenv("FUNDING_RATE_THRESHOLD", "0.0003"))
     FUNDING_MIN_DAILY_VOLUME_USD = float(os.getenv("FUNDING_MIN_DAILY_VOLUME_USD", "10000000"))
+    FUNDING_SNAPSHOT_TTL = float(os.getenv("FUNDING_SNAPSHOT_TTL", "60"))
+    FUNDING_HISTORY_LEN = int(os.getenv("FUNDING_HISTORY_LEN", "120"))
     ALPHA_MONITOR_ENABLED = os.getenv("ALPHA_MONITOR_ENABLED", "true").lower() in ("1", "true", "yes")
     LARGE_TRANSFER_THRESHOLD_USD = float(os.getenv("LARGE_TRANSFER_THRESHOLD_USD", "100000"))
     AUTO_TRADE_ENABLED = os.getenv("AUTO_TRADE_ENABLED", "false").lower() in ("1", "true", "yes")
@@ -33,11 +46,84 @@ class Config:
     MISSIONS_ENABLED = os.getenv("MISSIONS_ENABLED", "true").lower() in ("1", "true", "yes")
     BINANCE_COOKIES = os.getenv("BINANCE_COOKIES", "")
     
+    # Pooled HTTP client for exchange REST endpoints
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+    HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+
+    # OHLCV candle cache
+    OHLCV_CACHE_BARS = int(os.getenv("OHLCV_CACHE_BARS", "200"))
+    OHLCV_CACHE_MAX_SYMBOLS = int(os.getenv("OHLCV_CACHE_MAX_SYMBOLS", "512"))
+    OHLCV_CACHE_MAX_AGE_SECONDS = int(os.getenv("OHLCV_CACHE_MAX_AGE_SECONDS", "3600"))
+    OHLCV_CACHE_MIN_REFRESH_SECONDS = float(os.getenv("OHLCV_CACHE_MIN_REFRESH_SECONDS", "5"))
+
+    # Seconds a /trend, /risk or /scan result is shared with identical requests
+    SINGLE_FLIGHT_TTL = float(os.getenv("SINGLE_FLIGHT_TTL", "30"))
+
+    # Batch scans (SignalEngine.scan_market_async): candle requests in flight and news/whale worker threads
+    SCAN_CONCURRENCY = int(os.getenv("SCAN_CONCURRENCY", "16"))
+
+    # generate_opportunities fan-out: worker threads and per-source timeouts (seconds)
+    OPPORTUNITY_CONCURRENCY = int(os.getenv("OPPORTUNITY_CONCURRENCY", "8"))
+    OPPORTUNITY_FUNDING_TIMEOUT = float(os.getenv("OPPORTUNITY_FUNDING_TIMEOUT", "8"))
+    OPPORTUNITY_ALPHA_TIMEOUT = float(os.getenv("OPPORTUNITY_ALPHA_TIMEOUT", "40"))
+    OPPORTUNITY_TRANSFER_TIMEOUT = float(os.getenv("OPPORTUNITY_TRANSFER_TIMEOUT", "12"))
+    # A timed-out source's late result is used only if it was started at most this long ago (one
+    # auto-trade interval); a source still running after the second limit is resubmitted (seconds)
+    OPPORTUNITY_RESULT_MAX_AGE = float(os.getenv("OPPORTUNITY_RESULT_MAX_AGE", "180"))
+    OPPORTUNITY_INFLIGHT_MAX_AGE = float(os.getenv("OPPORTUNITY_INFLIGHT_MAX_AGE", "600"))
+
+    # RSS ingestion: feeds fetched in parallel, each bounded by the timeout (seconds)
+    FEED_FETCH_CONCURRENCY = int(os.getenv("FEED_FETCH_CONCURRENCY", "32"))
+    FEED_FETCH_TIMEOUT = float(os.getenv("FEED_FETCH_TIMEOUT", "10"))
+
+    # Seconds between reloads of the spot + futures ticker universe used for symbol extraction
+    SYMBOL_INDEX_TTL = int(os.getenv("SYMBOL_INDEX_TTL", "3600"))
+
+    # News heat: exponential decay half-life, and how long an unmentioned symbol is kept (hours)
+    HEAT_HALF_LIFE_HOURS = float(os.getenv("HEAT_HALF_LIFE_HOURS", "4"))
+    HEAT_TTL_HOURS = float(os.getenv("HEAT_TTL_HOURS", "48"))
+    # Seconds between heat map / news cursor snapshots to the database (skipped when nothing changed)
+    NEWS_STATE_SNAPSHOT_INTERVAL = int(os.getenv("NEWS_STATE_SNAPSHOT_INTERVAL", "120"))
+
+    # Seconds a shared BlockBeats/PANews newsflash snapshot is reused by whale and transfer scans
+    NEWSFLASH_INTERVAL = int(os.getenv("NEWSFLASH_INTERVAL", "60"))
+
+    # Article index behind search_symbol_news: retention and size bounds, and when /scan may refetch feeds itself
+    ARTICLE_INDEX_RETENTION_HOURS = float(os.getenv("ARTICLE_INDEX_RETENTION_HOURS", "24"))
+    ARTICLE_INDEX_MAX_ARTICLES = int(os.getenv("ARTICLE_INDEX_MAX_ARTICLES", "5000"))
+    ARTICLE_INDEX_REFRESH_SECONDS = int(os.getenv("ARTICLE_INDEX_REFRESH_SECONDS", "180"))
+    # Keep every ingested article in an SQLite FTS5 table for searches past the retention window
+    ARTICLE_HISTORY_ENABLED = os.getenv("ARTICLE_HISTORY_ENABLED", "false").lower() in ("1", "true", "yes")
+
+    # Near-duplicate news collapsing: how long a story is remembered (hours) and the MinHash similarity that counts as the same story
+    NEWS_DEDUP_WINDOW_HOURS = float(os.getenv("NEWS_DEDUP_WINDOW_HOURS", "6"))
+    NEWS_DEDUP_THRESHOLD = float(os.getenv("NEWS_DEDUP_THRESHOLD", "0.5"))
+
+    # Shared headless Chromium for Playwright scrapers: concurrent pages, recycle thresholds, per-job timeout (seconds)
+    BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "4"))
+    BROWSER_MAX_USES = int(os.getenv("BROWSER_MAX_USES", "200"))
+    BROWSER_MAX_RSS_MB = int(os.getenv("BROWSER_MAX_RSS_MB", "1024"))
+    BROWSER_JOB_TIMEOUT = float(os.getenv("BROWSER_JOB_TIMEOUT", "45"))
+
+    # Streaming market data (Binance combined websocket streams)
+    MARKET_STREAM_ENABLED = os.getenv("MARKET_STREAM_ENABLED", "false").lower() in ("1", "true", "yes")
+    MARKET_STREAM_SYMBOLS = os.getenv("MARKET_STREAM_SYMBOLS", "BTC/USDT,ETH/USDT,SOL/USDT")
+    MARKET_STREAM_STALE_SECONDS = float(os.getenv("MARKET_STREAM_STALE_SECONDS", "30"))
+    STREAM_SPOT_URL = os.getenv("STREAM_SPOT_URL", "wss://stream.binance.com:9443")
+    STREAM_FUTURES_URL = os.getenv("STREAM_FUTURES_URL", "wss://fstream.binance.com")
+    STREAM_RECORD_PATH = os.getenv("STREAM_RECORD_PATH", "")
+
     # AI Analysis Configuration
     AI_ANALYSIS_ENABLED = os.getenv("AI_ANALYSIS_ENABLED", "false").lower() in ("1", "true", "yes")
     AI_API_KEY = os.getenv("AI_API_KEY", "")
     AI_BASE_URL = os.getenv("AI_BASE_URL", "https://api.openai.com/v1")
     AI_MODEL = os.getenv("AI_MODEL", "gpt-3.5-turbo")
+    # News classification: articles per prompt, concurrent requests, result cache TTL and request timeout (seconds)
+    AI_BATCH_SIZE = int(os.getenv("AI_BATCH_SIZE", "10"))
+    AI_CONCURRENCY = int(os.getenv("AI_CONCURRENCY", "4"))
+    AI_CACHE_TTL = int(os.getenv("AI_CACHE_TTL", "21600"))
+    AI_REQUEST_TIMEOUT = float(os.getenv("AI_REQUEST_TIMEOUT", "30"))
 
     # Polymarket Configuration
     POLYMARKET_ENABLED = os.getenv("POLYMARKET_ENABLED", "true").lower() in ("1", "true", "yes")
@@ -1,18 +1,49 @@
 import sqlite3
+import json
 import logging
+import threading
 from datetime import datetime
 from .config import Config
+from .db_connection import ConnectionManager
+from .bloom import BloomFilter
+from .square_queue import ensure_claim_schema
 import re
 
 logger = logging.getLogger(__name__)
 
+# rows per multi-row INSERT / IN (...) statement, well under SQLite's bound-parameter limit
+BATCH_ROWS = 400
+# processed_news sources whose ids mean "alert once, ever" (PolymarketWatcher's poly_<market>_<outcome>_90),
+# so retention pruning must not forget them
+UNPRUNED_SOURCES = ('Polymarket',)
+
 class Database:
     def __init__(self):
         self.db_path = Config.DB_PATH
+        self.connections = ConnectionManager(self.db_path)
+        self.processed_filter = None
+        self.filter_stats = {'definitely_new': 0, 'probes': 0, 'false_positives': 0}
+        # links claimed while rebuild_processed_filter runs, added to the new filter before it is swapped in
+        self._filter_lock = threading.Lock()
+        self._claimed_during_rebuild = None
         self.init_db()
+        self.rebuild_processed_filter()
 
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
+        """
+        This thread's persistent WAL connection. close() on it is still expected after each
+        call; it rolls back anything left uncommitted and keeps the connection open.
+        """
+        return self.connections.connection()
+
+    def transaction(self):
+        """
+        with db.transaction() as conn: ... commits on exit, rolls back on error.
+        """
+        return self.connections.transaction()
+
+    def close(self):
+        self.connections.close_all()
 
     def init_db(self):
         conn = self.get_connection()
@@ -51,6 +82,8 @@ class Database:
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
+        # retention pruning walks processed_news oldest first
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_processed_news_created_at ON processed_news(created_at)')
         
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS square_queue (
@@ -61,10 +94,33 @@ class Database:
                 sent_at TIMESTAMP,
                 attempts INTEGER DEFAULT 0,
                 next_try_at TIMESTAMP,
-                bot_approved INTEGER DEFAULT 0
+                bot_approved INTEGER DEFAULT 0,
+                lease_until TIMESTAMP
             )
         ''')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_square_queue_text ON square_queue(text)')
+        # lease column for tables created before it existed, plus the Square workers' claim index
+        ensure_claim_schema(cursor)
+
+        # NewsScanner state kept across restarts (heat map and per-source last seen link)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS heat_snapshot (
+                symbol TEXT PRIMARY KEY,
+                score REAL,
+                last_updated REAL,
+                mentions INTEGER DEFAULT 0,
+                bullish_events INTEGER DEFAULT 0,
+                bearish_events INTEGER DEFAULT 0,
+                alerts TEXT
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS news_cursors (
+                source TEXT PRIMARY KEY,
+                last_link TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
 
         conn.commit()
         conn.close()
@@ -114,50 +170,53 @@ class Database:
             conn.close()
     
     def record_onchain_buy(self, token_address, received_wei, decimals, cost_usdt, tx_hash=None):
-        conn = self.get_connection()
-        cursor = conn.cursor()
         try:
-            cursor.execute("SELECT amount_wei, total_cost_usdt, decimals FROM onchain_positions WHERE token_address = ?", (token_address,))
-            row = cursor.fetchone()
-            if row is None:
-                cursor.execute("INSERT INTO onchain_positions (token_address, amount_wei, decimals, total_cost_usdt, updated_at) VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)", (token_address, int(received_wei), int(decimals), float(cost_usdt)))
-            else:
-                amt, total_cost, dec = row
-                new_amt = int(amt or 0) + int(received_wei)
-                new_cost = float(total_cost or 0.0) + float(cost_usdt)
-                cursor.execute("UPDATE onchain_positions SET amount_wei = ?, total_cost_usdt = ?, decimals = ?, updated_at = CURRENT_TIMESTAMP WHERE token_address = ?", (new_amt, new_cost, int(decimals), token_address))
-            cursor.execute("INSERT INTO onchain_trades (token_address, side, amount_wei, usdt_value, tx_hash) VALUES (?, 'buy', ?, ?, ?)", (token_address, int(received_wei), float(cost_usdt), tx_hash or ''))
-            conn.commit()
+            # read-modify-write of the position, so the write lock is taken before the SELECT
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT amount_wei, total_cost_usdt, decimals FROM onchain_positions WHERE token_address = ?", (token_address,))
+                row = cursor.fetchone()
+                if row is None:
+                    cursor.execute("INSERT INTO onchain_positions (token_address, amount_wei, decimals, total_cost_usdt, updated_at) VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)", (token_address, int(received_wei), int(decimals), float(cost_usdt)))
+                else:
+                    amt, total_cost, dec = row
+                    new_amt = int(amt or 0) + int(received_wei)
+                    new_cost = float(total_cost or 0.0) + float(cost_usdt)
+                    cursor.execute("UPDATE onchain_positions SET amount_wei = ?, total_cost_usdt = ?, decimals = ?, updated_at = CURRENT_TIMESTAMP WHERE token_address = ?", (new_amt, new_cost, int(decimals), token_address))
+                cursor.execute("INSERT INTO onchain_trades (token_address, side, amount_wei, usdt_value, tx_hash) VALUES (?, 'buy', ?, ?, ?)", (token_address, int(received_wei), float(cost_usdt), tx_hash or ''))
         except Exception as e:
             logger.error(f"Error record_onchain_buy: {e}")
-        finally:
-            conn.close()
     
-    def record_onchain_sell(self, token_address, sold_wei, received_usdt, tx_hash=None):
+    def get_onchain_position(self, token_address):
         conn = self.get_connection()
         cursor = conn.cursor()
+        cursor.execute("SELECT amount_wei, total_cost_usdt, decimals FROM onchain_positions WHERE token_address = ?", (token_address,))
+        row = cursor.fetchone()
+        conn.close()
+        return row
+
+    def record_onchain_sell(self, token_address, sold_wei, received_usdt, tx_hash=None):
         try:
-            cursor.execute("SELECT amount_wei, total_cost_usdt FROM onchain_positions WHERE token_address = ?", (token_address,))
-            row = cursor.fetchone()
-            if row is None:
-                return 0.0
-            amt, total_cost = row
-            amt = int(amt or 0)
-            total_cost = float(total_cost or 0.0)
-            frac = (float(sold_wei) / float(amt)) if amt > 0 else 0.0
-            proportional_cost = total_cost * frac
-            new_amt = max(0, amt - int(sold_wei))
-            new_cost = max(0.0, total_cost - proportional_cost)
-            cursor.execute("UPDATE onchain_positions SET amount_wei = ?, total_cost_usdt = ?, updated_at = CURRENT_TIMESTAMP WHERE token_address = ?", (new_amt, new_cost, token_address))
-            cursor.execute("INSERT INTO onchain_trades (token_address, side, amount_wei, usdt_value, tx_hash) VALUES (?, 'sell', ?, ?, ?)", (token_address, int(sold_wei), float(received_usdt), tx_hash or ''))
-            conn.commit()
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT amount_wei, total_cost_usdt FROM onchain_positions WHERE token_address = ?", (token_address,))
+                row = cursor.fetchone()
+                if row is None:
+                    return 0.0
+                amt, total_cost = row
+                amt = int(amt or 0)
+                total_cost = float(total_cost or 0.0)
+                frac = (float(sold_wei) / float(amt)) if amt > 0 else 0.0
+                proportional_cost = total_cost * frac
+                new_amt = max(0, amt - int(sold_wei))
+                new_cost = max(0.0, total_cost - proportional_cost)
+                cursor.execute("UPDATE onchain_positions SET amount_wei = ?, total_cost_usdt = ?, updated_at = CURRENT_TIMESTAMP WHERE token_address = ?", (new_amt, new_cost, token_address))
+                cursor.execute("INSERT INTO onchain_trades (token_address, side, amount_wei, usdt_value, tx_hash) VALUES (?, 'sell', ?, ?, ?)", (token_address, int(sold_wei), float(received_usdt), tx_hash or ''))
             realized_pnl = float(received_usdt) - proportional_cost
             return realized_pnl
         except Exception as e:
             logger.error(f"Error record_onchain_sell: {e}")
             return 0.0
-        finally:
-            conn.close()
 
     def get_user(self, user_id):
         conn = self.get_connection()
@@ -211,38 +270,242 @@ class Database:
         conn.close()
         return users
 
-    def is_news_processed(self, link):
+    def rebuild_processed_filter(self):
+        """
+        Reloads the in-memory Bloom filter over processed_news links (startup, and after
+        pruning so expired links stop matching). Links this instance claims while the
+        rebuild runs are replayed into the new filter before it replaces the old one.
+
+        The filter only knows about links claimed through this Database. A link another
+        instance or process claimed since the last rebuild is a filter miss, so
+        is_news_processed can return a false negative for it until the next rebuild. The
+        claim methods are unaffected: the UNIQUE index still decides every claim.
+        """
+        with self._filter_lock:
+            self._claimed_during_rebuild = []
+        conn = self.get_connection()
+        try:
+            total = conn.execute("SELECT COUNT(*) FROM processed_news").fetchone()[0]
+            bloom = BloomFilter(max(Config.PROCESSED_NEWS_FILTER_CAPACITY, total * 2), Config.PROCESSED_NEWS_FILTER_ERROR_RATE)
+            for (link,) in conn.execute("SELECT link FROM processed_news"):
+                if link:
+                    bloom.add(link)
+        except Exception as e:
+            logger.error(f"Error building processed news filter: {e}")
+            with self._filter_lock:
+                self._claimed_during_rebuild = None
+            return
+        finally:
+            conn.close()
+        with self._filter_lock:
+            for link in self._claimed_during_rebuild:
+                bloom.add(link)
+            self._claimed_during_rebuild = None
+            self.processed_filter = bloom
+
+    def _maybe_processed(self, link):
+        """
+        False when the filter proves link was never claimed by this process or before
+        startup; True means "ask SQLite".
+        """
+        bloom = self.processed_filter
+        if bloom is None:
+            return True
+        if link in bloom:
+            self.filter_stats['probes'] += 1
+            return True
+        self.filter_stats['definitely_new'] += 1
+        return False
+
+    def _remember_processed(self, links):
+        with self._filter_lock:
+            bloom = self.processed_filter
+            if self._claimed_during_rebuild is not None:
+                self._claimed_during_rebuild.extend(links)
+        if bloom is not None:
+            for link in links:
+                bloom.add(link)
+
+    def _processed_in_db(self, link):
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT 1 FROM processed_news WHERE link = ?", (link,))
         exists = cursor.fetchone() is not None
         conn.close()
+        if not exists:
+            self.filter_stats['false_positives'] += 1
         return exists
 
+    def processed_filter_stats(self):
+        bloom = self.processed_filter
+        stats = dict(self.filter_stats)
+        probes = stats['probes']
+        stats['observed_fp_rate'] = stats['false_positives'] / probes if probes else 0.0
+        if bloom is not None:
+            stats.update({
+                'entries': len(bloom),
+                'capacity': bloom.capacity,
+                'hashes': bloom.num_hashes,
+                'memory_kb': round(bloom.memory_bytes / 1024, 1),
+                'estimated_fp_rate': bloom.estimated_fp_rate(),
+            })
+        return stats
+
+    def is_news_processed(self, link):
+        return self._maybe_processed(link) and self._processed_in_db(link)
+
     def mark_news_processed(self, link, source):
         conn = self.get_connection()
         cursor = conn.cursor()
         try:
             cursor.execute("INSERT OR IGNORE INTO processed_news (link, source) VALUES (?, ?)", (link, source))
             conn.commit()
+            self._remember_processed([link])
         except Exception as e:
             logger.error(f"Error marking news processed: {e}")
         finally:
             conn.close()
     
     def claim_news_if_new(self, link, source):
+        # a link the filter may have seen (e.g. a Polymarket alert id re-checked every round)
+        # is looked up with a plain read first, so a repeat never opens a write transaction
+        if self.is_news_processed(link):
+            return False
         conn = self.get_connection()
         cursor = conn.cursor()
         try:
             cursor.execute("INSERT OR IGNORE INTO processed_news (link, source) VALUES (?, ?)", (link, source))
             conn.commit()
-            return cursor.rowcount == 1
+            claimed = cursor.rowcount == 1
+            if claimed:
+                self._remember_processed([link])
+            return claimed
         except Exception as e:
             logger.error(f"Error claiming news: {e}")
             return False
         finally:
             conn.close()
 
+    def claim_news_batch(self, links, source='Unknown'):
+        """
+        claim_news_if_new for many links in one transaction. links holds plain links or
+        (link, source) pairs. Returns the links this call claimed, in input order. Links the
+        filter may have seen are checked with one read first; if none are left, no write
+        transaction is opened.
+        """
+        rows = {}
+        for item in links:
+            link, src = item if isinstance(item, tuple) else (item, source)
+            if link and link not in rows:
+                rows[link] = src
+        if not rows:
+            return []
+        maybe = [link for link in rows if self._maybe_processed(link)]
+        if maybe:
+            conn = self.get_connection()
+            try:
+                for i in range(0, len(maybe), BATCH_ROWS):
+                    chunk = maybe[i:i + BATCH_ROWS]
+                    found = {r[0] for r in conn.execute(f"SELECT link FROM processed_news WHERE link IN ({', '.join('?' * len(chunk))})", chunk)}
+                    self.filter_stats['false_positives'] += len(chunk) - len(found)
+                    for link in found:
+                        del rows[link]
+            except Exception as e:
+                logger.error(f"Error checking news batch: {e}")
+            finally:
+                conn.close()
+        if not rows:
+            return []
+        claimed = set()
+        try:
+            with self.transaction() as conn:
+                items = list(rows.items())
+                for i in range(0, len(items), BATCH_ROWS):
+                    chunk = items[i:i + BATCH_ROWS]
+                    placeholders = ", ".join(["(?, ?)"] * len(chunk))
+                    cursor = conn.execute(
+                        f"INSERT INTO processed_news (link, source) VALUES {placeholders} ON CONFLICT(link) DO NOTHING RETURNING link",
+                        [v for row in chunk for v in row]
+                    )
+                    claimed.update(r[0] for r in cursor.fetchall())
+        except Exception as e:
+            logger.error(f"Error claiming news batch: {e}")
+            return []
+        self._remember_processed(claimed)
+        return [link for link in rows if link in claimed]
+
+    def prune_processed_news(self, retention_days=None, batch_size=5000):
+        """
+        Deletes processed_news rows older than retention_days, oldest first, batch_size rows
+        per transaction so the writer is never held for long, then rebuilds the filter.
+        Rows from UNPRUNED_SOURCES are kept. Returns the number of rows deleted.
+        """
+        days = Config.PROCESSED_NEWS_RETENTION_DAYS if retention_days is None else retention_days
+        deleted = 0
+        try:
+            while True:
+                with self.transaction() as conn:
+                    cursor = conn.execute(
+                        f"DELETE FROM processed_news WHERE id IN (SELECT id FROM processed_news WHERE created_at < datetime('now', ?) AND source NOT IN ({', '.join('?' * len(UNPRUNED_SOURCES))}) ORDER BY created_at LIMIT ?)",
+                        (f"-{float(days)} days", *UNPRUNED_SOURCES, batch_size)
+                    )
+                    n = cursor.rowcount
+                deleted += n
+                if n < batch_size:
+                    break
+        except Exception as e:
+            logger.error(f"Error pruning processed news: {e}")
+        bloom = self.processed_filter
+        if deleted or bloom is None or len(bloom) > bloom.capacity:
+            self.rebuild_processed_filter()
+        return deleted
+
+    def save_news_state(self, heat_rows, cursors):
+        """
+        Replaces the heat snapshot and upserts the news cursors in one transaction.
+        """
+        try:
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM heat_snapshot")
+                cursor.executemany(
+                    "INSERT INTO heat_snapshot (symbol, score, last_updated, mentions, bullish_events, bearish_events, alerts) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(r['symbol'], r['score'], r['last_updated'], r['mentions'], r['bullish_events'], r['bearish_events'], json.dumps(r['alerts'], ensure_ascii=False)) for r in heat_rows]
+                )
+                cursor.executemany(
+                    "INSERT OR REPLACE INTO news_cursors (source, last_link, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)",
+                    list(cursors.items())
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Error saving news state: {e}")
+            return False
+
+    def load_news_state(self):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT symbol, score, last_updated, mentions, bullish_events, bearish_events, alerts FROM heat_snapshot")
+            heat_rows = []
+            for symbol, score, last_updated, mentions, bullish, bearish, alerts in cursor.fetchall():
+                heat_rows.append({
+                    'symbol': symbol,
+                    'score': score or 0.0,
+                    'last_updated': last_updated or 0.0,
+                    'mentions': mentions or 0,
+                    'bullish_events': bullish or 0,
+                    'bearish_events': bearish or 0,
+                    'alerts': json.loads(alerts) if alerts else []
+                })
+            cursor.execute("SELECT source, last_link FROM news_cursors")
+            cursors = {source: link for source, link in cursor.fetchall() if link}
+            return heat_rows, cursors
+        except Exception as e:
+            logger.error(f"Error loading news state: {e}")
+            return [], {}
+        finally:
+            conn.close()
+
     def _is_virtual_square_post(self, text):
         if not text:
             return True
@@ -262,33 +525,80 @@ class Database:
         if self._is_virtual_square_post(text):
             logger.warning(f"Rejected virtual square post: {str(text)[:120]}")
             return None
-        conn = self.get_connection()
-        cursor = conn.cursor()
         try:
-            try:
-                pass
-            except Exception:
-                pass
-            cursor.execute("""
-                SELECT id FROM square_queue
-                WHERE text = ?
-                AND (
-                    status = 'pending'
-                    OR (status = 'sent' AND sent_at IS NOT NULL AND sent_at >= datetime('now','-24 hours'))
-                )
-                LIMIT 1
-            """, (text,))
-            row = cursor.fetchone()
-            if row is not None:
-                return None
-            cursor.execute("INSERT INTO square_queue (text, status) VALUES (?, 'pending')", (text,))
-            conn.commit()
-            return cursor.lastrowid
+            # the duplicate check and the insert share one write transaction, so two threads
+            # queueing the same text cannot both pass the check
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT id FROM square_queue
+                    WHERE text = ?
+                    AND (
+                        status = 'pending'
+                        OR (status = 'sent' AND sent_at IS NOT NULL AND sent_at >= datetime('now','-24 hours'))
+                    )
+                    LIMIT 1
+                """, (text,))
+                row = cursor.fetchone()
+                if row is not None:
+                    return None
+                cursor.execute("INSERT INTO square_queue (text, status) VALUES (?, 'pending')", (text,))
+                return cursor.lastrowid
         except Exception as e:
             logger.error(f"Error adding square post: {e}")
             return None
-        finally:
-            conn.close()
+
+    def enqueue_posts(self, texts, approved=True):
+        """
+        add_square_post (plus mark_square_post_approved when approved) for many texts in one
+        transaction. Returns one id per text, None where the text was rejected as virtual or
+        is already pending / was sent in the last 24 hours (including earlier in this batch).
+        """
+        texts = list(texts)
+        wanted = []
+        seen = set()
+        for text in texts:
+            if text in seen:
+                continue
+            seen.add(text)
+            if self._is_virtual_square_post(text):
+                logger.warning(f"Rejected virtual square post: {str(text)[:120]}")
+                continue
+            wanted.append(text)
+        ids = {}
+        if wanted:
+            try:
+                with self.transaction() as conn:
+                    existing = set()
+                    for i in range(0, len(wanted), BATCH_ROWS):
+                        chunk = wanted[i:i + BATCH_ROWS]
+                        cursor = conn.execute(f"""
+                            SELECT text FROM square_queue
+                            WHERE text IN ({", ".join("?" * len(chunk))})
+                            AND (
+                                status = 'pending'
+                                OR (status = 'sent' AND sent_at IS NOT NULL AND sent_at >= datetime('now','-24 hours'))
+                            )
+                        """, chunk)
+                        existing.update(r[0] for r in cursor.fetchall())
+                    fresh = [t for t in wanted if t not in existing]
+                    flag = 1 if approved else 0
+                    for i in range(0, len(fresh), BATCH_ROWS):
+                        chunk = fresh[i:i + BATCH_ROWS]
+                        placeholders = ", ".join(["(?, 'pending', ?)"] * len(chunk))
+                        cursor = conn.execute(
+                            f"INSERT INTO square_queue (text, status, bot_approved) VALUES {placeholders} RETURNING id, text",
+                            [v for t in chunk for v in (t, flag)]
+                        )
+                        ids.update((text, post_id) for post_id, text in cursor.fetchall())
+            except Exception as e:
+                logger.error(f"Error enqueuing square posts: {e}")
+                return [None] * len(texts)
+        out = []
+        for text in texts:
+            # a repeated text only gets the id on its first occurrence
+            out.append(ids.pop(text, None))
+        return out
 
     def purge_virtual_pending_posts(self):
         conn = self.get_connection()
@@ -347,7 +657,7 @@ class Database:
         conn = self.get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute("UPDATE square_queue SET status = 'sent', sent_at = CURRENT_TIMESTAMP WHERE id = ?", (post_id,))
+            cursor.execute("UPDATE square_queue SET status = 'sent', sent_at = CURRENT_TIMESTAMP, lease_until = NULL WHERE id = ?", (post_id,))
             conn.commit()
         except Exception as e:
             logger.error(f"Error marking square post sent: {e}")
@@ -380,7 +690,7 @@ class Database:
         conn = self.get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute("UPDATE square_queue SET status = 'failed' WHERE id = ?", (post_id,))
+            cursor.execute("UPDATE square_queue SET status = 'failed', lease_until = NULL WHERE id = ?", (post_id,))
             conn.commit()
         except Exception as e:
             logger.error(f"Error marking square post failed: {e}")
@@ -0,0 +1,117 @@
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+class PooledConnection(sqlite3.Connection):
+    """
+    sqlite3 connection handed out by ConnectionManager. Callers written for
+    connect-per-call keep calling close(); here that only rolls back whatever they left
+    uncommitted (what closing would have done) and the connection stays open for the
+    next call on the same thread.
+    """
+
+    def close(self):
+        try:
+            if self.in_transaction:
+                self.rollback()
+        except sqlite3.ProgrammingError:
+            pass
+
+    def shutdown(self):
+        super().close()
+
+class ConnectionManager:
+    """
+    One long-lived SQLite connection per thread for one database file.
+
+    Connections open in WAL mode with synchronous=NORMAL, so readers never block the writer
+    and commits skip the per-transaction fsync of the rollback journal. busy_timeout makes
+    a writer wait for another writer (e.g. the Square worker) instead of failing with
+    'database is locked'. Because connections live as long as their thread, sqlite3's
+    per-connection statement cache (cached_statements) actually gets reused across calls.
+    """
+
+    def __init__(self, path, busy_timeout_ms=None, cache_size_kb=None, cached_statements=256):
+        self.path = path
+        self.busy_timeout_ms = Config.DB_BUSY_TIMEOUT_MS if busy_timeout_ms is None else busy_timeout_ms
+        self.cache_size_kb = Config.DB_CACHE_SIZE_KB if cache_size_kb is None else cache_size_kb
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._all = []
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            factory=PooledConnection,
+            cached_statements=self.cached_statements,
+            # each connection is only used by its own thread; close_all() shuts them from another
+            check_same_thread=False
+        )
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.OperationalError as e:
+            # e.g. another process holds the file in rollback mode right now; retry on the next connection
+            logger.warning(f"Could not switch {self.path} to WAL: {e}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA cache_size={-int(self.cache_size_kb)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        with self._lock:
+            self._all.append(conn)
+            self.opened += 1
+        return conn
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def transaction(self, immediate=True):
+        """
+        Explicit transaction scope on this thread's connection: commits when the block
+        exits, rolls back if it raises. BEGIN IMMEDIATE takes the write lock up front, so a
+        read-then-write block cannot fail halfway with SQLITE_BUSY. Nested scopes join the
+        outermost one.
+        """
+        conn = self.connection()
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+        if conn.in_transaction:
+            # leftover implicit transaction from a caller that never committed
+            conn.rollback()
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        self._local.depth = 1
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.depth = 0
+
+    def close_all(self):
+        with self._lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            try:
+                conn.shutdown()
+            except Exception:
+                pass
+        self._local = threading.local()
@@ -1,61 +1,118 @@
 import logging
-from .market_data import MarketDataEngine
+import asyncio
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+from .market_data import MarketDataEngine, AsyncMarketDataEngine
+from .market_stream import MarketStream
 from .news_scanner import NewsScanner
 from .whale_watcher import WhaleWatcher
+from .funding import FundingSnapshot
 from .config import Config
 
 logger = logging.getLogger(__name__)
 
+def stack_candles(views, bars):
+    """
+    Stacks CandleViews into (symbols x bars) close/volume matrices, left-padding short histories with NaN.
+    """
+    close = np.full((len(views), bars), np.nan)
+    volume = np.full((len(views), bars), np.nan)
+    for i, v in enumerate(views):
+        n = min(bars, len(v))
+        if n:
+            close[i, bars - n:] = v.close[-n:]
+            volume[i, bars - n:] = v.volume[-n:]
+    return close, volume
+
+def volume_scores(volume, window=20):
+    # latest bar vs its trailing `window`-bar mean, 0 when fewer than `window` bars exist
+    tail = volume[:, -window:]
+    full = (~np.isnan(tail)).sum(axis=1) == window
+    avg = np.where(full, np.nansum(tail, axis=1) / window, 0.0)
+    last = volume[:, -1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(avg > 0, last / avg * 100, 0.0)
+
+def volatilities(close):
+    # sample std (ddof=1) of bar-to-bar returns per row, NaN when fewer than two returns
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = close[:, 1:] / close[:, :-1] - 1.0
+        valid = ~np.isnan(returns)
+        n = valid.sum(axis=1)
+        mean = np.where(n > 0, np.nansum(returns, axis=1) / np.maximum(n, 1), np.nan)
+        dev = np.where(valid, returns - mean[:, None], 0.0)
+        return np.where(n >= 2, np.sqrt((dev ** 2).sum(axis=1) / np.maximum(n - 1, 1)), np.nan)
+
+def risk_levels(volatility):
+    return np.select([volatility > 0.05, volatility > 0.02], ['High', 'Medium'], default='Low')
+
 class SignalEngine:
     def __init__(self):
         self.market = MarketDataEngine()
-        self.news = NewsScanner()
-        self.whale = WhaleWatcher()
+        self.amarket = AsyncMarketDataEngine(candles=self.market.candles)
+        self.news = NewsScanner(market=self.market)
+        self.whale = WhaleWatcher(newsflash=self.news.newsflash)
+        self.funding = FundingSnapshot(self.market.fetch_all_funding_rates)
+        self._opportunity_pool = ThreadPoolExecutor(max_workers=Config.OPPORTUNITY_CONCURRENCY, thread_name_prefix="opportunities")
+        self._inflight = {}
+        self._opportunity_lock = threading.Lock()
+        self.stream = None
+        if Config.MARKET_STREAM_ENABLED:
+            syms = [s.strip() for s in Config.MARKET_STREAM_SYMBOLS.split(",") if s.strip()]
+            self.stream = MarketStream(syms, candles=self.market.candles)
+            self.market.stream = self.stream
+            self.amarket.stream = self.stream
+            self.funding.live = self.stream.funding_rates
+            self.stream.start()
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.stop()
+        self._opportunity_pool.shutdown(wait=False, cancel_futures=True)
+        self.news.close()
+        self.market.close()
+
+    async def aclose(self):
+        await self.amarket.close()
 
     def analyze_symbol(self, symbol):
         # 1. Get Market Data
-        df = self.market.fetch_ohlcv(symbol)
-        if df is None or df.empty:
+        candles = self.market.fetch_candles(symbol)
+        return self._build_signal(symbol, candles)
+
+    async def analyze_symbol_async(self, symbol):
+        # OHLCV is awaited on the async engine; news/whale scans are still blocking, so they run in a worker thread
+        candles = await self.amarket.fetch_candles(symbol)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._build_signal, symbol, candles)
+
+    def _build_signal(self, symbol, candles):
+        if candles is None or candles.empty:
             return None
             
         # 2. Market Anomaly Detection
-        # Check volume spike (latest volume vs moving average)
-        avg_volume = df['volume'].rolling(window=20).mean().iloc[-1]
-        current_volume = df['volume'].iloc[-1]
-        volume_score = (current_volume / avg_volume) * 100 if avg_volume > 0 else 0
+        # Check volume spike (latest volume vs 20-bar moving average)
+        volume_score = float(volume_scores(candles.volume[None, :])[0])
+        price = float(candles.close[-1])
+        
+        # 5. Risk Analysis (Simplified) -- all candle math is done before the news/whale I/O below
+        risk_level = self._calculate_risk(candles.close)
         
         # 3. News Analysis
         news_data = self.news.scan_news(symbol)
         
         # 4. Whale Analysis
-        whale_data = self.whale.scan_whale_activity(symbol)
-        try:
-            threshold = Config.WHALE_THRESHOLD_USD
-            if not whale_data or not whale_data.get('has_activity'):
-                pass
-            else:
-                flow = abs(whale_data.get('net_flow', 0))
-                if flow < threshold:
-                    whale_data = {
-                        'has_activity': False,
-                        'net_flow': 0,
-                        'whale_count': 0,
-                        'top_source': whale_data.get('top_source'),
-                        'summary': "暂无显著鲸鱼异动",
-                        'sentiment': whale_data.get('sentiment', 'neutral'),
-                        'details': ""
-                    }
-        except Exception:
-            pass
-        
-        # 5. Risk Analysis (Simplified)
-        risk_level = self._calculate_risk(df)
+        whale_data = self._filter_whale(self.whale.scan_whale_activity(symbol))
         
         # 6. Signal Generation Logic
-        
-        signal = {
+        return self._assemble_signal(symbol, price, volume_score, risk_level, news_data, whale_data)
+
+    def _assemble_signal(self, symbol, price, volume_score, risk_level, news_data, whale_data):
+        return {
             'symbol': symbol,
-            'price': df['close'].iloc[-1],
+            'price': price,
             'direction': news_data['sentiment'], # Simplified
             'heat_score': news_data['heat_score'],
             'volume_score': round(volume_score, 2),
@@ -64,71 +121,187 @@ class SignalEngine:
             'news_data': news_data,
             'whale_data': whale_data
         }
-        
-        return signal
-
-    def _calculate_risk(self, df):
-        # Simple volatility based risk
-        volatility = df['close'].pct_change().std()
-        if volatility > 0.05: # High volatility
-            return 'High'
-        elif volatility > 0.02:
-            return 'Medium'
-        else:
-            return 'Low'
-
-    def scan_market(self, symbols):
-        signals = []
-        for symbol in symbols:
-            sig = self.analyze_symbol(symbol)
-            if sig:
-                # Filter logic
-                if sig['heat_score'] > 50 or sig['volume_score'] > 150: # Thresholds
-                    signals.append(sig)
-        return signals
 
-    def generate_opportunities(self):
-        opps = []
-        try:
-            syms = [s.strip() for s in Config.FUNDING_SYMBOLS.split(",") if s.strip()]
-            for s in syms:
-                r = self.market.fetch_current_funding_rate(s)
-                if r is None:
-                    continue
-                if abs(r) >= Config.FUNDING_RATE_THRESHOLD:
-                    opps.append({
-                        'type': 'funding_rate_extreme',
-                        'symbol': s,
-                        'rate': r,
-                        'side': 'short' if r > 0 else 'long',
-                        'score': min(100, int(abs(r) / Config.FUNDING_RATE_THRESHOLD * 60))
-                    })
-        except Exception:
-            pass
-        try:
-            if getattr(Config, "ALPHA_MONITOR_ENABLED", True):
-                items = self.news.scan_binance_alpha_listings(limit=6)
-                for a in items:
-                    opps.append({
-                        'type': 'binance_alpha_listing',
-                        'title': a.get('title'),
-                        'link': a.get('link'),
-                        'score': 70
-                    })
-        except Exception:
-            pass
+    def _filter_whale(self, whale_data):
         try:
-            events = self.whale.scan_large_transfers()
-            for e in events:
-                opps.append({
-                    'type': 'large_transfer',
-                    'title': e.get('title'),
-                    'direction': e.get('direction'),
-                    'amount_usd': e.get('amount_usd'),
-                    'link': e.get('link'),
-                    'score': min(100, int((e.get('amount_usd') or 0) / (Config.LARGE_TRANSFER_THRESHOLD_USD or 1) * 50))
-                })
+            threshold = Config.WHALE_THRESHOLD_USD
+            if not whale_data or not whale_data.get('has_activity'):
+                return whale_data
+            flow = abs(whale_data.get('net_flow', 0))
+            if flow < threshold:
+                return {
+                    'has_activity': False,
+                    'net_flow': 0,
+                    'whale_count': 0,
+                    'top_source': whale_data.get('top_source'),
+                    'summary': "暂无显著鲸鱼异动",
+                    'sentiment': whale_data.get('sentiment', 'neutral'),
+                    'details': ""
+                }
         except Exception:
             pass
+        return whale_data
+
+    def _calculate_risk(self, close):
+        # Simple volatility based risk (sample std of bar-to-bar returns)
+        return str(risk_levels(volatilities(np.asarray(close, dtype=np.float64)[None, :]))[0])
+
+    def scan_market(self, symbols, limit=100):
+        """
+        Batch scan on the sync engine. Candles are fetched one symbol at a time: the sync ccxt
+        client and its rate limiter are not safe to share between threads. Bot coroutines use
+        scan_market_async, which overlaps the fetches on the async client.
+        """
+        symbols = list(symbols)
+        fetched = [self.market.fetch_candles(s, limit=limit) for s in symbols]
+        return self._rank_scan(symbols, fetched, limit)
+
+    async def scan_market_async(self, symbols, limit=100):
+        """
+        Batch scan with up to SCAN_CONCURRENCY candle requests in flight on the async engine. Its one
+        ccxt client (enableRateLimit) queues them through a single rate limiter, so the burst is
+        spaced out instead of hitting the exchange at once.
+        """
+        symbols = list(symbols)
+        if not symbols:
+            return []
+        gate = asyncio.Semaphore(max(1, Config.SCAN_CONCURRENCY))
+
+        async def fetch(symbol):
+            async with gate:
+                return await self.amarket.fetch_candles(symbol, limit=limit)
+
+        fetched = await asyncio.gather(*(fetch(s) for s in symbols))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._rank_scan, symbols, fetched, limit)
+
+    def _rank_scan(self, symbols, fetched, limit):
+        """
+        Stacks the fetched candles into (symbols x bars) matrices and computes volume score /
+        volatility / risk for every symbol in one NumPy pass. Only the per-symbol news heat and
+        whale lookups still run one symbol at a time (on a SCAN_CONCURRENCY pool).
+        """
+        pairs = [(s, c) for s, c in zip(symbols, fetched) if c is not None and not c.empty]
+        if not pairs:
+            return []
+        live = [s for s, _ in pairs]
+        views = [c for _, c in pairs]
+        close, volume = stack_candles(views, limit)
+        scores = volume_scores(volume)
+        risks = risk_levels(volatilities(close))
+        prices = np.array([v.close[-1] for v in views])
+        workers = max(1, min(Config.SCAN_CONCURRENCY, len(live)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            news = list(pool.map(self.news.scan_news, live))
+            # Filter logic: heat > 50 or volume > 150% of average
+            keep = [i for i, n in enumerate(news) if n['heat_score'] > 50 or scores[i] > 150]
+            whales = list(pool.map(lambda i: self._filter_whale(self.whale.scan_whale_activity(live[i])), keep))
+        return [
+            self._assemble_signal(live[i], float(prices[i]), float(scores[i]), str(risks[i]), news[i], w)
+            for i, w in zip(keep, whales)
+        ]
+
+    def generate_opportunities(self):
+        """
+        Runs the funding, Binance alpha and large-transfer sources concurrently, each under its own timeout.
+        Returns (opportunities, timed_out_sources). A source that misses its deadline is left running,
+        so the next call can pick up its result instead of starting it again. Each in-flight future
+        keeps its submit time: a finished result older than OPPORTUNITY_RESULT_MAX_AGE is dropped
+        and the source rerun, and one still running after OPPORTUNITY_INFLIGHT_MAX_AGE is abandoned
+        (the thread cannot be killed) and resubmitted.
+        """
+        jobs = [('funding', self._funding_opportunities)]
+        if getattr(Config, "ALPHA_MONITOR_ENABLED", True):
+            jobs.append(('alpha', self._alpha_opportunities))
+        jobs.append(('transfers', self._transfer_opportunities))
+        timeouts = {
+            'funding': Config.OPPORTUNITY_FUNDING_TIMEOUT,
+            'alpha': Config.OPPORTUNITY_ALPHA_TIMEOUT,
+            'transfers': Config.OPPORTUNITY_TRANSFER_TIMEOUT
+        }
+
+        started = time.monotonic()
+        pending = {}
+        with self._opportunity_lock:
+            for key, fn in jobs:
+                fut, submitted = self._inflight.get(key, (None, None))
+                if fut is not None:
+                    age = started - submitted
+                    if fut.done() and age > Config.OPPORTUNITY_RESULT_MAX_AGE:
+                        fut = None
+                    elif not fut.done() and age > Config.OPPORTUNITY_INFLIGHT_MAX_AGE:
+                        logger.warning(f"Opportunity source {key} still running after {age:.0f}s, resubmitting")
+                        fut.cancel()
+                        fut = None
+                if fut is None:
+                    fut = self._opportunity_pool.submit(fn)
+                    self._inflight[key] = (fut, started)
+                pending[fut] = key
+
+        opps = []
+        partial = set()
+        while pending:
+            now = time.monotonic() - started
+            for fut, key in list(pending.items()):
+                if not fut.done() and now >= timeouts[key]:
+                    partial.add(key)
+                    del pending[fut]
+            if not pending:
+                break
+            wait_for = min(timeouts[key] for key in pending.values()) - now
+            done, _ = wait(list(pending), timeout=max(0.0, wait_for), return_when=FIRST_COMPLETED)
+            for fut in done:
+                key = pending.pop(fut)
+                with self._opportunity_lock:
+                    if self._inflight.get(key, (None,))[0] is fut:
+                        del self._inflight[key]
+                try:
+                    opps.extend(fut.result() or [])
+                except Exception as e:
+                    logger.error(f"Opportunity source {key} failed: {e}")
+        if partial:
+            logger.warning(f"generate_opportunities returned partial results, timed out: {', '.join(sorted(partial))}")
         opps.sort(key=lambda x: x.get('score', 0), reverse=True)
-        return opps[:10]
+        return opps[:10], sorted(partial)
+
+    def _funding_opportunities(self):
+        rates = self.funding.rates()
+        opps = []
+        for s in [s.strip() for s in Config.FUNDING_SYMBOLS.split(",") if s.strip()]:
+            r = rates.get(s.upper().replace("/", ""))
+            if r is None or abs(r) < Config.FUNDING_RATE_THRESHOLD:
+                continue
+            score = abs(r) / Config.FUNDING_RATE_THRESHOLD * 60
+            change = self.funding.rate_of_change(s)
+            if change is not None and change * r > 0:
+                # rate still moving further from zero: up to +20 for a threshold-sized move per hour
+                score += min(20, abs(change) / Config.FUNDING_RATE_THRESHOLD * 20)
+            opps.append({
+                'type': 'funding_rate_extreme',
+                'symbol': s,
+                'rate': r,
+                'rate_change_per_hour': change,
+                'side': 'short' if r > 0 else 'long',
+                'score': min(100, int(score))
+            })
+        return opps
+
+    def _alpha_opportunities(self):
+        items = self.news.scan_binance_alpha_listings(limit=6)
+        return [{
+            'type': 'binance_alpha_listing',
+            'title': a.get('title'),
+            'link': a.get('link'),
+            'score': 70
+        } for a in items]
+
+    def _transfer_opportunities(self):
+        events = self.whale.scan_large_transfers()
+        return [{
+            'type': 'large_transfer',
+            'title': e.get('title'),
+            'direction': e.get('direction'),
+            'amount_usd': e.get('amount_usd'),
+            'link': e.get('link'),
+            'score': min(100, int((e.get('amount_usd') or 0) / (Config.LARGE_TRANSFER_THRESHOLD_USD or 1) * 50))
+        } for e in events]
@@ -0,0 +1,171 @@
+import re
+from collections import deque
+try:
+    import re._parser as sre_parse
+    import re._constants as sre_constants
+except ImportError:
+    import sre_parse
+    import sre_constants
+
+# characters re.IGNORECASE matches to an ASCII letter that str.lower() does not map there
+_FOLD = str.maketrans({'ſ': 's', 'ı': 'i', 'İ': 'i'})
+
+def _fold(text):
+    return text.translate(_FOLD).lower()
+
+def _literal_run(items):
+    best = ''
+    run = ''
+    for op, av in items:
+        ch = chr(av) if op is sre_constants.LITERAL else None
+        # only ASCII or caseless (e.g. CJK) characters, so lowercasing both sides is exact under IGNORECASE
+        if ch is not None and (ch.isascii() or ch.lower() == ch.upper()):
+            run += ch
+        elif op is sre_constants.AT:
+            continue
+        else:
+            if len(run) > len(best):
+                best = run
+            run = ''
+    return (run if len(run) > len(best) else best).lower()
+
+def literal_anchors(pattern):
+    """
+    Literal substrings one of which must occur (case-folded) in any text the pattern matches:
+    the longest literal run of each top-level branch. None when some branch has no literal.
+    """
+    try:
+        tree = sre_parse.parse(pattern, re.IGNORECASE)
+    except Exception:
+        return None
+    items = list(tree)
+    if len(items) == 1 and items[0][0] is sre_constants.BRANCH:
+        branches = [list(b) for b in items[0][1][1]]
+    else:
+        branches = [items]
+    anchors = []
+    for b in branches:
+        a = _literal_run(b)
+        if not a:
+            return None
+        anchors.append(a)
+    return anchors
+
+class LiteralAutomaton:
+    """
+    Aho-Corasick automaton over literal keywords: one pass over the text finds every
+    keyword id that occurs, whatever the number of keywords.
+    """
+    __slots__ = ('_goto', '_fail', '_out')
+
+    def __init__(self, keywords):
+        goto = [{}]
+        out = [set()]
+        for kid, word in keywords:
+            node = 0
+            for ch in word:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    out.append(set())
+                node = nxt
+            out[node].add(kid)
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                out[nxt] |= out[fail[nxt]]
+        self._goto = goto
+        self._fail = fail
+        self._out = [frozenset(o) for o in out]
+
+    def find(self, text):
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        node = 0
+        found = set()
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found |= out[node]
+        return found
+
+class EventMatcher:
+    """
+    Precompiled matcher for NewsScanner.event_rules.
+
+    Every pattern is compiled once, and its required literal (see literal_anchors) goes
+    into one Aho-Corasick automaton. Per article, a single pass over the case-folded text
+    finds the patterns whose literal occurs. Only those patterns, plus any without a
+    literal, run their regex, so the cost stays flat as rules grow. Hits equal running
+    every pattern with re.search(..., re.IGNORECASE).
+    """
+
+    def __init__(self, rules):
+        self.rules = [dict(r) for r in rules]
+        self._patterns = []
+        self._always = []
+        keywords = []
+        for ri, rule in enumerate(self.rules):
+            for pat in rule['patterns']:
+                pid = len(self._patterns)
+                self._patterns.append((ri, re.compile(pat, re.IGNORECASE)))
+                anchors = literal_anchors(pat)
+                if anchors is None:
+                    self._always.append(pid)
+                else:
+                    keywords.extend((pid, a) for a in anchors)
+        self._automaton = LiteralAutomaton(keywords)
+
+    @property
+    def pattern_count(self):
+        return len(self._patterns)
+
+    def matched_rules(self, text):
+        """
+        Indexes of the rules with at least one pattern in text, in rule order.
+        """
+        if not text or not self._patterns:
+            return []
+        candidates = self._automaton.find(_fold(text))
+        candidates.update(self._always)
+        found = set()
+        for pid in sorted(candidates):
+            ri, regex = self._patterns[pid]
+            if ri not in found and regex.search(text):
+                found.add(ri)
+        return sorted(found)
+
+    def detect(self, text):
+        net_score = 0
+        bullish_hits = 0
+        bearish_hits = 0
+        alerts = []
+        for i in self.matched_rules(text):
+            rule = self.rules[i]
+            if rule['kind'] == 'bullish':
+                net_score += rule['weight']
+                bullish_hits += 1
+                alerts.append(f"利好:{rule['label']}")
+            else:
+                net_score -= rule['weight']
+                bearish_hits += 1
+                alerts.append(f"利空:{rule['label']}")
+        return {
+            'net_score': net_score,
+            'bullish_hits': bullish_hits,
+            'bearish_hits': bearish_hits,
+            'alerts': alerts[:4]
+        }
@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+import feedparser
+from .config import Config
+from .market_data import build_http_client
+
+logger = logging.getLogger(__name__)
+
+class FeedResult:
+    __slots__ = ('url', 'status', 'entries', 'not_modified', 'elapsed')
+
+    def __init__(self, url, status, entries, not_modified=False, elapsed=0.0):
+        self.url = url
+        self.status = status
+        self.entries = entries
+        self.not_modified = not_modified
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return bool(self.entries)
+
+class FeedFetcher:
+    """
+    Fetches many RSS/Atom feeds at once over one pooled HTTP client.
+
+    ETag / Last-Modified from each 200 are sent back as If-None-Match / If-Modified-Since,
+    and only 200 bodies go through feedparser. A 304 hands back the entries parsed last
+    time, so callers can treat both the same way. fetch_many() waits at most timeout
+    seconds overall: a feed that has not answered by then counts as failed for this round.
+    """
+
+    def __init__(self, timeout=None, max_workers=None):
+        self.timeout = timeout or Config.FEED_FETCH_TIMEOUT
+        self.http = build_http_client(timeout=self.timeout)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or Config.FEED_FETCH_CONCURRENCY, thread_name_prefix="feeds")
+        self._validators = {}
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        try:
+            self.http.close()
+        except Exception as e:
+            logger.error(f"Error closing feed HTTP client: {e}")
+
+    def fetch(self, url):
+        start = time.perf_counter()
+        with self._lock:
+            validators = dict(self._validators.get(url) or {})
+            cached = self._entries.get(url, [])
+            self.requests += 1
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('modified'):
+            headers['If-Modified-Since'] = validators['modified']
+        try:
+            r = self.http.get(url, headers=headers, follow_redirects=True)
+        except Exception as e:
+            logger.warning(f"Feed request failed ({url}): {e}")
+            return FeedResult(url, None, [], elapsed=time.perf_counter() - start)
+        if r.status_code == 304:
+            with self._lock:
+                self.not_modified += 1
+            return FeedResult(url, 304, cached, not_modified=True, elapsed=time.perf_counter() - start)
+        if r.status_code != 200:
+            return FeedResult(url, r.status_code, [], elapsed=time.perf_counter() - start)
+        feed = feedparser.parse(r.content)
+        entries = list(getattr(feed, "entries", None) or [])
+        with self._lock:
+            if entries:
+                self._entries[url] = entries
+                self._validators[url] = {'etag': r.headers.get('ETag'), 'modified': r.headers.get('Last-Modified')}
+            else:
+                # don't keep validators for a body we could not use, or the next 304 would hide the feed
+                self._entries.pop(url, None)
+                self._validators.pop(url, None)
+        return FeedResult(url, 200, entries, elapsed=time.perf_counter() - start)
+
+    def fetch_many(self, urls, extra=None):
+        """
+        Fetches every url concurrently and returns {url: FeedResult}. extra maps names to
+        zero-argument callables run on the same pool (e.g. HTML page scrapers); their return
+        values come back under the same names, or None if they failed or timed out.
+        """
+        futures = {}
+        for url in dict.fromkeys(urls):
+            futures[self._pool.submit(self.fetch, url)] = ('feed', url)
+        for name, fn in (extra or {}).items():
+            futures[self._pool.submit(fn)] = ('extra', name)
+        done, _ = wait(list(futures), timeout=self.timeout + 2)
+        results = {}
+        for fut, (kind, key) in futures.items():
+            value = None
+            if fut in done:
+                try:
+                    value = fut.result()
+                except Exception as e:
+                    logger.error(f"Error fetching {key}: {e}")
+            else:
+                logger.warning(f"Timed out fetching {key}")
+            if kind == 'feed' and value is None:
+                value = FeedResult(key, None, [])
+            results[key] = value
+        return results
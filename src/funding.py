@@ -0,0 +1,88 @@
+import logging
+import threading
+import time
+from collections import deque
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+class FundingSnapshot:
+    """
+    TTL-cached view of every perpetual's lastFundingRate from one bulk premiumIndex request.
+
+    Readers share the snapshot instead of calling premiumIndex per symbol. Each refresh is
+    also appended to a bounded per-symbol history for rate-of-change scoring. Async callers
+    run refresh() in an executor so they share its lock with the sync readers. If `live` is
+    set (MarketStream.funding_rates), its fresh per-second markPrice rates override the
+    snapshot for the streamed symbols; they do not go into the history.
+    """
+
+    def __init__(self, fetch_all, ttl=None, history_len=None, live=None):
+        self.fetch_all = fetch_all
+        self.live = live
+        self.ttl = Config.FUNDING_SNAPSHOT_TTL if ttl is None else ttl
+        self.history_len = history_len or Config.FUNDING_HISTORY_LEN
+        self._rates = {}
+        self._fetched_at = 0.0
+        self._history = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def is_stale(self):
+        return time.time() - self._fetched_at >= self.ttl
+
+    def ingest(self, rates, ts=None):
+        if not rates:
+            return
+        ts = ts or time.time()
+        with self._lock:
+            self._rates = dict(rates)
+            self._fetched_at = ts
+            for sym, rate in rates.items():
+                hist = self._history.get(sym)
+                if hist is None:
+                    hist = self._history[sym] = deque(maxlen=self.history_len)
+                hist.append((ts, rate))
+
+    def refresh(self):
+        # one refresher at a time; concurrent readers wait and then reuse its result
+        with self._refresh_lock:
+            if not self.is_stale():
+                return
+            try:
+                self.ingest(self.fetch_all())
+            except Exception as e:
+                logger.error(f"Error refreshing funding snapshot: {e}")
+
+    def rates(self, refresh=True):
+        if refresh and self.is_stale():
+            self.refresh()
+        with self._lock:
+            rates = dict(self._rates)
+        if self.live is not None:
+            rates.update((sym, r) for sym, r in self.live().items() if r is not None)
+        return rates
+
+    def rate(self, symbol, refresh=True):
+        return self.rates(refresh=refresh).get(symbol.upper().replace("/", ""))
+
+    def history(self, symbol):
+        with self._lock:
+            return list(self._history.get(symbol.upper().replace("/", ""), ()))
+
+    def rate_of_change(self, symbol, window_seconds=3600):
+        """
+        Change in funding rate per hour over the last window_seconds of history, None with fewer than two points.
+        """
+        hist = self.history(symbol)
+        if len(hist) < 2:
+            return None
+        latest_ts, latest = hist[-1]
+        start_ts, start = hist[0]
+        for ts, rate in hist:
+            if latest_ts - ts <= window_seconds:
+                start_ts, start = ts, rate
+                break
+        if latest_ts <= start_ts:
+            return None
+        return (latest - start) / ((latest_ts - start_ts) / 3600.0)
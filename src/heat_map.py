@@ -0,0 +1,176 @@
+import heapq
+import math
+import threading
+import time
+from .config import Config
+
+class HeatEntry:
+    __slots__ = ('symbol', 'score', 'last_updated', 'mentions', 'bullish_events', 'bearish_events', 'alerts', 'seq')
+
+    def __init__(self, symbol, score=0.0, last_updated=0.0, mentions=0, bullish_events=0, bearish_events=0, alerts=()):
+        self.symbol = symbol
+        self.score = score
+        self.last_updated = last_updated
+        self.mentions = mentions
+        self.bullish_events = bullish_events
+        self.bearish_events = bearish_events
+        self.alerts = tuple(alerts)
+        self.seq = 0
+
+    def as_dict(self, score=None):
+        return {
+            'symbol': self.symbol,
+            'score': self.score if score is None else score,
+            'last_updated': self.last_updated,
+            'mentions': self.mentions,
+            'bullish_events': self.bullish_events,
+            'bearish_events': self.bearish_events,
+            'alerts': list(self.alerts)
+        }
+
+def _merge_alerts(new, old, limit):
+    # newest first, each alert once, at most limit kept
+    merged = dict.fromkeys(new)
+    for a in old:
+        if len(merged) >= limit:
+            break
+        merged.setdefault(a, None)
+    return tuple(merged)[:limit]
+
+class HeatMap:
+    """
+    Per-symbol news heat with exponential decay (half-life in hours).
+
+    Entries store the score at their last update; the current value is computed on read
+    as score * exp(-decay * age), so nothing is rewritten as time passes. Since every
+    score decays at the same rate, ordering by log(score) + decay * last_updated never
+    changes between updates, which is what the top() heap is keyed on. Heap items go
+    stale when a symbol is updated again and are skipped lazily. Symbols not mentioned
+    for ttl seconds, or whose heat has decayed to nothing, are evicted.
+    """
+
+    def __init__(self, half_life_hours=None, ttl=None, max_alerts=6, cap=100.0):
+        half_life = half_life_hours or Config.HEAT_HALF_LIFE_HOURS
+        self.decay = math.log(2) / (half_life * 3600.0)
+        self.ttl = Config.HEAT_TTL_HOURS * 3600.0 if ttl is None else ttl
+        self.max_alerts = max_alerts
+        self.cap = cap
+        self.min_score = 0.5
+        self._entries = {}
+        self._heap = []
+        self._lock = threading.Lock()
+        self._next_evict = 0.0
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, symbol):
+        return symbol in self._entries
+
+    @property
+    def version(self):
+        # bumps on every add/put, so snapshot writers can skip unchanged maps
+        return self._seq
+
+    def _current(self, entry, now):
+        age = max(0.0, now - entry.last_updated)
+        return entry.score * math.exp(-self.decay * age)
+
+    def _rank_key(self, entry):
+        if entry.score <= 0:
+            return -math.inf
+        return math.log(entry.score) + self.decay * entry.last_updated
+
+    def _push(self, entry):
+        self._seq += 1
+        entry.seq = self._seq
+        heapq.heappush(self._heap, (-self._rank_key(entry), entry.seq, entry.symbol))
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [(-self._rank_key(e), e.seq, e.symbol) for e in self._entries.values()]
+            heapq.heapify(self._heap)
+
+    def score(self, symbol, now=None):
+        entry = self._entries.get(symbol)
+        if entry is None:
+            return 0.0
+        return self._current(entry, time.time() if now is None else now)
+
+    def get(self, symbol, now=None):
+        """
+        Snapshot dict of the entry with the decayed score, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is None:
+                return None
+            return entry.as_dict(self._current(entry, time.time() if now is None else now))
+
+    def add(self, symbol, boost, bullish=0, bearish=0, alerts=(), now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is None:
+                entry = self._entries[symbol] = HeatEntry(symbol, last_updated=now)
+            entry.score = min(self.cap, self._current(entry, now) + boost)
+            entry.last_updated = now
+            entry.mentions += 1
+            entry.bullish_events += bullish
+            entry.bearish_events += bearish
+            if alerts:
+                entry.alerts = _merge_alerts(alerts, entry.alerts, self.max_alerts)
+            self._push(entry)
+            self._maybe_evict(now)
+
+    def put(self, symbol, score, mentions=0, bullish_events=0, bearish_events=0, alerts=(), last_updated=None):
+        """
+        Replaces a symbol's entry outright (seeding from a search, or restoring a snapshot).
+        """
+        now = time.time() if last_updated is None else last_updated
+        entry = HeatEntry(symbol, min(self.cap, score), now, mentions, bullish_events, bearish_events, tuple(alerts)[:self.max_alerts])
+        with self._lock:
+            self._entries[symbol] = entry
+            self._push(entry)
+
+    def top(self, k=10, now=None):
+        """
+        The k hottest symbols as (symbol, current_score), hottest first.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            picked = []
+            while self._heap and len(picked) < k:
+                item = heapq.heappop(self._heap)
+                _, seq, symbol = item
+                entry = self._entries.get(symbol)
+                if entry is None or entry.seq != seq or entry.score <= 0:
+                    continue
+                picked.append(item)
+            for item in picked:
+                heapq.heappush(self._heap, item)
+            return [(symbol, self._current(self._entries[symbol], now)) for _, _, symbol in picked]
+
+    def snapshot(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            return [e.as_dict() for e in self._entries.values() if now - e.last_updated <= self.ttl]
+
+    def evict(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            return self._evict(now)
+
+    def _maybe_evict(self, now):
+        if now >= self._next_evict:
+            self._evict(now)
+
+    def _evict(self, now):
+        # zero-score entries (searched, nothing found) stay until ttl so the search is not repeated
+        cold = [
+            s for s, e in self._entries.items()
+            if now - e.last_updated > self.ttl or (e.score > 0 and self._current(e, now) < self.min_score)
+        ]
+        for s in cold:
+            del self._entries[s]
+        self._next_evict = now + 300
+        return len(cold)
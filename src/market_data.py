@@ -1,43 +1,166 @@
 import ccxt
-import pandas as pd
+import ccxt.async_support as ccxt_async
 import logging
 import httpx
+from .config import Config
+from .candle_cache import CandleCache
+from .candle_store import CandleView
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except Exception:
+    HTTP2_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+FAPI_BASE_URL = "https://fapi.binance.com"
+
+def _http_limits():
+    return httpx.Limits(
+        max_connections=Config.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=Config.HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY
+    )
+
+def build_http_client(timeout=10, base_url=""):
+    """
+    Long-lived pooled client: keep-alive, per-host connection limits and HTTP/2 when h2 is installed.
+    """
+    return httpx.Client(
+        base_url=base_url,
+        timeout=timeout,
+        limits=_http_limits(),
+        http2=HTTP2_AVAILABLE,
+        headers={"User-Agent": "Mozilla/5.0"}
+    )
+
+def build_async_http_client(timeout=10, base_url=""):
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=timeout,
+        limits=_http_limits(),
+        http2=HTTP2_AVAILABLE,
+        headers={"User-Agent": "Mozilla/5.0"}
+    )
+
+def _spot_usdt_symbols(markets, limit):
+    symbols = [
+        s for s, m in markets.items()
+        if m.get('quote') == 'USDT'
+        and m.get('active') != False
+        and m.get('spot') is True
+        and ":" not in s
+    ]
+    symbols.sort()
+    return symbols[:limit]
+
+def _parse_funding_rate(data):
+    v = data.get("lastFundingRate")
+    if v is None:
+        return None
+    return float(v)
+
+def _parse_futures_usdt_pairs(data, limit):
+    symbols = []
+    for item in data.get("symbols", []):
+        if item.get("quoteAsset") != "USDT":
+            continue
+        if item.get("contractType") != "PERPETUAL":
+            continue
+        if item.get("status") != "TRADING":
+            continue
+        sym = item.get("symbol")
+        if not sym:
+            continue
+        symbols.append(sym.upper())
+    symbols.sort()
+    return symbols[:limit]
+
+def _parse_funding_rates(data):
+    rates = {}
+    if isinstance(data, dict):
+        sym = data.get("symbol")
+        val = data.get("lastFundingRate")
+        if sym and val is not None:
+            rates[str(sym).upper()] = float(val)
+        return rates
+    for row in data or []:
+        sym = row.get("symbol")
+        val = row.get("lastFundingRate")
+        if not sym or val is None:
+            continue
+        rates[str(sym).upper()] = float(val)
+    return rates
+
+def _parse_quote_volumes(data):
+    volumes = {}
+    rows = data if isinstance(data, list) else [data]
+    for row in rows:
+        sym = row.get("symbol")
+        v = row.get("quoteVolume")
+        if not sym or v is None:
+            continue
+        try:
+            volumes[str(sym).upper()] = float(v)
+        except Exception:
+            continue
+    return volumes
+
 class MarketDataEngine:
-    def __init__(self):
-        self.exchange = ccxt.binance()
+    def __init__(self, candles=None):
+        self.exchange = ccxt.binance({'enableRateLimit': True})
+        self.http = build_http_client(base_url=FAPI_BASE_URL)
+        self.candles = candles or CandleCache()
+        self.stream = None
+
+    def close(self):
+        try:
+            self.http.close()
+        except Exception as e:
+            logger.error(f"Error closing market HTTP client: {e}")
+        try:
+            session = getattr(self.exchange, "session", None)
+            if session is not None:
+                session.close()
+        except Exception:
+            pass
 
     def fetch_ohlcv(self, symbol, timeframe='15m', limit=100):
+        candles = self.fetch_candles(symbol, timeframe, limit)
+        return candles.to_frame() if candles is not None else None
+
+    def fetch_candles(self, symbol, timeframe='15m', limit=100):
         try:
-            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            return df
+            return self._fetch_candle_view(symbol, timeframe, limit)
         except Exception as e:
             logger.error(f"Error fetching OHLCV for {symbol}: {e}")
             return None
 
+    def _fetch_candle_view(self, symbol, timeframe, limit):
+        if limit > self.candles.capacity:
+            return CandleView.from_rows(self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit))
+        view, since = self.candles.plan(symbol, timeframe, limit)
+        if view is not None:
+            return view
+        fresh = self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=self.candles.capacity)
+        return self.candles.merge(symbol, timeframe, fresh, since, limit)
+
     def get_ticker(self, symbol):
+        if self.stream is not None:
+            ticker = self.stream.get_ticker(symbol)
+            if ticker:
+                return ticker
         try:
             return self.exchange.fetch_ticker(symbol)
         except Exception as e:
             logger.error(f"Error fetching ticker for {symbol}: {e}")
             return None
 
-    def list_usdt_pairs(self, limit=100):
+    def list_usdt_pairs(self, limit=100, reload=False):
         try:
-            markets = self.exchange.load_markets()
-            symbols = [
-                s for s, m in markets.items()
-                if m.get('quote') == 'USDT'
-                and m.get('active') != False
-                and m.get('spot') is True
-                and ":" not in s
-            ]
-            symbols.sort()
-            return symbols[:limit]
+            # ccxt serves its cached market list unless asked to reload
+            markets = self.exchange.load_markets(reload=reload)
+            return _spot_usdt_symbols(markets, limit)
         except Exception as e:
             logger.error(f"Error loading markets: {e}")
             return []
@@ -45,94 +168,153 @@ class MarketDataEngine:
     def fetch_current_funding_rate(self, symbol):
         if not symbol:
             return None
+        if self.stream is not None:
+            rate = self.stream.get_funding_rate(symbol)
+            if rate is not None:
+                return rate
         try:
             base = symbol.upper().replace("/", "")
-            url = f"https://fapi.binance.com/fapi/v1/premiumIndex?symbol={base}"
-            with httpx.Client(timeout=8) as client:
-                r = client.get(url, headers={"User-Agent": "Mozilla/5.0"})
-                if r.status_code != 200:
-                    return None
-                data = r.json()
-                v = data.get("lastFundingRate")
-                if v is None:
-                    return None
-                return float(v)
+            r = self.http.get("/fapi/v1/premiumIndex", params={"symbol": base}, timeout=8)
+            if r.status_code != 200:
+                return None
+            return _parse_funding_rate(r.json())
         except Exception as e:
             logger.error(f"Error fetching funding rate for {symbol}: {e}")
             return None
 
     def list_futures_usdt_pairs(self, limit=1000):
         try:
-            url = "https://fapi.binance.com/fapi/v1/exchangeInfo"
-            with httpx.Client(timeout=10) as client:
-                r = client.get(url, headers={"User-Agent": "Mozilla/5.0"})
-                if r.status_code != 200:
-                    return []
-                data = r.json()
-            symbols = []
-            for item in data.get("symbols", []):
-                if item.get("quoteAsset") != "USDT":
-                    continue
-                if item.get("contractType") != "PERPETUAL":
-                    continue
-                if item.get("status") != "TRADING":
-                    continue
-                sym = item.get("symbol")
-                if not sym:
-                    continue
-                symbols.append(sym.upper())
-            symbols.sort()
-            return symbols[:limit]
+            r = self.http.get("/fapi/v1/exchangeInfo")
+            if r.status_code != 200:
+                return []
+            return _parse_futures_usdt_pairs(r.json(), limit)
         except Exception as e:
             logger.error(f"Error loading futures markets: {e}")
             return []
 
     def fetch_all_funding_rates(self):
         try:
-            url = "https://fapi.binance.com/fapi/v1/premiumIndex"
-            with httpx.Client(timeout=10) as client:
-                r = client.get(url, headers={"User-Agent": "Mozilla/5.0"})
-                if r.status_code != 200:
-                    return {}
-                data = r.json()
-            rates = {}
-            if isinstance(data, dict):
-                sym = data.get("symbol")
-                val = data.get("lastFundingRate")
-                if sym and val is not None:
-                    rates[str(sym).upper()] = float(val)
-                return rates
-            for row in data or []:
-                sym = row.get("symbol")
-                val = row.get("lastFundingRate")
-                if not sym or val is None:
-                    continue
-                rates[str(sym).upper()] = float(val)
-            return rates
+            r = self.http.get("/fapi/v1/premiumIndex")
+            if r.status_code != 200:
+                return {}
+            return _parse_funding_rates(r.json())
         except Exception as e:
             logger.error(f"Error fetching all funding rates: {e}")
             return {}
 
     def fetch_futures_24h_quote_volumes(self):
         try:
-            url = "https://fapi.binance.com/fapi/v1/ticker/24hr"
-            with httpx.Client(timeout=10) as client:
-                r = client.get(url, headers={"User-Agent": "Mozilla/5.0"})
-                if r.status_code != 200:
-                    return {}
-                data = r.json()
-            volumes = {}
-            rows = data if isinstance(data, list) else [data]
-            for row in rows:
-                sym = row.get("symbol")
-                v = row.get("quoteVolume")
-                if not sym or v is None:
-                    continue
-                try:
-                    volumes[str(sym).upper()] = float(v)
-                except Exception:
-                    continue
-            return volumes
+            r = self.http.get("/fapi/v1/ticker/24hr")
+            if r.status_code != 200:
+                return {}
+            return _parse_quote_volumes(r.json())
+        except Exception as e:
+            logger.error(f"Error fetching futures 24h quote volumes: {e}")
+            return {}
+
+class AsyncMarketDataEngine:
+    """
+    Awaitable twin of MarketDataEngine (ccxt.async_support + httpx.AsyncClient) for use inside bot coroutines.
+    """
+
+    def __init__(self, candles=None):
+        self.exchange = ccxt_async.binance({'enableRateLimit': True})
+        self.http = build_async_http_client(base_url=FAPI_BASE_URL)
+        self.candles = candles or CandleCache()
+        self.stream = None
+
+    async def close(self):
+        try:
+            await self.http.aclose()
+        except Exception as e:
+            logger.error(f"Error closing async market HTTP client: {e}")
+        try:
+            await self.exchange.close()
+        except Exception as e:
+            logger.error(f"Error closing async exchange: {e}")
+
+    async def fetch_ohlcv(self, symbol, timeframe='15m', limit=100):
+        candles = await self.fetch_candles(symbol, timeframe, limit)
+        return candles.to_frame() if candles is not None else None
+
+    async def fetch_candles(self, symbol, timeframe='15m', limit=100):
+        try:
+            return await self._fetch_candle_view(symbol, timeframe, limit)
+        except Exception as e:
+            logger.error(f"Error fetching OHLCV for {symbol}: {e}")
+            return None
+
+    async def _fetch_candle_view(self, symbol, timeframe, limit):
+        if limit > self.candles.capacity:
+            return CandleView.from_rows(await self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit))
+        view, since = self.candles.plan(symbol, timeframe, limit)
+        if view is not None:
+            return view
+        fresh = await self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=self.candles.capacity)
+        return self.candles.merge(symbol, timeframe, fresh, since, limit)
+
+    async def get_ticker(self, symbol):
+        if self.stream is not None:
+            ticker = self.stream.get_ticker(symbol)
+            if ticker:
+                return ticker
+        try:
+            return await self.exchange.fetch_ticker(symbol)
+        except Exception as e:
+            logger.error(f"Error fetching ticker for {symbol}: {e}")
+            return None
+
+    async def list_usdt_pairs(self, limit=100, reload=False):
+        try:
+            markets = await self.exchange.load_markets(reload=reload)
+            return _spot_usdt_symbols(markets, limit)
+        except Exception as e:
+            logger.error(f"Error loading markets: {e}")
+            return []
+
+    async def fetch_current_funding_rate(self, symbol):
+        if not symbol:
+            return None
+        if self.stream is not None:
+            rate = self.stream.get_funding_rate(symbol)
+            if rate is not None:
+                return rate
+        try:
+            base = symbol.upper().replace("/", "")
+            r = await self.http.get("/fapi/v1/premiumIndex", params={"symbol": base}, timeout=8)
+            if r.status_code != 200:
+                return None
+            return _parse_funding_rate(r.json())
+        except Exception as e:
+            logger.error(f"Error fetching funding rate for {symbol}: {e}")
+            return None
+
+    async def list_futures_usdt_pairs(self, limit=1000):
+        try:
+            r = await self.http.get("/fapi/v1/exchangeInfo")
+            if r.status_code != 200:
+                return []
+            return _parse_futures_usdt_pairs(r.json(), limit)
+        except Exception as e:
+            logger.error(f"Error loading futures markets: {e}")
+            return []
+
+    async def fetch_all_funding_rates(self):
+        try:
+            r = await self.http.get("/fapi/v1/premiumIndex")
+            if r.status_code != 200:
+                return {}
+            return _parse_funding_rates(r.json())
+        except Exception as e:
+            logger.error(f"Error fetching all funding rates: {e}")
+            return {}
+
+    async def fetch_futures_24h_quote_volumes(self):
+        try:
+            r = await self.http.get("/fapi/v1/ticker/24hr")
+            if r.status_code != 200:
+                return {}
+            return _parse_quote_volumes(r.json())
         except Exception as e:
             logger.error(f"Error fetching futures 24h quote volumes: {e}")
             return {}
@@ -0,0 +1,289 @@
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+import aiohttp
+from aiohttp import web
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+def _stream_id(symbol):
+    return symbol.replace('/', '').split(':')[0].lower()
+
+class MarketStream:
+    """
+    Keeps tickers, mark price/funding and the open kline current from Binance combined streams.
+
+    Spot kline + miniTicker frames come from spot_url, markPrice frames from futures_url.
+    Both can point at a ReplayServer for offline runs. Runs its own event loop on a daemon
+    thread so the sync MarketDataEngine getters can read the state without awaiting.
+    """
+
+    def __init__(self, symbols, candles=None, timeframe=None, spot_url=None, futures_url=None, record_path=None):
+        self.symbols = {_stream_id(s): s for s in symbols}
+        self.candles = candles
+        self.timeframe = timeframe or Config.DEFAULT_TIMEFRAME
+        self.spot_url = (spot_url or Config.STREAM_SPOT_URL).rstrip('/')
+        self.futures_url = (futures_url or Config.STREAM_FUTURES_URL).rstrip('/')
+        self.record_path = record_path if record_path is not None else Config.STREAM_RECORD_PATH
+        self.stale_after = Config.MARKET_STREAM_STALE_SECONDS
+        self.tickers = {}
+        self.marks = {}
+        self.frames = 0
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._stopping = False
+        self._record_file = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._thread_main, name="market-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stopping = True
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(lambda: [t.cancel() for t in asyncio.all_tasks(loop)])
+            except RuntimeError:
+                pass
+        if self._thread:
+            self._thread.join(timeout)
+        if self._record_file:
+            try:
+                self._record_file.close()
+            except Exception:
+                pass
+            self._record_file = None
+
+    def get_ticker(self, symbol):
+        with self._lock:
+            t = self.tickers.get(_stream_id(symbol))
+            if not t or time.time() - t['received_at'] > self.stale_after:
+                return None
+            return dict(t['ticker'])
+
+    def get_funding_rate(self, symbol):
+        with self._lock:
+            m = self.marks.get(_stream_id(symbol))
+            if not m or time.time() - m['received_at'] > self.stale_after:
+                return None
+            return m['funding_rate']
+
+    def funding_rates(self):
+        now = time.time()
+        with self._lock:
+            return {sid.upper(): m['funding_rate'] for sid, m in self.marks.items() if now - m['received_at'] <= self.stale_after}
+
+    def spot_stream_url(self):
+        names = []
+        for sid in self.symbols:
+            names.append(f"{sid}@kline_{self.timeframe}")
+            names.append(f"{sid}@miniTicker")
+        return f"{self.spot_url}/stream?streams={'/'.join(names)}"
+
+    def futures_stream_url(self):
+        names = [f"{sid}@markPrice@1s" for sid in self.symbols]
+        return f"{self.futures_url}/stream?streams={'/'.join(names)}"
+
+    def handle_frame(self, raw):
+        try:
+            msg = json.loads(raw)
+        except Exception:
+            return
+        if self._record_file:
+            try:
+                self._record_file.write(raw.strip() + "\n")
+            except Exception:
+                pass
+        data = msg.get('data', msg)
+        event = data.get('e')
+        sid = str(data.get('s', '')).lower()
+        now = time.time()
+        self.frames += 1
+        if event == '24hrMiniTicker':
+            symbol = self.symbols.get(sid, sid.upper())
+            last = float(data['c'])
+            open_ = float(data['o'])
+            ticker = {
+                'symbol': symbol,
+                'timestamp': data.get('E'),
+                'last': last,
+                'close': last,
+                'open': open_,
+                'high': float(data['h']),
+                'low': float(data['l']),
+                'baseVolume': float(data['v']),
+                'quoteVolume': float(data['q']),
+                'change': last - open_,
+                'percentage': (last - open_) / open_ * 100 if open_ else 0.0
+            }
+            with self._lock:
+                self.tickers[sid] = {'ticker': ticker, 'received_at': now}
+        elif event == 'markPriceUpdate':
+            with self._lock:
+                self.marks[sid] = {
+                    'mark_price': float(data['p']),
+                    'funding_rate': float(data['r']) if data.get('r') not in (None, '') else None,
+                    'next_funding_time': data.get('T'),
+                    'received_at': now
+                }
+        elif event == 'kline' and self.candles is not None:
+            k = data['k']
+            symbol = self.symbols.get(sid)
+            if symbol:
+                row = [int(k['t']), float(k['o']), float(k['h']), float(k['l']), float(k['c']), float(k['v'])]
+                self.candles.apply_live_bar(symbol, k.get('i', self.timeframe), row, self.stale_after)
+
+    def _thread_main(self):
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        try:
+            loop.run_until_complete(self._run())
+        except Exception as e:
+            logger.error(f"Market stream stopped: {e}")
+        finally:
+            loop.close()
+            self._loop = None
+
+    async def _run(self):
+        if self.record_path:
+            self._record_file = open(self.record_path, 'a', encoding='utf-8', buffering=1)
+        async with aiohttp.ClientSession() as session:
+            tasks = [asyncio.ensure_future(self._consume(session, self.spot_stream_url(), spot=True))]
+            tasks.append(asyncio.ensure_future(self._consume(session, self.futures_stream_url(), spot=False)))
+            try:
+                await asyncio.gather(*tasks)
+            except asyncio.CancelledError:
+                pass
+            finally:
+                for t in tasks:
+                    t.cancel()
+
+    async def _consume(self, session, url, spot):
+        backoff = 1
+        while not self._stopping:
+            try:
+                async with session.ws_connect(url, heartbeat=30) as ws:
+                    logger.info(f"Market stream connected: {url[:120]}")
+                    backoff = 1
+                    if spot and self.candles is not None:
+                        # bars may have been missed while disconnected; next read reloads over REST
+                        for symbol in self.symbols.values():
+                            self.candles.invalidate(symbol, self.timeframe)
+                    async for msg in ws:
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            self.handle_frame(msg.data)
+                        elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                            break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Market stream error ({url[:60]}): {e}")
+            if self._stopping:
+                break
+            await asyncio.sleep(backoff)
+            backoff = min(30, backoff * 2)
+
+class ReplayServer:
+    """
+    Local stand-in for the Binance combined-stream endpoint.
+
+    Serves recorded frames (one JSON object per line, as written by MarketStream's
+    record_path) to every websocket client on /stream, keeping only the frames whose
+    stream name was requested in ?streams=.
+    """
+
+    def __init__(self, frames, host='127.0.0.1', port=0, interval=0.0, repeat=False):
+        if isinstance(frames, str):
+            with open(frames, 'r', encoding='utf-8') as f:
+                frames = [line for line in f if line.strip()]
+        self.frames = [f if isinstance(f, str) else json.dumps(f) for f in frames]
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.repeat = repeat
+        self._runner = None
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._thread_main, name="stream-replay", daemon=True)
+        self._thread.start()
+        self._ready.wait(10)
+        return self.url
+
+    def stop(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(10)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread:
+            self._thread.join(10)
+
+    def _thread_main(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        app = web.Application()
+        app.router.add_get('/stream', self._handle)
+        app.router.add_get('/ws', self._handle)
+        self._runner = web.AppRunner(app)
+        loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, self.host, self.port)
+        loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def _handle(self, request):
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        wanted = set()
+        for part in parse_qs(urlparse(str(request.url)).query).get('streams', []):
+            wanted.update(s for s in part.split('/') if s)
+        frames = [f for f in self.frames if not wanted or json.loads(f).get('stream') in wanted]
+        try:
+            while frames and not ws.closed:
+                for frame in frames:
+                    if ws.closed:
+                        break
+                    await ws.send_str(frame)
+                    await asyncio.sleep(self.interval)
+                if not self.repeat:
+                    break
+            # keep the socket open like the real endpoint until the client goes away
+            async for _ in ws:
+                pass
+        except Exception:
+            pass
+        return ws
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else "src/data/stream_replay_sample.jsonl"
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8765
+    server = ReplayServer(path, port=port, interval=0.5, repeat=True)
+    print(f"Replaying {path} on {server.start()}/stream", flush=True)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
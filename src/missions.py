@@ -2,51 +2,56 @@ import os
 import json
 from typing import Any, Dict
 from .config import Config
+from .browser_pool import BrowserPool, PLAYWRIGHT_AVAILABLE
 
 class BinanceMissions:
-    def __init__(self):
+    def __init__(self, browser=None):
         self.cookies_raw = Config.BINANCE_COOKIES
         self.url = "https://www.binance.com/zh-CN/earn/mission-center"
+        self.browser = browser
 
-    def run(self) -> Dict[str, Any]:
-        try:
-            from playwright.sync_api import sync_playwright
-        except Exception:
-            return {"ok": False, "error": "playwright_not_available"}
+    async def _setup_context(self, context):
+        if self.cookies_raw:
+            try:
+                cookies = json.loads(self.cookies_raw)
+                await context.add_cookies(cookies)
+            except Exception:
+                pass
+
+    async def _click_missions(self, page):
+        await page.goto(self.url, wait_until="domcontentloaded")
+        labels = ["做任务", "领取", "赚币", "去完成", "领取奖励"]
+        for lb in labels:
+            try:
+                await page.get_by_text(lb, exact=False).click(timeout=3000)
+            except Exception:
+                pass
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                context = browser.new_context()
-                if self.cookies_raw:
-                    try:
-                        cookies = json.loads(self.cookies_raw)
-                        context.add_cookies(cookies)
-                    except Exception:
-                        pass
-                page = context.new_page()
-                page.goto(self.url, wait_until="domcontentloaded")
-                labels = ["做任务", "领取", "赚币", "去完成", "领取奖励"]
-                for lb in labels:
+            btns = page.locator("button")
+            cnt = await btns.count()
+            for i in range(min(cnt, 24)):
+                try:
+                    t = await btns.nth(i).inner_text()
+                except Exception:
+                    t = ""
+                if any(k in t for k in ["任务", "领取", "奖励", "赚币"]):
                     try:
-                        page.get_by_text(lb, exact=False).click(timeout=3000)
+                        await btns.nth(i).click(timeout=3000)
                     except Exception:
                         pass
-                try:
-                    btns = page.locator("button")
-                    cnt = btns.count()
-                    for i in range(min(cnt, 24)):
-                        try:
-                            t = btns.nth(i).inner_text()
-                        except Exception:
-                            t = ""
-                        if any(k in t for k in ["任务", "领取", "奖励", "赚币"]):
-                            try:
-                                btns.nth(i).click(timeout=3000)
-                            except Exception:
-                                pass
-                except Exception:
-                    pass
-                browser.close()
-                return {"ok": True}
+        except Exception:
+            pass
+        return {"ok": True}
+
+    def run(self) -> Dict[str, Any]:
+        if not PLAYWRIGHT_AVAILABLE:
+            return {"ok": False, "error": "playwright_not_available"}
+        pool = self.browser or BrowserPool(max_pages=1)
+        try:
+            # the logged-in context is kept under its own key, separate from the public scrapers
+            return pool.run(self._click_missions, key='missions', setup=self._setup_context, timeout=120)
         except Exception:
             return {"ok": False, "error": "runtime_error"}
+        finally:
+            if self.browser is None:
+                pool.close()
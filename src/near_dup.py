@@ -0,0 +1,218 @@
+import re
+import threading
+import time
+import zlib
+from collections import deque
+import numpy as np
+from .config import Config
+
+_URLS = re.compile(r'https?://\S+')
+_TAGS = re.compile(r'<[^>]+>')
+# everything that is not a letter/digit (any script) collapses to one space
+_NOISE = re.compile(r'[\W_]+')
+# newsflash prefixes that differ between outlets for the same story
+_PREFIXES = re.compile(r'^(?:\s*(?:blockbeats|panews|odaily|律动|快讯|消息|据报道|据悉|独家|breaking|news)\s*)+')
+
+_NUMBERS = re.compile(r'\d+(?:[.,]\d+)*')
+
+_PRIME = (1 << 61) - 1
+# texts with fewer shingles ("GM", a bare link) are too short to tell copies from coincidences
+MIN_SHINGLES = 8
+
+def normalise_text(title, summary, max_chars=400):
+    """
+    Lower-cased title + lead of the summary with markup, links and punctuation removed.
+    Only the first max_chars are kept: outlets agree on the headline and lead, not on
+    how much body text they carry.
+    """
+    text = f"{title or ''} {summary or ''}"
+    text = _TAGS.sub(' ', text)
+    text = _URLS.sub(' ', text)
+    text = _NOISE.sub(' ', text.casefold()).strip()
+    text = _PREFIXES.sub('', text)
+    return text[:max_chars]
+
+def number_tokens(title, summary, max_chars=400):
+    """
+    Figures in the same span normalise_text keeps. Templated flashes ("ETH ETFs saw $120M
+    inflows" / "BTC ETFs saw $300M outflows") shingle almost identically, so two articles
+    that both quote figures must share at least one to count as the same story.
+    """
+    text = _URLS.sub(' ', _TAGS.sub(' ', f"{title or ''} {summary or ''}"))
+    return frozenset(n.replace(',', '') for n in _NUMBERS.findall(text[:max_chars + 100]))
+
+def shingles(text, size=3):
+    # character shingles work the same for Chinese (no word breaks) and English copy
+    compact = text.replace(' ', '')
+    if len(compact) <= size:
+        return {compact} if compact else set()
+    return {compact[i:i + size] for i in range(len(compact) - size + 1)}
+
+class MinHasher:
+    """
+    num_perm MinHash values per shingle set, from a fixed family of (a*x + b) mod p hashes
+    over crc32 of each shingle, vectorised with numpy.
+    """
+
+    def __init__(self, num_perm=64, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        # a, b < 2**32 and x < 2**32 keep a*x + b below 2**64, so uint64 never wraps
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, grams):
+        if not grams:
+            return None
+        x = np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams))
+        hashed = (np.outer(x, self._a) + self._b) % np.uint64(_PRIME)
+        return hashed.min(axis=0)
+
+class NewsEvent:
+    """
+    One story and every copy of it seen inside the window. article is the first copy's
+    dict; its 'sources' and 'duplicate_links' keys are kept up to date as copies arrive.
+    """
+    __slots__ = ('id', 'article', 'signature', 'numbers', 'first_seen', 'last_seen', 'copies')
+
+    def __init__(self, event_id, article, signature, numbers, now):
+        self.id = event_id
+        self.article = article
+        self.signature = signature
+        self.numbers = numbers
+        self.first_seen = now
+        self.last_seen = now
+        self.copies = 1
+        article.setdefault('sources', [article.get('source', 'News')])
+        article.setdefault('duplicate_links', [])
+
+    def merge(self, article, now):
+        self.copies += 1
+        self.last_seen = now
+        source = article.get('source', 'News')
+        if source not in self.article['sources']:
+            self.article['sources'].append(source)
+        link = article.get('link')
+        if link and link != self.article.get('link') and link not in self.article['duplicate_links']:
+            self.article['duplicate_links'].append(link)
+
+class NearDuplicateIndex:
+    """
+    Groups syndicated copies of the same news item (BlockBeats, PANews RSS, the PANews page,
+    KOL tweets) into NewsEvents.
+
+    Each article's normalised title + lead is reduced to a MinHash signature, and the
+    signature is split into `bands` LSH bands. Articles sharing any band are candidates;
+    a candidate whose estimated Jaccard similarity reaches threshold (and that does not
+    quote entirely different figures, see number_tokens) is the same event.
+    With 16 bands of 4 rows, pairs at similarity 0.5 collide with probability ~0.65 and
+    pairs at 0.7 with ~0.98. Events older than window_seconds are dropped with their
+    bucket entries, so memory is bounded by the news rate over the window.
+    """
+
+    def __init__(self, window_seconds=None, threshold=None, num_perm=64, bands=16):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.window = Config.NEWS_DEDUP_WINDOW_HOURS * 3600.0 if window_seconds is None else window_seconds
+        self.threshold = Config.NEWS_DEDUP_THRESHOLD if threshold is None else threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self._events = {}
+        self._links = {}
+        self._buckets = [{} for _ in range(bands)]
+        self._order = deque()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.duplicates = 0
+
+    def __len__(self):
+        return len(self._events)
+
+    def _band_keys(self, sig):
+        r = self.rows
+        return [sig[i * r:(i + 1) * r].tobytes() for i in range(self.bands)]
+
+    def similarity(self, a, b):
+        return float(np.mean(a == b))
+
+    def _find(self, sig, keys, numbers):
+        best, best_sim = None, self.threshold
+        seen = set()
+        for band, key in enumerate(keys):
+            for eid in self._buckets[band].get(key, ()):
+                if eid in seen:
+                    continue
+                seen.add(eid)
+                event = self._events[eid]
+                if numbers and event.numbers and not numbers & event.numbers:
+                    continue
+                sim = self.similarity(sig, event.signature)
+                if sim >= best_sim:
+                    best, best_sim = event, sim
+        return best
+
+    def _expire(self, now):
+        while self._order and now - self._order[0][0] > self.window:
+            _, eid, keys = self._order.popleft()
+            event = self._events.pop(eid, None)
+            if event is None:
+                continue
+            for link in [event.article.get('link')] + event.article['duplicate_links']:
+                if self._links.get(link) == eid:
+                    del self._links[link]
+            for band, key in enumerate(keys):
+                bucket = self._buckets[band].get(key)
+                if bucket is None:
+                    continue
+                bucket.discard(eid)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def add(self, article, now=None):
+        """
+        Returns (event, is_new). is_new is False when article is a copy of an event already
+        in the window; that event's article then lists this copy's source and link.
+        """
+        now = time.time() if now is None else now
+        title, summary = article.get('title', ''), article.get('summary', '')
+        grams = shingles(normalise_text(title, summary))
+        sig = self.hasher.signature(grams) if len(grams) >= MIN_SHINGLES else None
+        numbers = number_tokens(title, summary)
+        link = article.get('link')
+        with self._lock:
+            self._expire(now)
+            event = self._events.get(self._links.get(link)) if link else None
+            keys = self._band_keys(sig) if sig is not None else None
+            if event is None and keys is not None:
+                event = self._find(sig, keys, numbers)
+            if event is not None:
+                event.merge(article, now)
+                if link:
+                    self._links.setdefault(link, event.id)
+                self.duplicates += 1
+                return event, False
+            eid = self._next_id
+            self._next_id += 1
+            event = NewsEvent(eid, article, sig, numbers, now)
+            self._events[eid] = event
+            if link:
+                self._links[link] = eid
+            # articles too short to fingerprint are only de-duplicated by link
+            if keys is not None:
+                for band, key in enumerate(keys):
+                    self._buckets[band].setdefault(key, set()).add(eid)
+            self._order.append((now, eid, keys or ()))
+            return event, True
+
+    def collapse(self, articles, now=None):
+        """
+        Keeps the first copy of every event not seen inside the window, in input order.
+        """
+        now = time.time() if now is None else now
+        out = []
+        for article in articles:
+            event, is_new = self.add(article, now)
+            if is_new:
+                out.append(event.article)
+        return out
@@ -1,25 +1,33 @@
 import logging
-import feedparser
 from datetime import datetime
 import time
+import threading
 import os
 import json
-import httpx
-from bs4 import BeautifulSoup
 import re
 from .config import Config
 from .ai_analyzer import AIAnalyzer
 from .market_data import MarketDataEngine
-from playwright.sync_api import sync_playwright
+from .feed_fetcher import FeedFetcher
+from .event_matcher import EventMatcher
+from .symbol_index import SymbolIndex
+from .heat_map import HeatMap
+from .article_index import ArticleIndex
+from .near_dup import NearDuplicateIndex
+from .newsflash import NewsflashIngestor, PAGE_KEY
+from .browser_pool import BrowserPool
+from .binance_announcements import fetch_announcements, ANNOUNCEMENT_PAGE_URL
 
 logger = logging.getLogger(__name__)
 
 class NewsScanner:
-    def __init__(self):
+    def __init__(self, market=None, browser=None):
         self.narratives = ['AI', 'Meme', 'L2', 'DeFi', 'GameFi', 'RWA']
         self.ai_analyzer = AIAnalyzer()
-        self.market = MarketDataEngine()
-        self.symbol_heat = {}
+        self.market = market or MarketDataEngine()
+        self.symbol_index = SymbolIndex(self.market)
+        self.symbol_heat = HeatMap()
+        self.dedup = NearDuplicateIndex()
         self.source_weights = {
             'Binance公告': 1.6,
             'OKX公告': 1.5,
@@ -40,6 +48,7 @@ class NewsScanner:
             {'kind': 'bullish', 'label': '合作/采用', 'weight': 16, 'patterns': [r'partnership', r'合作', r'采用', r'integration', r'集成']},
             {'kind': 'bullish', 'label': 'ETF/重大通过', 'weight': 24, 'patterns': [r'\betf\b', r'批准', r'通过', r'approval']}
         ]
+        self.event_matcher = EventMatcher(self.event_rules)
         self.rss_sources = {
             'BlockBeats': "https://api.theblockbeats.news/v2/rss/newsflash",
             'PANews': "https://www.panewslab.com/zh/rss/newsflash.xml",
@@ -71,6 +80,20 @@ class NewsScanner:
         self.twitter_sources = self._load_twitter_sources() if self.twitter_real_mode else []
         self.kol_handles = self._extract_kol_handles(self.twitter_sources) if self.twitter_real_mode else []
         self.last_published = {} # {source_name: last_link}
+        # fetch_latest_news writes cursors on a worker thread while snapshots read them on another
+        self._cursor_lock = threading.Lock()
+        self.feeds = FeedFetcher()
+        self.newsflash = NewsflashIngestor(self.feeds)
+        self.browser = browser or BrowserPool()
+        self.articles = ArticleIndex(self.symbol_index, fts_path=Config.DB_PATH if Config.ARTICLE_HISTORY_ENABLED else None)
+        self._articles_indexed_at = 0.0
+        self._index_lock = threading.Lock()
+
+    def close(self):
+        self.feeds.close()
+        self.articles.close()
+        self.browser.close()
+        self.ai_analyzer.close()
         
     def _load_twitter_sources(self):
         try:
@@ -101,58 +124,23 @@ class NewsScanner:
         return handles
 
     def _get_valid_symbols(self):
-        if not hasattr(self, '_valid_symbols'):
-            try:
-                pairs = self.market.list_usdt_pairs()
-                self._valid_symbols = set(p.split('/')[0] for p in pairs)
-            except:
-                self._valid_symbols = set(['BTC', 'ETH', 'SOL', 'BNB', 'XRP', 'DOGE', 'ADA', 'AVAX', 'LINK', 'DOT'])
-        return self._valid_symbols
+        return self.symbol_index.symbols()
 
     def _extract_symbols(self, text):
-        if not text:
-            return []
-        text_upper = text.upper()
-        found = set()
-        matches = re.findall(r'\$([A-Z]{2,6})', text_upper)
-        for m in matches:
-            found.add(m)
-        valid = self._get_valid_symbols()
-        words = re.findall(r'\b[A-Z]{2,6}\b', text_upper)
-        for w in words:
-            if w in valid and w not in ['GAS', 'FUN', 'ONE', 'SUN', 'BID', 'BET']:
-                found.add(w)
-        return sorted(found)
+        return self.symbol_index.extract(text)
+
+    def reload_event_rules(self, rules=None):
+        """
+        Recompiles the event matcher; call after editing event_rules or pass a new rule list.
+        """
+        if rules is not None:
+            self.event_rules = rules
+        self.event_matcher = EventMatcher(self.event_rules)
 
     def _detect_event_signal(self, text):
         if not text:
             return {'net_score': 0, 'bullish_hits': 0, 'bearish_hits': 0, 'alerts': []}
-        net_score = 0
-        bullish_hits = 0
-        bearish_hits = 0
-        alerts = []
-        for rule in self.event_rules:
-            matched = False
-            for pat in rule['patterns']:
-                if re.search(pat, text, flags=re.IGNORECASE):
-                    matched = True
-                    break
-            if not matched:
-                continue
-            if rule['kind'] == 'bullish':
-                net_score += rule['weight']
-                bullish_hits += 1
-                alerts.append(f"利好:{rule['label']}")
-            else:
-                net_score -= rule['weight']
-                bearish_hits += 1
-                alerts.append(f"利空:{rule['label']}")
-        return {
-            'net_score': net_score,
-            'bullish_hits': bullish_hits,
-            'bearish_hits': bearish_hits,
-            'alerts': alerts[:4]
-        }
+        return self.event_matcher.detect(text)
 
     def analyze_article_event(self, article):
         text = f"{article.get('title', '')} {article.get('summary', '')}"
@@ -177,35 +165,53 @@ class NewsScanner:
             logger.error(f"Error updating symbol heat: {e}")
 
     def _add_heat(self, symbol, weight, event_signal):
-        now = time.time()
-        if symbol not in self.symbol_heat:
-            self.symbol_heat[symbol] = {
-                'score': 0,
-                'last_updated': now,
-                'mentions': 0,
-                'bullish_events': 0,
-                'bearish_events': 0,
-                'alerts': []
-            }
-        
-        entry = self.symbol_heat[symbol]
-        hours_passed = (now - entry['last_updated']) / 3600
-        decay = hours_passed * 5
-        entry['score'] = max(0, entry['score'] - decay)
         base_boost = 8 * weight
         event_boost = min(30, abs(event_signal.get('net_score', 0)) * 0.45)
-        entry['score'] = min(100, entry['score'] + base_boost + event_boost)
-        entry['mentions'] += 1
-        entry['bullish_events'] += event_signal.get('bullish_hits', 0)
-        entry['bearish_events'] += event_signal.get('bearish_hits', 0)
-        if event_signal.get('alerts'):
-            merged = (event_signal['alerts'] + entry.get('alerts', []))
-            dedup = []
-            for it in merged:
-                if it not in dedup:
-                    dedup.append(it)
-            entry['alerts'] = dedup[:6]
-        entry['last_updated'] = now
+        self.symbol_heat.add(
+            symbol,
+            base_boost + event_boost,
+            bullish=event_signal.get('bullish_hits', 0),
+            bearish=event_signal.get('bearish_hits', 0),
+            alerts=event_signal.get('alerts') or ()
+        )
+
+    def _set_cursor(self, key, link):
+        with self._cursor_lock:
+            self.last_published[key] = link
+
+    def _cursors(self):
+        with self._cursor_lock:
+            return dict(self.last_published)
+
+    def state_version(self):
+        return (self.symbol_heat.version, hash(frozenset(self._cursors().items())))
+
+    def export_state(self):
+        # HeatMap.snapshot copies under the heat map's own lock
+        return self.symbol_heat.snapshot(), self._cursors()
+
+    def restore_state(self, heat_rows, cursors):
+        """
+        Warm start from a saved snapshot: heat keeps its original timestamps (so it decays
+        for the downtime) and sources resume from their last seen link instead of re-initialising.
+        """
+        for row in heat_rows:
+            self.symbol_heat.put(
+                row['symbol'],
+                row['score'],
+                mentions=row.get('mentions', 0),
+                bullish_events=row.get('bullish_events', 0),
+                bearish_events=row.get('bearish_events', 0),
+                alerts=row.get('alerts') or (),
+                last_updated=row['last_updated']
+            )
+        self.symbol_heat.evict()
+        with self._cursor_lock:
+            for source, link in cursors.items():
+                self.last_published.setdefault(source, link)
+
+    def hottest_symbols(self, limit=10):
+        return self.symbol_heat.top(limit)
 
     def scan_news(self, symbol):
         """
@@ -237,29 +243,17 @@ class NewsScanner:
                         bullish_events += signal.get('bullish_hits', 0)
                         bearish_events += signal.get('bearish_hits', 0)
                         alerts.extend(signal.get('alerts', []))
-                    dedup_alerts = []
-                    for alert in alerts:
-                        if alert not in dedup_alerts:
-                            dedup_alerts.append(alert)
-                    self.symbol_heat[base_symbol] = {
-                        'score': min(score, 80),
-                        'last_updated': time.time(),
-                        'mentions': len(recent_news),
-                        'bullish_events': bullish_events,
-                        'bearish_events': bearish_events,
-                        'alerts': dedup_alerts[:6]
-                    }
-                    heat_data = self.symbol_heat[base_symbol]
+                    self.symbol_heat.put(
+                        base_symbol,
+                        min(score, 80),
+                        mentions=len(recent_news),
+                        bullish_events=bullish_events,
+                        bearish_events=bearish_events,
+                        alerts=dict.fromkeys(alerts)
+                    )
                 else:
-                    self.symbol_heat[base_symbol] = {
-                        'score': 0,
-                        'last_updated': time.time(),
-                        'mentions': 0,
-                        'bullish_events': 0,
-                        'bearish_events': 0,
-                        'alerts': []
-                    }
-                    heat_data = self.symbol_heat[base_symbol]
+                    self.symbol_heat.put(base_symbol, 0)
+                heat_data = self.symbol_heat.get(base_symbol)
             except Exception as e:
                 logger.error(f"Error searching news for {symbol}: {e}")
 
@@ -283,10 +277,10 @@ class NewsScanner:
             ticker = self.market.get_ticker(symbol)
             if ticker:
                 pct_change = float(ticker.get('percentage', 0) or 0)
-                df = self.market.fetch_ohlcv(symbol, limit=20)
-                if df is not None and not df.empty:
-                    recent_vol = df['volume'].iloc[-4:].mean()
-                    avg_vol = df['volume'].iloc[:-4].mean()
+                candles = self.market.fetch_candles(symbol, limit=20)
+                if candles is not None and len(candles) > 4:
+                    recent_vol = candles.volume[-4:].mean()
+                    avg_vol = candles.volume[:-4].mean()
                     vol_ratio = (recent_vol / avg_vol) if avg_vol > 0 else 1.0
                     if vol_ratio > 3.0:
                         validated_score += 30
@@ -334,32 +328,78 @@ class NewsScanner:
             'alerts': event_alerts
         }
 
+    def _feed_urls(self, include_twitter=True):
+        urls = []
+        for rss_url in self.rss_sources.values():
+            urls.extend(rss_url if isinstance(rss_url, (list, tuple)) else [rss_url])
+        if include_twitter and self.twitter_real_mode and self.kol_handles:
+            urls.extend(f"https://nitter.net/{kol['handle']}/rss" for kol in self.kol_handles[:10])
+        return urls
+
+    def _pick_entries(self, results, rss_url):
+        # first candidate (in configured order) that produced entries, fresh or from a 304
+        candidates = rss_url if isinstance(rss_url, (list, tuple)) else [rss_url]
+        for cand in candidates:
+            res = results.get(cand)
+            if res is not None and res.ok:
+                return res.entries
+        return []
+
+    def _entry_article(self, source_name, entry, author=None):
+        article = {
+            'source': source_name,
+            'title': getattr(entry, "title", ""),
+            'link': getattr(entry, "link", ""),
+            'summary': getattr(entry, "summary", ""),
+            'published': getattr(entry, "published", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        }
+        if author:
+            article['author'] = author
+        return article
+
+    def _index_results(self, results):
+        """
+        Puts everything a fetch round returned into the article index, not only the unseen part.
+        """
+        try:
+            for source_name, rss_url in self.rss_sources.items():
+                entries = self._pick_entries(results, rss_url)
+                if entries:
+                    self.articles.add_many([self._entry_article(source_name, e) for e in entries])
+            page_articles = results.get(PAGE_KEY)
+            if page_articles:
+                self.articles.add_many(page_articles)
+            if self.twitter_real_mode and self.kol_handles:
+                for kol in self.kol_handles[:10]:
+                    res = results.get(f"https://nitter.net/{kol['handle']}/rss")
+                    if res is not None and res.ok:
+                        self.articles.add_many([self._entry_article('Twitter', e, kol['name']) for e in res.entries])
+            self._articles_indexed_at = time.time()
+        except Exception as e:
+            logger.error(f"Error indexing articles: {e}")
+
     def fetch_latest_news(self):
         """
         Fetches the latest news from all configured RSS sources.
         Returns a list of new articles since the last check.
         """
         all_new_articles = []
-        
+
+        # every feed, mirror and the PANews page are requested at once; the round takes as long as the slowest one
+        results = self.feeds.fetch_many(self._feed_urls(), extra={PAGE_KEY: self.newsflash.fetch_page})
+        # whale / transfer scans read this same round through the shared snapshot
+        self.newsflash.publish(results)
+        self._index_results(results)
+
         for source_name, rss_url in self.rss_sources.items():
             try:
-                candidates = rss_url if isinstance(rss_url, (list, tuple)) else [rss_url]
-                feed = None
-                entries = []
-                last_used = None
-                for cand in candidates:
-                    logger.info(f"Fetching RSS from {source_name} ({cand})...")
-                    f = feedparser.parse(cand)
-                    if getattr(f, "entries", None):
-                        feed = f
-                        entries = f.entries
-                        last_used = cand
-                        break
+                entries = self._pick_entries(results, rss_url)
                 if not entries:
                     if source_name == 'Binance公告':
                         try:
                             page_articles = self._fetch_binance_announcements_page(limit=20)
                             if page_articles:
+                                self.articles.add_many(page_articles)
                                 last_key = 'Binance公告_page'
                                 last_pub = self.last_published.get(last_key)
                                 new_page_articles = []
@@ -368,7 +408,7 @@ class NewsScanner:
                                         break
                                     new_page_articles.append(a)
                                 if new_page_articles:
-                                    self.last_published[last_key] = new_page_articles[0]['link']
+                                    self._set_cursor(last_key, new_page_articles[0]['link'])
                                     all_new_articles.extend(new_page_articles)
                             else:
                                 logger.warning("No entries found in Binance公告 page fallback.")
@@ -384,7 +424,7 @@ class NewsScanner:
                 # If it's the first run for this source
                 if last_pub is None:
                     if entries:
-                        self.last_published[source_name] = entries[0].link
+                        self._set_cursor(source_name, entries[0].link)
                         logger.info(f"Initialized {source_name} scanner. Latest: {entries[0].title}")
                     continue
 
@@ -404,14 +444,14 @@ class NewsScanner:
 
                 # Update last_published if we found new articles
                 if new_articles:
-                    self.last_published[source_name] = new_articles[0]['link']
+                    self._set_cursor(source_name, new_articles[0]['link'])
                     all_new_articles.extend(new_articles)
                 
             except Exception as e:
                 logger.error(f"Error fetching {source_name} RSS feed: {e}")
         
         try:
-            page_articles = self._fetch_panews_newsflash_page()
+            page_articles = results.get(PAGE_KEY)
             if page_articles:
                 last_key = 'PANews_newsflash'
                 last_pub = self.last_published.get(last_key)
@@ -421,7 +461,7 @@ class NewsScanner:
                         break
                     new_page_articles.append(a)
                 if new_page_articles:
-                    self.last_published[last_key] = new_page_articles[0]['link']
+                    self._set_cursor(last_key, new_page_articles[0]['link'])
                     all_new_articles.extend(new_page_articles)
         except Exception as e:
             logger.error(f"Error fetching PANews newsflash page: {e}")
@@ -430,15 +470,12 @@ class NewsScanner:
             try:
                 for kol in self.kol_handles[:10]:
                     key = f"Twitter:{kol['handle']}"
-                    try:
-                        feed = feedparser.parse(f"https://nitter.net/{kol['handle']}/rss")
-                    except Exception:
-                        feed = None
-                    if not feed or not getattr(feed, "entries", None):
+                    res = results.get(f"https://nitter.net/{kol['handle']}/rss")
+                    if res is None or not res.ok:
                         continue
                     last_pub = self.last_published.get(key)
                     new_tweets = []
-                    for entry in feed.entries:
+                    for entry in res.entries:
                         link = getattr(entry, "link", "")
                         if not link:
                             continue
@@ -455,11 +492,18 @@ class NewsScanner:
                             'published': getattr(entry, "published", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
                         })
                     if new_tweets:
-                        self.last_published[key] = new_tweets[0]['link']
+                        self._set_cursor(key, new_tweets[0]['link'])
                         all_new_articles.extend(new_tweets)
             except Exception as e:
                 logger.error(f"Error fetching Twitter RSS: {e}")
         
+        # Syndicated copies (same story from several outlets / tweets) become one event carrying all its sources
+        if all_new_articles:
+            collapsed = self.dedup.collapse(all_new_articles)
+            if len(collapsed) < len(all_new_articles):
+                logger.info(f"Collapsed {len(all_new_articles) - len(collapsed)} near-duplicate articles")
+            all_new_articles = collapsed
+
         # Update Heat Map with ALL new articles
         if all_new_articles:
             logger.info(f"Updating symbol heat map with {len(all_new_articles)} new articles...")
@@ -471,164 +515,94 @@ class NewsScanner:
         if self.ai_analyzer.enabled:
             filtered_articles = []
             logger.info(f"Analyzing {len(all_new_articles)} new articles with AI...")
-            for article in all_new_articles:
-                try:
-                    # Skip analysis for tweets if needed, but let's analyze everything for now
-                    analysis = self.ai_analyzer.analyze_news(article['title'], article['summary'])
-                    article['ai_analysis'] = analysis
-                    
-                    # Filter logic: Keep High Impact OR Listing/Delisting OR High Score
-                    if (analysis['impact'] == 'High' or 
-                        analysis['type'] in ['Listing', 'Delisting'] or 
-                        analysis.get('score', 0) >= 80):
-                        filtered_articles.append(article)
-                    else:
-                        logger.info(f"Filtered out low impact news: {article['title']} (Impact: {analysis['impact']}, Type: {analysis['type']})")
-                except Exception as e:
-                    logger.error(f"Error during AI analysis for {article['title']}: {e}")
-                    # Keep raw article if analysis fails to avoid missing potential alpha due to errors
+            try:
+                analyses = self.ai_analyzer.analyze_news_batch(all_new_articles)
+            except Exception as e:
+                logger.error(f"Error during AI analysis: {e}")
+                # Keep raw articles if analysis fails to avoid missing potential alpha due to errors
+                return all_new_articles
+            for article, analysis in zip(all_new_articles, analyses):
+                article['ai_analysis'] = analysis
+                
+                # Filter logic: Keep High Impact OR Listing/Delisting OR High Score
+                if (analysis['impact'] == 'High' or 
+                    analysis['type'] in ['Listing', 'Delisting'] or 
+                    analysis.get('score', 0) >= 80):
                     filtered_articles.append(article)
+                else:
+                    logger.info(f"Filtered out low impact news: {article['title']} (Impact: {analysis['impact']}, Type: {analysis['type']})")
             return filtered_articles
                 
         return all_new_articles
 
     def search_symbol_news(self, symbol):
-        results = []
-        base = symbol.split('/')[0] if '/' in symbol else symbol
-        base = base.replace('USDT', '')
-        # Use regex for word boundary matching to avoid false positives (e.g. ETH in method)
-        pattern = re.compile(rf'\b{re.escape(base)}\b', re.IGNORECASE)
-        
-        for source_name, rss_url in self.rss_sources.items():
-            try:
-                candidates = rss_url if isinstance(rss_url, (list, tuple)) else [rss_url]
-                feed = None
-                entries = []
-                for cand in candidates:
-                    f = feedparser.parse(cand)
-                    if getattr(f, "entries", None):
-                        feed = f
-                        entries = f.entries
-                        break
-                if not entries:
-                    continue
-                for entry in entries[:20]:
-                    title = entry.title if 'title' in entry else ''
-                    summary = entry.summary if 'summary' in entry else ''
-                    text = f"{title} {summary}"
-                    
-                    if pattern.search(text):
-                        published = entry.published if 'published' in entry else datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        results.append({
-                            'source': source_name,
-                            'title': title,
-                            'link': entry.link,
-                            'summary': summary,
-                            'published': published
-                        })
-            except Exception as e:
-                logger.error(f"Error searching {source_name}: {e}")
-        if self.twitter_real_mode and self.kol_handles:
-            try:
-                for kol in self.kol_handles[:10]:
-                    feed = feedparser.parse(f"https://nitter.net/{kol['handle']}/rss")
-                    if not feed or not getattr(feed, "entries", None):
-                        continue
-                    for entry in feed.entries[:10]:
-                        title = getattr(entry, "title", "")
-                        summary = getattr(entry, "summary", "")
-                        text = f"{title} {summary}".upper()
-                        if base and base in text:
-                            results.append({
-                                'source': 'Twitter',
-                                'author': kol['name'],
-                                'title': title,
-                                'link': getattr(entry, "link", kol['handle']),
-                                'summary': summary,
-                                'published': getattr(entry, "published", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-                            })
-            except Exception as e:
-                logger.error(f"Error searching Twitter RSS: {e}")
-        return results[:10]
+        """
+        Latest articles mentioning symbol, answered from the article index. Feeds are only
+        fetched here when nothing has been ingested recently (e.g. no check_news job running).
+        """
+        if time.time() - self._articles_indexed_at > Config.ARTICLE_INDEX_REFRESH_SECONDS:
+            # concurrent cold scans (scan_market threads) share one refetch
+            with self._index_lock:
+                if time.time() - self._articles_indexed_at > Config.ARTICLE_INDEX_REFRESH_SECONDS:
+                    results = self.feeds.fetch_many(self._feed_urls(), extra={PAGE_KEY: self.newsflash.fetch_page})
+                    self.newsflash.publish(results)
+                    self._index_results(results)
+                    self._articles_indexed_at = time.time()
+        results = self.articles.search(symbol, limit=10)
+        if len(results) < 10:
+            results.extend(self.articles.search_history(symbol, limit=10 - len(results), exclude=[r['link'] for r in results]))
+        return results
 
-    def _fetch_panews_newsflash_page(self):
-        url = "https://www.panewslab.com/zh/newsflash"
-        articles = []
-        try:
-            with httpx.Client(timeout=8) as client:
-                r = client.get(url, headers={"User-Agent": "Mozilla/5.0"})
-                if r.status_code != 200:
-                    return []
-                soup = BeautifulSoup(r.text, "html.parser")
-                links = soup.select("a[href*='/newsflash/']")
-                seen = set()
-                for a in links[:30]:
-                    href = a.get("href", "")
+    def _fetch_binance_announcements_page(self, limit=20):
+        items = fetch_announcements(self.feeds.http, limit)
+        if items:
+            return items
+        logger.info("Binance announcement JSON unavailable, falling back to the browser")
+        return self._fetch_binance_announcements_browser(limit)
+
+    def _fetch_binance_announcements_browser(self, limit=20):
+        url = ANNOUNCEMENT_PAGE_URL
+
+        async def scrape(page):
+            items = []
+            await page.goto(url, wait_until="domcontentloaded")
+            try:
+                await page.wait_for_load_state("networkidle", timeout=12000)
+            except Exception:
+                pass
+            anchors = await page.locator("a[href*='/support/announcement/']").all()
+            seen = set()
+            for a in anchors[:100]:
+                try:
+                    href = await a.get_attribute("href") or ""
                     if not href or href in seen:
                         continue
                     seen.add(href)
-                    link = href if href.startswith("http") else f"https://www.panewslab.com{href}"
-                    title = a.get_text(strip=True)
-                    parent = a.find_parent()
+                    link = href if href.startswith("http") else f"https://www.binance.com{href}"
+                    title = (await a.inner_text()).strip()
+                    row = a.locator("xpath=ancestor::*[self::div or self::li or self::article]").first
                     summary = ""
-                    if parent:
-                        summary = parent.get_text(" ", strip=True)
-                    articles.append({
-                        'source': 'PANews',
-                        'title': title or 'PANews 快讯',
+                    try:
+                        summary = (await row.inner_text()).strip()
+                    except Exception:
+                        summary = title
+                    if not title:
+                        title = "Binance 公告"
+                    items.append({
+                        'source': 'Binance公告',
+                        'title': title,
                         'link': link,
                         'summary': summary,
                         'published': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                     })
-        except Exception:
-            return []
-        return articles
+                    if len(items) >= limit:
+                        break
+                except Exception:
+                    continue
+            return items
 
-    def _fetch_binance_announcements_page(self, limit=20):
-        url = "https://www.binance.com/zh-CN/support/announcement"
-        items = []
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
-                page.goto(url, wait_until="domcontentloaded")
-                try:
-                    page.wait_for_load_state("networkidle", timeout=12000)
-                except Exception:
-                    pass
-                anchors = page.locator("a[href*='/support/announcement/']").all()
-                seen = set()
-                for a in anchors[:100]:
-                    try:
-                        href = a.get_attribute("href") or ""
-                        if not href or href in seen:
-                            continue
-                        seen.add(href)
-                        link = href if href.startswith("http") else f"https://www.binance.com{href}"
-                        title = a.inner_text().strip()
-                        row = a.locator("xpath=ancestor::*[self::div or self::li or self::article]").first
-                        summary = ""
-                        try:
-                            summary = row.inner_text().strip()
-                        except Exception:
-                            summary = title
-                        if not title:
-                            title = "Binance 公告"
-                        items.append({
-                            'source': 'Binance公告',
-                            'title': title,
-                            'link': link,
-                            'summary': summary,
-                            'published': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        })
-                        if len(items) >= limit:
-                            break
-                    except Exception:
-                        continue
-                try:
-                    browser.close()
-                except Exception:
-                    pass
+            items = self.browser.run(scrape, key='public')
         except Exception:
             return []
         dedup = []
@@ -0,0 +1,173 @@
+import logging
+import re
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from bs4 import BeautifulSoup
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+PANEWS_PAGE_URL = "https://www.panewslab.com/zh/newsflash"
+PAGE_KEY = 'PANews_newsflash'
+
+NEWSFLASH_FEEDS = {
+    'BlockBeats': "https://api.theblockbeats.news/v2/rss/newsflash",
+    'PANews': "https://www.panewslab.com/zh/rss/newsflash.xml",
+}
+
+WHALE_KEYS = ("whale", "鲸鱼", "聪明钱", "smart money", "lookonchain", "spotonchain", "spot on chain", "arkham")
+TRANSFER_KEYS = ("转账", "transfer", "划转", "大额", "鲸鱼")
+
+_AMOUNT = re.compile(r"\$\s*([0-9][0-9,\.]*)\s*([kKmM])")
+
+def extract_amount_and_direction(text):
+    """
+    从文本中解析金额（支持 $…k / $…M），以及方向（买入/抛售/inflow/outflow）。
+    返回 (amount_usd, sign) sign: +1 买入, -1 卖出
+    """
+    amt = None
+    m = _AMOUNT.search(text)
+    if m:
+        num = m.group(1).replace(",", "").strip()
+        unit = m.group(2)
+        try:
+            base = float(num)
+            amt = base * (1000.0 if unit.lower() == 'k' else 1000000.0)
+        except Exception:
+            amt = None
+    sign = 0
+    t = text.lower()
+    if any(w in t for w in ["买入", "inflow", "accumulat"]):
+        sign = 1
+    if any(w in t for w in ["抛售", "卖出", "outflow", "dump"]):
+        sign = -1
+    return amt, sign
+
+def parse_panews_newsflash_page(html, limit=30):
+    soup = BeautifulSoup(html, "html.parser")
+    links = soup.select("a[href*='/newsflash/']")
+    seen = set()
+    articles = []
+    for a in links[:limit]:
+        href = a.get("href", "")
+        if not href or href in seen:
+            continue
+        seen.add(href)
+        link = href if href.startswith("http") else f"https://www.panewslab.com{href}"
+        title = a.get_text(strip=True)
+        parent = a.find_parent()
+        summary = ""
+        if parent:
+            summary = parent.get_text(" ", strip=True)
+        articles.append({
+            'source': 'PANews',
+            'title': title or 'PANews 快讯',
+            'link': link,
+            'summary': summary,
+            'published': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        })
+    return articles
+
+# one parsed newsflash item; text_upper/lower and the whale/transfer fields are computed once per snapshot
+Flash = namedtuple('Flash', 'source title summary link published text_upper whale_related transfer_related amount sign')
+
+def _flash(source, title, summary, link, published):
+    text = f"{title} {summary}"
+    lower = text.lower()
+    amount, sign = extract_amount_and_direction(text)
+    return Flash(
+        source, title, summary, link, published, text.upper(),
+        any(k in lower for k in WHALE_KEYS), any(k in lower for k in TRANSFER_KEYS), amount, sign
+    )
+
+class NewsflashSnapshot:
+    """
+    Immutable result of one ingestion round: per-feed Flash tuples plus the PANews page.
+    """
+    __slots__ = ('fetched_at', 'feeds', 'page')
+
+    def __init__(self, fetched_at, feeds, page):
+        self.fetched_at = fetched_at
+        self.feeds = feeds
+        self.page = page
+
+    def page_articles(self):
+        return [{'source': f.source, 'title': f.title, 'link': f.link, 'summary': f.summary, 'published': f.published} for f in self.page]
+
+EMPTY_SNAPSHOT = NewsflashSnapshot(0.0, {name: () for name in NEWSFLASH_FEEDS}, ())
+
+class NewsflashIngestor:
+    """
+    Fetches the BlockBeats / PANews newsflash sources once per interval and publishes the
+    parsed result as a shared NewsflashSnapshot.
+
+    NewsScanner.fetch_latest_news hands its own fetch round to publish(), so on a running
+    bot the whale/transfer readers never download anything themselves. Otherwise the first
+    reader after the interval refreshes (others wait and reuse it). Readers hold on to the
+    snapshot object they got; a refresh swaps in a new one rather than mutating it.
+    """
+
+    def __init__(self, feeds, interval=None):
+        self.feeds = feeds
+        self.interval = Config.NEWSFLASH_INTERVAL if interval is None else interval
+        self._snapshot = EMPTY_SNAPSHOT
+        self._lock = threading.Lock()
+
+    @property
+    def urls(self):
+        return list(NEWSFLASH_FEEDS.values())
+
+    def fetch_page(self):
+        try:
+            r = self.feeds.http.get(PANEWS_PAGE_URL, timeout=8)
+            if r.status_code != 200:
+                return []
+            return parse_panews_newsflash_page(r.text)
+        except Exception:
+            return []
+
+    def publish(self, results, now=None):
+        """
+        Builds a snapshot from a FeedFetcher.fetch_many round that included these feeds and
+        the page (as extra=PAGE_KEY). Sources missing from the round keep their previous items.
+        """
+        prev = self._snapshot
+        feeds = {}
+        for name, url in NEWSFLASH_FEEDS.items():
+            res = results.get(url)
+            if res is not None and res.ok:
+                feeds[name] = tuple(
+                    _flash(name, getattr(e, "title", ""), getattr(e, "summary", ""), getattr(e, "link", ""),
+                           getattr(e, "published", datetime.now().isoformat()))
+                    for e in res.entries
+                )
+            else:
+                feeds[name] = prev.feeds.get(name, ())
+        page_articles = results.get(PAGE_KEY)
+        if page_articles:
+            page = tuple(_flash('PANews', a['title'], a['summary'], a['link'], a['published']) for a in page_articles)
+        else:
+            page = prev.page
+        snap = NewsflashSnapshot(time.time() if now is None else now, feeds, page)
+        self._snapshot = snap
+        return snap
+
+    def refresh(self):
+        results = self.feeds.fetch_many(self.urls, extra={PAGE_KEY: self.fetch_page})
+        return self.publish(results)
+
+    def snapshot(self):
+        snap = self._snapshot
+        if time.time() - snap.fetched_at < self.interval:
+            return snap
+        with self._lock:
+            snap = self._snapshot
+            if time.time() - snap.fetched_at < self.interval:
+                return snap
+            try:
+                return self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing newsflash snapshot: {e}")
+                return self._snapshot
@@ -7,11 +7,12 @@ from .database import Database
 logger = logging.getLogger(__name__)
 
 class PolymarketWatcher:
-    def __init__(self):
+    def __init__(self, db=None):
         self.enabled = Config.POLYMARKET_ENABLED
         self.threshold = Config.POLYMARKET_THRESHOLD
         self.api_url = "https://gamma-api.polymarket.com/events"
-        self.db = Database()
+        # the bot passes its own Database so alerts share its connections and processed_news filter
+        self.db = db or Database()
 
     def check_market_movements(self):
         """
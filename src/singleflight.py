@@ -0,0 +1,57 @@
+import asyncio
+import time
+from .config import Config
+
+class SingleFlight:
+    """
+    Coalesces concurrent coroutine calls by key and reuses a successful result for ttl seconds.
+
+    The first caller for a key starts the work; everyone arriving while it runs awaits the
+    same task. The task is shielded, so one caller being cancelled (e.g. a timed-out handler)
+    does not cancel the work the others are waiting on. None results and exceptions are not cached.
+    """
+
+    def __init__(self, ttl=None, max_entries=512):
+        self.ttl = Config.SINGLE_FLIGHT_TTL if ttl is None else ttl
+        self.max_entries = max_entries
+        self._inflight = {}
+        self._results = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key, factory):
+        self.calls += 1
+        now = time.monotonic()
+        cached = self._results.get(key)
+        if cached is not None:
+            if cached[0] > now:
+                self.shared += 1
+                return cached[1]
+            del self._results[key]
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._finish(key, t))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def forget(self, key):
+        self._results.pop(key, None)
+
+    def _finish(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if result is None or self.ttl <= 0:
+            return
+        now = time.monotonic()
+        if len(self._results) >= self.max_entries:
+            for k in [k for k, (exp, _) in self._results.items() if exp <= now]:
+                del self._results[k]
+            while len(self._results) >= self.max_entries:
+                del self._results[next(iter(self._results))]
+        self._results[key] = (now + self.ttl, result)
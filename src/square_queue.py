@@ -0,0 +1,69 @@
+import sqlite3
+
+# Shared by Database.init_db and the Square posting workers (src/binance_square.py,
+# binance_follow_square.py), which open their own connections to the same file.
+
+DEFAULT_LEASE_SECONDS = 600
+DEFAULT_MAX_ATTEMPTS = 3
+
+# claim_posts filters on status/bot_approved/next_try_at; with this index it touches only
+# claimable rows instead of scanning the whole sent history
+CLAIM_INDEX_SQL = "CREATE INDEX IF NOT EXISTS idx_square_queue_claim ON square_queue(status, bot_approved, next_try_at, created_at)"
+
+RECLAIM_SQL = """
+    UPDATE square_queue
+    SET status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END,
+        attempts = attempts + 1,
+        lease_until = NULL
+    WHERE status = 'processing'
+      AND (lease_until IS NULL OR lease_until <= CURRENT_TIMESTAMP)
+"""
+
+CLAIM_SQL = """
+    UPDATE square_queue
+    SET status = 'processing', lease_until = datetime('now', ?)
+    WHERE id IN (
+        SELECT id FROM square_queue
+        WHERE status = 'pending'
+          AND bot_approved = 1
+          AND (next_try_at IS NULL OR next_try_at <= CURRENT_TIMESTAMP)
+        ORDER BY created_at ASC
+        LIMIT ?
+    )
+    RETURNING id, text, attempts, created_at
+"""
+
+def ensure_claim_schema(cur):
+    """
+    Adds the lease column and the claim index to an existing square_queue.
+    """
+    cur.execute("PRAGMA table_info(square_queue)")
+    cols = [row[1] for row in cur.fetchall()]
+    if 'lease_until' not in cols:
+        cur.execute("ALTER TABLE square_queue ADD COLUMN lease_until TIMESTAMP")
+    cur.execute(CLAIM_INDEX_SQL)
+
+def claim_posts(conn, limit=1, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Moves up to `limit` approved, due posts from 'pending' to 'processing' and returns
+    their (id, text, attempts), oldest first.
+
+    The claim is one UPDATE ... WHERE id IN (SELECT ... LIMIT n) RETURNING statement, so two
+    workers can never claim the same row. Each claimed row carries lease_until = now +
+    lease_seconds. In the same transaction, rows whose lease ran out (the worker crashed
+    or was killed mid-post) go back to 'pending' with one more attempt, or to 'failed'
+    once they reach max_attempts, so a post that keeps crashing the worker is dropped.
+    """
+    if conn.in_transaction:
+        conn.commit()
+    try:
+        # take the write lock up front so the reclaim and the claim see the same state
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(RECLAIM_SQL, (max_attempts,))
+        rows = conn.execute(CLAIM_SQL, (f"+{int(lease_seconds)} seconds", int(limit))).fetchall()
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    rows.sort(key=lambda r: (r[3] or '', r[0]))
+    return [(pid, text, attempts) for pid, text, attempts, _ in rows]
@@ -0,0 +1,125 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_SYMBOLS = {'BTC', 'ETH', 'SOL', 'BNB', 'XRP', 'DOGE', 'ADA', 'AVAX', 'LINK', 'DOT'}
+
+# listed tickers that are far more often plain words, units or stablecoins in news text
+STOP_SYMBOLS = {
+    'GAS', 'FUN', 'ONE', 'SUN', 'BID', 'BET', 'AI', 'ME', 'IN', 'ID', 'IO', 'OM', 'GO', 'NOT', 'NEAR', 'MOVE',
+    'HOME', 'SIGN', 'ACT', 'RED', 'WIN', 'HIGH', 'LOW', 'KEY', 'OG', 'ETF', 'CEO', 'SEC', 'USD', 'USDT',
+    'USDC', 'FDUSD', 'TUSD', 'DAI', 'USDP', 'EUR', 'TRY', 'BRL', 'NFT', 'TVL', 'API', 'AMA', 'CEX', 'DEX', 'APY'
+}
+
+_MULTIPLIER_PREFIX = re.compile(r'^(?:1000000|1000|1M)(?=[A-Z])')
+
+def _load_aliases():
+    try:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'symbol_aliases.json')
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {alias: sym.upper() for sym, names in data.items() for alias in names}
+    except Exception as e:
+        logger.error(f"Error loading symbol aliases: {e}")
+        return {}
+
+class SymbolIndex:
+    """
+    Ticker extraction over the whole Binance spot + USDT-M futures universe.
+
+    One compiled regex finds, in a single pass, $TICKER cashtags (any case), bare
+    upper-case tickers bounded by non-alphanumerics (so CJK right next to a ticker still
+    counts), and project-name aliases from data/symbol_aliases.json. Bare tickers and
+    aliases only count when the ticker is listed; futures names like 1000PEPE map to the
+    underlying. The universe is reloaded every ttl seconds.
+    """
+
+    def __init__(self, market, ttl=None, aliases=None):
+        self.market = market
+        self.ttl = Config.SYMBOL_INDEX_TTL if ttl is None else ttl
+        self.aliases = {k.lower(): v for k, v in (aliases if aliases is not None else _load_aliases()).items()}
+        self._symbols = set()
+        self._canonical = {}
+        self._regex = None
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def symbols(self):
+        self._ensure_fresh()
+        return self._symbols
+
+    def _ensure_fresh(self):
+        if self._regex is not None and time.time() < self._next_refresh:
+            return
+        with self._lock:
+            if self._regex is not None and time.time() < self._next_refresh:
+                return
+            self.refresh()
+
+    def refresh(self):
+        universe = set()
+        try:
+            for pair in self.market.list_usdt_pairs(limit=10000, reload=True):
+                universe.add(pair.split('/')[0].upper())
+            for pair in self.market.list_futures_usdt_pairs(limit=10000):
+                if pair.endswith('USDT'):
+                    universe.add(pair[:-4])
+        except Exception as e:
+            logger.error(f"Error loading symbol universe: {e}")
+        if universe:
+            self._next_refresh = time.time() + self.ttl
+        else:
+            # keep what we had (or the fallback) and retry soon rather than waiting a full ttl
+            universe = set(self._symbols) or set(FALLBACK_SYMBOLS)
+            self._next_refresh = time.time() + min(self.ttl, 60)
+        self._build(universe)
+
+    def _build(self, universe):
+        canonical = {}
+        for sym in universe:
+            base = _MULTIPLIER_PREFIX.sub('', sym)
+            canonical[sym] = base if base in universe else sym
+        names = sorted(self.aliases, key=len, reverse=True)
+        ascii_names = [re.escape(a) for a in names if a.isascii()]
+        other_names = [re.escape(a) for a in names if not a.isascii()]
+        parts = [
+            r'\$(?P<cash>[A-Za-z0-9]{2,12})(?![A-Za-z0-9])',
+            r'(?<![A-Za-z0-9$])(?P<bare>[A-Z0-9]{2,12})(?![A-Za-z0-9])'
+        ]
+        if ascii_names:
+            parts.append(r'(?<![A-Za-z0-9])(?i:(?P<alias>' + '|'.join(ascii_names) + r'))(?![A-Za-z0-9])')
+        if other_names:
+            parts.append('(?P<alias_cjk>' + '|'.join(other_names) + ')')
+        regex = re.compile('|'.join(parts))
+        self._canonical = canonical
+        self._symbols = set(universe)
+        self._regex = regex
+
+    def extract(self, text):
+        if not text:
+            return []
+        self._ensure_fresh()
+        canonical = self._canonical
+        found = set()
+        for m in self._regex.finditer(text):
+            kind = m.lastgroup
+            token = m.group(kind)
+            if kind == 'cash':
+                token = token.upper()
+                if not token[0].isdigit() or token in canonical:
+                    found.add(canonical.get(token, token))
+            elif kind == 'bare':
+                sym = canonical.get(token)
+                if sym and token not in STOP_SYMBOLS:
+                    found.add(sym)
+            else:
+                sym = self.aliases.get(token.lower())
+                if sym and sym in canonical:
+                    found.add(canonical[sym])
+        return sorted(found)
@@ -0,0 +1,134 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.ai_analyzer import ITEMS_MARKER, AIAnalyzer, content_key
+
+
+class FakeOpenAI(BaseHTTPRequestHandler):
+    calls = []
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+    delay = 0.0
+    fenced = False
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        prompt = body['messages'][-1]['content']
+        items = json.loads(prompt.split(ITEMS_MARKER, 1)[1])
+        with FakeOpenAI.lock:
+            FakeOpenAI.calls.append([i['title'] for i in items])
+            FakeOpenAI.in_flight += 1
+            FakeOpenAI.peak = max(FakeOpenAI.peak, FakeOpenAI.in_flight)
+        time.sleep(FakeOpenAI.delay)
+        answer = []
+        for item in items:
+            if 'skip' in item['title']:
+                continue
+            listing = 'listing' in item['title'].lower()
+            answer.append({
+                'id': item['id'],
+                'impact': 'High' if listing else 'Low',
+                'type': 'Listing' if listing else 'General',
+                'summary': item['title'][:20],
+                'coins': ['btc'],
+                'score': 90 if listing else 10
+            })
+        content = json.dumps(answer)
+        if FakeOpenAI.fenced:
+            content = f"```json\n{content}\n```"
+        out = json.dumps({'choices': [{'message': {'content': content}}]}).encode()
+        with FakeOpenAI.lock:
+            FakeOpenAI.in_flight -= 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+
+def start_server():
+    FakeOpenAI.calls = []
+    FakeOpenAI.peak = 0
+    FakeOpenAI.delay = 0.0
+    FakeOpenAI.fenced = False
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeOpenAI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def analyzer(base, **kwargs):
+    opts = dict(api_key='test', base_url=base, model='fake', enabled=True, batch_size=4, concurrency=2, cache_ttl=60, timeout=5)
+    opts.update(kwargs)
+    return AIAnalyzer(**opts)
+
+
+def test_batches_in_order_and_caches_syndicated_duplicates():
+    server, base = start_server()
+    ai = analyzer(base)
+    try:
+        articles = [{'title': f'Story {i}', 'summary': f'body {i}'} for i in range(9)]
+        articles[3] = {'title': 'Binance Listing XYZ', 'summary': '<p>Binance will list XYZ</p>'}
+        # same story from a second feed, different markup / whitespace
+        articles.append({'title': 'binance listing xyz', 'summary': 'Binance  will list XYZ'})
+        FakeOpenAI.fenced = True
+        out = ai.analyze_news_batch(articles)
+        assert len(out) == 10
+        assert out[3]['impact'] == 'High' and out[3]['type'] == 'Listing' and out[3]['coins'] == ['BTC']
+        assert out[9] == out[3]
+        assert out[0]['impact'] == 'Low' and out[0]['summary'] == 'Story 0'
+        # 9 distinct articles -> 3 prompts of at most 4
+        assert sorted(len(c) for c in FakeOpenAI.calls) == [1, 4, 4]
+
+        again = ai.analyze_news_batch(articles[:5])
+        assert again == out[:5]
+        assert len(FakeOpenAI.calls) == 3 and ai.cache_hits == 5
+    finally:
+        ai.close()
+        server.shutdown()
+
+
+def test_concurrency_is_bounded():
+    server, base = start_server()
+    FakeOpenAI.delay = 0.2
+    ai = analyzer(base, batch_size=1, concurrency=3)
+    try:
+        start = time.perf_counter()
+        out = ai.analyze_news_batch([{'title': f'n{i}', 'summary': ''} for i in range(9)])
+        elapsed = time.perf_counter() - start
+        assert len(out) == 9 and len(FakeOpenAI.calls) == 9
+        assert FakeOpenAI.peak <= 3
+        assert elapsed < 9 * 0.2
+    finally:
+        ai.close()
+        server.shutdown()
+
+
+def test_missing_items_and_dead_endpoint_fall_back_uncached():
+    server, base = start_server()
+    ai = analyzer(base)
+    try:
+        out = ai.analyze_news_batch([{'title': 'ok', 'summary': 'a'}, {'title': 'skip me', 'summary': 'b'}])
+        assert out[0]['impact'] == 'Low'
+        assert out[1]['impact'] == 'Unknown' and out[1]['score'] == 0
+        ai.analyze_news_batch([{'title': 'skip me', 'summary': 'b'}])
+        assert len(FakeOpenAI.calls) == 2
+    finally:
+        ai.close()
+        server.shutdown()
+        server.server_close()
+
+    dead = analyzer(base)
+    try:
+        assert dead.analyze_news('t', 'content')['impact'] == 'Unknown'
+    finally:
+        dead.close()
+
+
+def test_content_key_normalises_markup_and_case():
+    assert content_key('BTC  up', '<b>Big</b> move') == content_key('btc up', 'Big move')
+    assert content_key('BTC up', 'a') != content_key('BTC up', 'b')
@@ -0,0 +1,63 @@
+from src.article_index import ArticleIndex
+from src.symbol_index import SymbolIndex
+
+
+class FakeMarket:
+    def list_usdt_pairs(self, limit=100, reload=False):
+        return ['BTC/USDT', 'ETH/USDT', 'NEAR/USDT', 'ZRO/USDT']
+
+    def list_futures_usdt_pairs(self, limit=1000):
+        return []
+
+
+def article(n, title, source='BlockBeats'):
+    return {'source': source, 'title': title, 'link': f"https://example.com/{n}", 'summary': '', 'published': ''}
+
+
+def make_index(**kw):
+    return ArticleIndex(SymbolIndex(FakeMarket(), aliases={'Bitcoin': 'BTC'}), **kw)
+
+
+def test_posting_lists_answer_newest_first_without_refetching():
+    index = make_index(max_articles=100, retention_hours=1)
+    # feed order is newest first
+    index.add_many([article(3, 'ZRO 永续上线'), article(2, 'bitcoin ETF 资金流入'), article(1, 'btc dips, ETH flat')], now=0.0)
+    # the fake universe loaded, so ZRO/NEAR go through the posting lists, not the unlisted fallback
+    assert {'ZRO', 'NEAR'} <= index.symbol_index.symbols()
+    assert index.add_many([article(3, 'ZRO 永续上线')], now=1.0) == 0
+    assert [a['link'] for a in index.search('BTC/USDT')] == ['https://example.com/2', 'https://example.com/1']
+    assert [a['title'] for a in index.search('ZRO')] == ['ZRO 永续上线']
+    assert 'ZRO' in index._postings
+    # listed words in lower case are indexed like the old case-insensitive search
+    index.add_many([article(4, 'near-term outlook')], now=2.0)
+    assert [a['link'] for a in index.search('NEAR')] == ['https://example.com/4']
+    assert index.search('SOL') == []
+    # unlisted symbols fall back to scanning retained articles
+    index.add_many([article(5, 'NEWCOIN airdrop')], now=3.0)
+    assert [a['link'] for a in index.search('newcoin')] == ['https://example.com/5']
+    assert 'symbols' not in index.search('ZRO')[0]
+
+
+def test_retention_drops_articles_and_postings():
+    index = make_index(max_articles=2, retention_hours=1)
+    index.add_many([article(1, 'BTC one')], now=0.0)
+    index.add_many([article(2, 'ETH two')], now=10.0)
+    index.add_many([article(3, 'ETH three')], now=20.0)
+    assert len(index) == 2 and index.search('BTC') == []
+    index.add_many([article(4, 'ZRO four')], now=20.0 + 3600.5)
+    assert len(index) == 1 and index.search('ETH') == []
+    assert 'ETH' not in index._postings
+
+
+def test_fts_history_outlives_retention(tmp_path):
+    path = str(tmp_path / 'history.db')
+    index = make_index(max_articles=1, retention_hours=1, fts_path=path)
+    index.add_many([article(1, 'BTC old news')], now=0.0)
+    index.add_many([article(2, 'ETH newer')], now=5.0)
+    index.close()
+    reopened = make_index(max_articles=1, retention_hours=1, fts_path=path)
+    reopened.add_many([article(1, 'BTC old news')], now=10.0)
+    assert reopened.search('BTC')[0]['link'] == 'https://example.com/1'
+    history = reopened.search_history('BTC/USDT', limit=5)
+    assert [h['link'] for h in history] == ['https://example.com/1']
+    reopened.close()
@@ -0,0 +1,82 @@
+import asyncio
+import threading
+import time
+import pytest
+from src.async_database import AsyncDatabase, LatencyHistogram
+
+
+def test_calls_run_off_the_loop_with_writes_on_one_thread(db):
+    adb = AsyncDatabase(db, readers=2)
+    threads = {'write': set(), 'read': set()}
+    real_add, real_get = db.add_user, db.get_all_users
+
+    def add_user(user_id):
+        threads['write'].add(threading.current_thread().name)
+        return real_add(user_id)
+
+    def get_all_users():
+        threads['read'].add(threading.current_thread().name)
+        return real_get()
+
+    db.add_user, db.get_all_users = add_user, get_all_users
+
+    async def main():
+        loop_thread = threading.current_thread().name
+        await asyncio.gather(*(adb.add_user(i) for i in range(20)))
+        users = await asyncio.gather(*(adb.get_all_users() for _ in range(10)))
+        return loop_thread, users
+
+    try:
+        loop_thread, users = asyncio.run(main())
+        assert sorted(users[-1]) == list(range(20))
+        assert len(threads['write']) == 1 and loop_thread not in threads['write']
+        assert all(name.startswith('db-reader') for name in threads['read'])
+        stats = adb.stats()
+        assert stats['add_user']['count'] == 20 and stats['get_all_users']['count'] == 10
+        with pytest.raises(AttributeError):
+            adb._is_virtual_square_post
+    finally:
+        adb.close()
+
+
+def test_reads_do_not_wait_behind_a_slow_write(db):
+    adb = AsyncDatabase(db, readers=2)
+    release = threading.Event()
+
+    def slow_write():
+        with db.transaction() as conn:
+            conn.execute("INSERT INTO users (user_id) VALUES (1)")
+            release.wait(5)
+
+    db.slow_write = slow_write
+
+    async def main():
+        write = asyncio.ensure_future(adb.slow_write())
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        # WAL: the reader sees the last committed state while the writer holds its transaction
+        users = await adb.get_all_users()
+        elapsed = time.perf_counter() - start
+        release.set()
+        await write
+        return users, elapsed, await adb.get_all_users()
+
+    try:
+        before, elapsed, after = asyncio.run(main())
+        assert before == [] and after == [1]
+        assert elapsed < 1
+    finally:
+        adb.close()
+
+
+def test_latency_histogram_percentiles():
+    hist = LatencyHistogram()
+    for ms in [0.2] * 90 + [7] * 9 + [300]:
+        hist.record(ms)
+    snap = hist.snapshot()
+    assert snap['count'] == 100
+    assert snap['p50_ms'] == 0.25
+    assert snap['p95_ms'] == 10
+    assert snap['p99_ms'] == 10
+    assert snap['max_ms'] == 300
+    assert LatencyHistogram().snapshot()['p99_ms'] == 0.0
@@ -0,0 +1,50 @@
+import json
+import os
+from src.binance_announcements import parse_announcement_page, parse_announcement_payload, fetch_announcements
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'data')
+
+
+def load(name):
+    with open(os.path.join(DATA, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.text = body
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class FakeHttp:
+    def __init__(self, api_status=200):
+        self.api_status = api_status
+        self.urls = []
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        if 'bapi' in url:
+            return FakeResponse(self.api_status, load('binance_announcements_sample.json'))
+        return FakeResponse(200, load('binance_announcement_page_sample.html'))
+
+
+def test_api_payload_parses_newest_first_without_duplicates():
+    items = parse_announcement_payload(json.loads(load('binance_announcements_sample.json')), limit=10)
+    assert [i['title'][:8] for i in items] == ['币安将上线 Ex', '关于币安将下架 ', '币安合约将上线 ']
+    assert items[0]['link'] == 'https://www.binance.com/zh-CN/support/announcement/8f6a1b2c3d4e4f5a9b8c7d6e5f4a3b2c'
+    assert items[0]['source'] == 'Binance公告' and '数字货币及交易对上新' in items[0]['summary']
+    assert items[0]['published'].startswith('2025-10-')
+    assert len(parse_announcement_payload(json.loads(load('binance_announcements_sample.json')), limit=1)) == 1
+
+
+def test_embedded_app_data_is_the_second_choice():
+    assert [i['link'][-6:] for i in parse_announcement_page(load('binance_announcement_page_sample.html'))] == ['4a3b2c', 'a4b5c6']
+    assert parse_announcement_page('<html></html>') == []
+    http = FakeHttp(api_status=403)
+    assert len(fetch_announcements(http, limit=20)) == 2
+    assert len(http.urls) == 2
+    http = FakeHttp()
+    assert len(fetch_announcements(http, limit=20)) == 3 and len(http.urls) == 1
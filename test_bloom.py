@@ -0,0 +1,14 @@
+from src.bloom import BloomFilter
+
+
+def test_no_false_negatives_and_fp_rate_near_target():
+    bloom = BloomFilter(10000, error_rate=0.01)
+    for i in range(10000):
+        bloom.add(f"https://example.com/news/{i}")
+    assert all(f"https://example.com/news/{i}" in bloom for i in range(10000))
+    false_positives = sum(f"https://example.com/other/{i}" in bloom for i in range(20000))
+    assert false_positives / 20000 < 0.02
+    assert 0.005 < bloom.estimated_fp_rate() < 0.02
+    # ~9.6 bits per item at 1%
+    assert 11000 < bloom.memory_bytes < 13000
+    assert len(bloom) <= 10000
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import src.browser_pool as browser_pool
+from src.browser_pool import BrowserPool
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.cookies = []
+
+    async def new_page(self):
+        return FakePage(self)
+
+    async def add_cookies(self, cookies):
+        self.cookies.extend(cookies)
+
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    def __init__(self, n):
+        self.n = n
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self):
+        return FakeContext(self)
+
+    async def close(self):
+        self.connected = False
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.browsers = []
+        self.chromium = self
+
+    async def launch(self, **kwargs):
+        self.browsers.append(FakeBrowser(len(self.browsers)))
+        return self.browsers[-1]
+
+    async def stop(self):
+        pass
+
+
+def install_fake(monkeypatch):
+    fake = FakePlaywright()
+
+    class Starter:
+        async def start(self):
+            return fake
+
+    monkeypatch.setattr(browser_pool, 'async_playwright', lambda: Starter())
+    monkeypatch.setattr(browser_pool, 'PLAYWRIGHT_AVAILABLE', True)
+    return fake
+
+
+def test_pages_reuse_one_browser_and_per_key_contexts(monkeypatch):
+    fake = install_fake(monkeypatch)
+    pool = BrowserPool(max_pages=2, max_uses=100, max_rss_mb=10 ** 6)
+    setups = []
+
+    async def setup(ctx):
+        setups.append(ctx)
+        await ctx.add_cookies([{'name': 'a'}])
+
+    async def job(page):
+        return page.context
+
+    try:
+        public = {pool.run(job, key='public') for _ in range(5)}
+        private = pool.run(job, key='missions', setup=setup)
+        assert pool.run(job, key='missions', setup=setup) is private
+        assert len(public) == 1 and private not in public
+        assert private.cookies == [{'name': 'a'}] and len(setups) == 1
+        assert pool.launches == 1 and len(fake.browsers) == 1
+    finally:
+        pool.close()
+
+
+def test_concurrency_is_capped_at_max_pages(monkeypatch):
+    install_fake(monkeypatch)
+    pool = BrowserPool(max_pages=2, max_uses=100, max_rss_mb=10 ** 6)
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    async def job(page):
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        await asyncio.sleep(0.05)
+        with lock:
+            active.pop()
+        return True
+
+    try:
+        with ThreadPoolExecutor(max_workers=6) as ex:
+            assert all(ex.map(lambda _: pool.run(job), range(6)))
+        assert max(peak) == 2
+    finally:
+        pool.close()
+
+
+def test_recycles_after_max_uses_and_relaunches_dead_browser(monkeypatch):
+    fake = install_fake(monkeypatch)
+    pool = BrowserPool(max_pages=1, max_uses=3, max_rss_mb=10 ** 6)
+
+    async def job(page):
+        return page.context.browser.n
+
+    try:
+        assert [pool.run(job) for _ in range(4)] == [0, 0, 0, 1]
+        fake.browsers[-1].connected = False
+        assert pool.run(job) == 2
+        assert pool.launches == 3
+    finally:
+        pool.close()
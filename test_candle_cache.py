@@ -0,0 +1,102 @@
+import time
+from src.candle_cache import CandleCache
+from src.market_data import MarketDataEngine
+
+BAR_MS = 15 * 60 * 1000
+
+
+class FakeExchange:
+    def __init__(self, bars):
+        now_bar = int(time.time() * 1000) // BAR_MS * BAR_MS
+        self.rows = [[now_bar - (bars - 1 - i) * BAR_MS, 1.0, 1.0, 1.0, 1.0 + i, 10.0 + i] for i in range(bars)]
+        self.calls = []
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.calls.append(since)
+        rows = [r for r in self.rows if since is None or r[0] >= since]
+        return [list(r) for r in rows[-limit:]] if since is None else [list(r) for r in rows[:limit]]
+
+
+def make_engine(cache):
+    engine = MarketDataEngine(candles=cache)
+    engine.exchange = FakeExchange(300)
+    return engine
+
+
+def test_serves_smaller_limits_from_memory():
+    engine = make_engine(CandleCache(capacity=200, min_refresh=60))
+    df = engine.fetch_ohlcv('BTC/USDT', limit=100)
+    assert len(df) == 100
+    df20 = engine.fetch_ohlcv('BTC/USDT', limit=20)
+    assert len(df20) == 20
+    assert df20['close'].iloc[-1] == df['close'].iloc[-1]
+    assert engine.exchange.calls == [None]
+
+
+def test_delta_fetch_replaces_open_bar_and_appends_new_ones():
+    cache = CandleCache(capacity=200, min_refresh=0)
+    engine = make_engine(cache)
+    engine.fetch_ohlcv('BTC/USDT', limit=100)
+    last_ts = engine.exchange.rows[-1][0]
+    engine.exchange.rows[-1][5] = 999.0
+    engine.exchange.rows.append([last_ts + BAR_MS, 2.0, 2.0, 2.0, 2.0, 5.0])
+    df = engine.fetch_ohlcv('BTC/USDT', limit=100)
+    assert engine.exchange.calls == [None, last_ts]
+    assert list(df['volume'].iloc[-2:]) == [999.0, 5.0]
+    assert df['timestamp'].is_monotonic_increasing
+    assert len(df) == 100
+
+
+def test_lru_eviction():
+    cache = CandleCache(capacity=50, max_entries=2, min_refresh=60)
+    engine = make_engine(cache)
+    for sym in ('A/USDT', 'B/USDT', 'C/USDT'):
+        engine.fetch_ohlcv(sym, limit=20)
+    assert cache.stats()['entries'] == 2
+    engine.fetch_ohlcv('A/USDT', limit=20)
+    assert engine.exchange.calls == [None, None, None, None]
+
+
+def test_ring_buffer_views_are_contiguous_and_zero_copy():
+    import numpy as np
+    from src.candle_store import CandleBuffer
+    buf = CandleBuffer(8)
+    buf.extend([[i * BAR_MS, 1, 1, 1, float(i), float(i)] for i in range(13)])
+    view = buf.view(6)
+    assert list(view.close) == [7.0, 8.0, 9.0, 10.0, 11.0, 12.0]
+    assert np.shares_memory(view.close, buf._ohlcv)
+    assert not view.close.flags.writeable
+    buf.extend([[12 * BAR_MS, 1, 1, 1, 99.0, 99.0], [13 * BAR_MS, 1, 1, 1, 13.0, 13.0]])
+    assert list(buf.view(3).close) == [11.0, 99.0, 13.0]
+    assert len(buf) == 8
+    assert buf.nbytes == 2 * 8 * 6 * 8
+
+
+def test_cached_views_are_snapshots_of_the_ring():
+    cache = CandleCache(capacity=50, min_refresh=60)
+    engine = make_engine(cache)
+    first = engine.fetch_candles('BTC/USDT', limit=50)
+    cached = engine.fetch_candles('BTC/USDT', limit=50)
+    before = list(cached.close)
+    # a streamed bar at capacity overwrites the oldest slot of the ring
+    last = engine.exchange.rows[-1]
+    assert cache.apply_live_bar('BTC/USDT', '15m', [last[0] + BAR_MS, 1.0, 1.0, 1.0, 999.0, 1.0], ttl=60)
+    assert list(cached.close) == before and list(first.close) == before
+    assert engine.fetch_candles('BTC/USDT', limit=50).close[-1] == 999.0
+
+
+def test_signal_math_matches_pandas():
+    import numpy as np
+    from src.engines import SignalEngine
+    from src.candle_store import CandleView
+    rng = np.random.default_rng(7)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.03, 100))
+    rows = [[i * BAR_MS, c, c, c, c, v] for i, (c, v) in enumerate(zip(close, rng.uniform(1, 50, 100)))]
+    view = CandleView.from_rows(rows)
+    df = view.to_frame()
+    expected = df['close'].pct_change().std()
+    engine = SignalEngine.__new__(SignalEngine)
+    level = engine._calculate_risk(view.close)
+    assert level == ('High' if expected > 0.05 else 'Medium' if expected > 0.02 else 'Low')
+    assert np.isclose(df['volume'].rolling(window=20).mean().iloc[-1], view.volume[-20:].mean())
+
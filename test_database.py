@@ -0,0 +1,183 @@
+import sqlite3
+import threading
+import pytest
+from src.config import Config
+from src import database
+from src.database import Database
+
+
+def test_connections_are_per_thread_wal_and_survive_close(db):
+    conn = db.get_connection()
+    conn.close()
+    assert db.get_connection() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == Config.DB_BUSY_TIMEOUT_MS
+
+    other = []
+    t = threading.Thread(target=lambda: other.append(db.get_connection()))
+    t.start()
+    t.join()
+    assert other[0] is not conn
+    assert db.connections.opened == 2
+
+
+def test_close_discards_uncommitted_writes_and_transaction_rolls_back(db):
+    conn = db.get_connection()
+    conn.execute("INSERT INTO users (user_id) VALUES (1)")
+    conn.close()
+    assert db.get_user(1) is None
+
+    with pytest.raises(RuntimeError):
+        with db.transaction() as conn:
+            conn.execute("INSERT INTO users (user_id) VALUES (2)")
+            with db.transaction() as inner:
+                inner.execute("INSERT INTO users (user_id) VALUES (3)")
+            raise RuntimeError("boom")
+    assert db.get_all_users() == []
+
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO users (user_id) VALUES (4)")
+    assert db.get_all_users() == [4]
+
+
+def test_concurrent_writers_share_the_file_without_lock_errors(db):
+    claimed = []
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(50):
+                if db.claim_news_if_new(f"https://example.com/{i}", f"w{n}"):
+                    claimed.append(i)
+                db.add_square_post(f"post {n} {i % 10}")
+        except Exception as e:
+            errors.append(e)
+
+    # the Square worker still opens its own connections to the same file
+    def square_worker():
+        for i in range(50):
+            conn = sqlite3.connect(Config.DB_PATH, timeout=5)
+            conn.execute("UPDATE square_queue SET attempts = attempts + 1 WHERE id = ?", (i,))
+            conn.commit()
+            conn.close()
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)] + [threading.Thread(target=square_worker)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert sorted(claimed) == list(range(50))
+    assert len(db.get_pending_square_posts(limit=100)) == 40
+
+
+def test_onchain_position_accounting(db):
+    db.record_onchain_buy('0xabc', 1000, 18, 100.0, tx_hash='t1')
+    db.record_onchain_buy('0xabc', 1000, 18, 300.0, tx_hash='t2')
+    pnl = db.record_onchain_sell('0xabc', 1000, 250.0)
+    assert pnl == pytest.approx(50.0)
+    assert db.record_onchain_sell('0xmissing', 1, 1.0) == 0.0
+
+
+def test_claim_news_batch_returns_only_new_links_in_one_transaction(db):
+    assert db.claim_news_if_new('https://example.com/old', 'BlockBeats')
+    statements = []
+    db.get_connection().set_trace_callback(statements.append)
+    links = [(f'https://example.com/{i}', 'PANews') for i in range(50)] + [('https://example.com/old', 'PANews'), ('https://example.com/3', 'PANews')]
+    claimed = db.claim_news_batch(links)
+    db.get_connection().set_trace_callback(None)
+    assert claimed == [f'https://example.com/{i}' for i in range(50)]
+    assert sum(1 for s in statements if s.startswith('COMMIT')) == 1
+    assert db.claim_news_batch(links) == []
+    assert db.claim_news_batch([]) == []
+
+
+def test_enqueue_posts_skips_duplicates_and_virtual_posts(db):
+    existing = db.add_square_post('already queued')
+    texts = ['a', 'already queued', 'b', 'a', 'BTC/USDT:USDT social heat score 99', 'c']
+    ids = db.enqueue_posts(texts, approved=True)
+    assert ids[1] is None and ids[3] is None and ids[4] is None
+    assert all(isinstance(ids[i], int) for i in (0, 2, 5))
+    conn = db.get_connection()
+    rows = conn.execute("SELECT id, text, bot_approved FROM square_queue ORDER BY id").fetchall()
+    conn.close()
+    assert rows == [(existing, 'already queued', 0), (ids[0], 'a', 1), (ids[2], 'b', 1), (ids[5], 'c', 1)]
+    assert db.enqueue_posts(['a', 'd'], approved=False)[0] is None
+
+
+def test_filter_skips_lookups_for_new_links_and_survives_restart(db):
+    assert db.claim_news_if_new('poly:1', 'Polymarket')
+    assert db.filter_stats['definitely_new'] == 1
+    # repeats are answered by a read, never by a write transaction
+    statements = []
+    db.get_connection().set_trace_callback(statements.append)
+    assert not db.claim_news_if_new('poly:1', 'Polymarket')
+    assert db.claim_news_batch(['poly:1']) == []
+    db.get_connection().set_trace_callback(None)
+    assert not any(s.startswith(('BEGIN', 'INSERT')) for s in statements)
+    assert not db.is_news_processed('never-seen')
+    assert db.is_news_processed('poly:1')
+
+    restarted = Database()
+    try:
+        assert 'poly:1' in restarted.processed_filter
+        assert not restarted.claim_news_if_new('poly:1', 'Polymarket')
+        stats = restarted.processed_filter_stats()
+        assert stats['entries'] == 1 and stats['memory_kb'] > 0 and stats['estimated_fp_rate'] < 1e-6
+    finally:
+        restarted.close()
+
+
+def test_links_claimed_during_a_rebuild_reach_the_new_filter(db, monkeypatch):
+    db.claim_news_if_new('https://before', 'BlockBeats')
+
+    class ClaimingBloom(database.BloomFilter):
+        claimed = False
+
+        def add(self, item):
+            # another thread claims a link while the rebuild is still reading processed_news
+            if not ClaimingBloom.claimed:
+                ClaimingBloom.claimed = True
+                t = threading.Thread(target=db.claim_news_if_new, args=('https://during', 'BlockBeats'))
+                t.start()
+                t.join()
+            super().add(item)
+
+    monkeypatch.setattr(database, 'BloomFilter', ClaimingBloom)
+    db.rebuild_processed_filter()
+    assert isinstance(db.processed_filter, ClaimingBloom)
+    assert 'https://during' in db.processed_filter
+    assert db.is_news_processed('https://during')
+
+
+def test_prune_removes_old_rows_in_batches_and_rebuilds_filter(db):
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO processed_news (link, source, created_at) VALUES (?, 'old', datetime('now', '-40 days'))",
+        [(f'old/{i}',) for i in range(25)]
+    )
+    conn.commit()
+    conn.close()
+    db.rebuild_processed_filter()
+    assert db.claim_news_if_new('recent', 'BlockBeats')
+    assert db.is_news_processed('old/3')
+
+    assert db.prune_processed_news(retention_days=30, batch_size=10) == 25
+    assert not db.is_news_processed('old/3')
+    assert db.is_news_processed('recent')
+    assert db.processed_filter_stats()['entries'] == 1
+    assert db.prune_processed_news(retention_days=30) == 0
+
+
+def test_prune_keeps_polymarket_alert_ids(db):
+    conn = db.get_connection()
+    conn.execute("INSERT INTO processed_news (link, source, created_at) VALUES ('poly_1_Yes_90', 'Polymarket', datetime('now', '-90 days'))")
+    conn.execute("INSERT INTO processed_news (link, source, created_at) VALUES ('https://old', 'BlockBeats', datetime('now', '-90 days'))")
+    conn.commit()
+    conn.close()
+    db.rebuild_processed_filter()
+    assert db.prune_processed_news(retention_days=30) == 1
+    # the market is still above 90%: no second alert
+    assert not db.claim_news_if_new('poly_1_Yes_90', 'Polymarket')
+    assert db.claim_news_if_new('https://old', 'BlockBeats')
@@ -0,0 +1,81 @@
+import asyncio
+import numpy as np
+from src.candle_cache import CandleCache
+from src.config import Config
+from src.engines import SignalEngine
+from src.market_data import AsyncMarketDataEngine, MarketDataEngine
+
+BAR_MS = 15 * 60 * 1000
+
+
+def make_series():
+    rng = np.random.default_rng(3)
+    series = {}
+    for k, sym in enumerate(['AAA/USDT', 'BBB/USDT', 'CCC/USDT', 'NEW/USDT']):
+        bars = 12 if sym == 'NEW/USDT' else 100
+        close = 10 * np.cumprod(1 + rng.normal(0, 0.01 * (k + 1), bars))
+        vol = rng.uniform(1, 10, bars)
+        vol[-1] *= 2 + k
+        series[sym] = [[i * BAR_MS, c, c, c, c, v] for i, (c, v) in enumerate(zip(close, vol))]
+    return series
+
+
+class News:
+    def scan_news(self, symbol):
+        return {'heat_score': 60 if symbol == 'CCC/USDT' else 10, 'sentiment': 'neutral', 'narrative': 'Quiet'}
+
+
+class Whale:
+    def scan_whale_activity(self, symbol):
+        return {'has_activity': False}
+
+
+def make_engine(series):
+    class Exchange:
+        def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+            return series[symbol][-limit:]
+
+    class AsyncExchange:
+        def __init__(self):
+            self.active = 0
+            self.peak = 0
+
+        async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            await asyncio.sleep(0.01)
+            self.active -= 1
+            return series[symbol][-limit:]
+
+    engine = SignalEngine.__new__(SignalEngine)
+    engine.market = MarketDataEngine(candles=CandleCache(capacity=200))
+    engine.market.exchange = Exchange()
+    engine.amarket = AsyncMarketDataEngine.__new__(AsyncMarketDataEngine)
+    engine.amarket.candles = CandleCache(capacity=200)
+    engine.amarket.exchange = AsyncExchange()
+    engine.news = News()
+    engine.whale = Whale()
+    return engine
+
+
+def test_batch_scan_matches_per_symbol_analysis():
+    series = make_series()
+    engine = make_engine(series)
+    batch = {s['symbol']: s for s in engine.scan_market(list(series))}
+    single = {s: engine.analyze_symbol(s) for s in series}
+    expected = [s for s, sig in single.items() if sig['heat_score'] > 50 or sig['volume_score'] > 150]
+    assert sorted(batch) == sorted(expected)
+    for sym, sig in batch.items():
+        assert sig['volume_score'] == single[sym]['volume_score']
+        assert sig['risk_level'] == single[sym]['risk_level']
+        assert sig['price'] == single[sym]['price']
+    assert single['NEW/USDT']['volume_score'] == 0
+
+
+def test_async_scan_bounds_requests_on_one_client(monkeypatch):
+    monkeypatch.setattr(Config, 'SCAN_CONCURRENCY', 2)
+    series = make_series()
+    engine = make_engine(series)
+    batch = asyncio.run(engine.scan_market_async(list(series)))
+    assert batch == engine.scan_market(list(series))
+    assert engine.amarket.exchange.peak == 2
@@ -0,0 +1,33 @@
+import random
+import re
+from src.event_matcher import EventMatcher
+from src.news_scanner import NewsScanner
+
+
+def naive_matched(rules, text):
+    return [i for i, r in enumerate(rules) if any(re.search(p, text, flags=re.IGNORECASE) for p in r['patterns'])]
+
+
+def test_matcher_agrees_with_per_pattern_search():
+    scanner = NewsScanner()
+    scanner.close()
+    rules = scanner.event_rules + [
+        {'kind': 'bullish', 'label': 'x', 'weight': 5, 'patterns': [r'[ab]+c', r'sup|new', r'(?:main|test)net']},
+        {'kind': 'bearish', 'label': 'y', 'weight': 5, 'patterns': [r'\bburn(?:ed)?\b', r'回购']},
+    ]
+    matcher = EventMatcher(rules)
+    words = ['Delisting', 'HACKED', 'trading  suspension', 'ETFs', 'etf', '下架', '解锁', 'ſupport', 'İntegration', 'Mainnet',
+             'burned', 'burner', 'abc', 'listing', 'lawsuit', 'ok', '上线', 'approval', 'TESTNET', 'token\tunlock', 'news']
+    rng = random.Random(3)
+    for _ in range(2000):
+        text = rng.choice(['', ' ', '-']).join(rng.choice(words) for _ in range(rng.randint(0, 6)))
+        assert matcher.matched_rules(text) == naive_matched(rules, text), text
+
+
+def test_reload_event_rules_recompiles():
+    scanner = NewsScanner()
+    scanner.close()
+    assert scanner._detect_event_signal("Binance listing for XYZ")['bullish_hits'] == 1
+    scanner.reload_event_rules([{'kind': 'bearish', 'label': '测试', 'weight': 10, 'patterns': [r'listing']}])
+    signal = scanner._detect_event_signal("Binance listing for XYZ")
+    assert signal == {'net_score': -10, 'bullish_hits': 0, 'bearish_hits': 1, 'alerts': ['利空:测试']}
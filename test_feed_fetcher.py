@@ -0,0 +1,75 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.feed_fetcher import FeedFetcher
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>t</title>
+<item><title>BTC listing</title><link>https://example.com/2</link></item>
+<item><title>ETH unlock</title><link>https://example.com/1</link></item>
+</channel></rss>"""
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    hits = {}
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        FeedHandler.hits[self.path] = FeedHandler.hits.get(self.path, 0) + 1
+        if self.path == '/slow':
+            time.sleep(1.5)
+        if self.path == '/dead':
+            self.send_response(503)
+            self.end_headers()
+            return
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(RSS)))
+        self.end_headers()
+        self.wfile.write(RSS)
+
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FeedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_conditional_get_reuses_parsed_entries_on_304():
+    server, base = start_server()
+    fetcher = FeedFetcher(timeout=5, max_workers=4)
+    try:
+        first = fetcher.fetch(f"{base}/feed")
+        second = fetcher.fetch(f"{base}/feed")
+        assert first.status == 200 and len(first.entries) == 2
+        assert second.status == 304 and second.not_modified
+        assert [e.link for e in second.entries] == [e.link for e in first.entries]
+        assert fetcher.not_modified == 1
+    finally:
+        fetcher.close()
+        server.shutdown()
+
+
+def test_fetch_many_runs_feeds_concurrently_and_isolates_dead_sources():
+    server, base = start_server()
+    fetcher = FeedFetcher(timeout=5, max_workers=8)
+    try:
+        urls = [f"{base}/slow", f"{base}/slow?b", f"{base}/slow?c", f"{base}/dead"]
+        start = time.perf_counter()
+        results = fetcher.fetch_many(urls, extra={'page': lambda: ['a']})
+        elapsed = time.perf_counter() - start
+        # three 1.5 s feeds in parallel, not back to back
+        assert elapsed < 3.0
+        assert all(results[u].ok for u in urls[:3])
+        assert results[f"{base}/dead"].status == 503 and not results[f"{base}/dead"].ok
+        assert results['page'] == ['a']
+    finally:
+        fetcher.close()
+        server.shutdown()
@@ -0,0 +1,30 @@
+import threading
+import time
+from src.funding import FundingSnapshot
+
+
+def test_concurrent_refreshes_fetch_once():
+    calls = []
+
+    def fetch_all():
+        calls.append(1)
+        time.sleep(0.05)
+        return {'BTCUSDT': 0.0001}
+
+    snap = FundingSnapshot(fetch_all, ttl=60)
+    threads = [threading.Thread(target=snap.refresh) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert snap.rate('BTC/USDT', refresh=False) == 0.0001
+
+
+def test_live_stream_rates_override_snapshot():
+    live = {'BTCUSDT': 0.0003, 'ETHUSDT': None}
+    snap = FundingSnapshot(lambda: {'BTCUSDT': 0.0001, 'ETHUSDT': 0.0002}, ttl=60, live=lambda: dict(live))
+    rates = snap.rates()
+    assert rates == {'BTCUSDT': 0.0003, 'ETHUSDT': 0.0002}
+    # the history only records bulk snapshots
+    assert [r for _, r in snap.history('BTCUSDT')] == [0.0001]
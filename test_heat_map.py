@@ -0,0 +1,68 @@
+import random
+from src.heat_map import HeatMap
+
+HOUR = 3600.0
+
+
+def test_decay_is_exponential_and_lazy():
+    heat = HeatMap(half_life_hours=2, ttl=48 * HOUR)
+    heat.add('BTC', 80, now=1000.0)
+    assert heat.score('BTC', now=1000.0) == 80
+    assert abs(heat.score('BTC', now=1000.0 + 2 * HOUR) - 40) < 1e-9
+    heat.add('BTC', 10, bullish=1, alerts=('利好:交易所上币',), now=1000.0 + 2 * HOUR)
+    entry = heat.get('BTC', now=1000.0 + 4 * HOUR)
+    assert abs(entry['score'] - 25) < 1e-9
+    assert entry['mentions'] == 2 and entry['bullish_events'] == 1
+
+
+def test_alerts_are_deduplicated_newest_first_and_bounded():
+    heat = HeatMap(max_alerts=3)
+    heat.add('ETH', 5, alerts=('a', 'b'), now=10.0)
+    heat.add('ETH', 5, alerts=('c', 'a'), now=11.0)
+    heat.add('ETH', 5, alerts=('d',), now=12.0)
+    assert heat.get('ETH', now=12.0)['alerts'] == ['d', 'c', 'a']
+
+
+def test_top_k_matches_sorting_current_scores():
+    rng = random.Random(5)
+    heat = HeatMap(half_life_hours=1, ttl=1e9)
+    now = 1_700_000_000.0
+    for _ in range(3000):
+        now += rng.uniform(0, 120)
+        heat.add(f"S{rng.randint(0, 200)}", rng.uniform(1, 30), now=now)
+    expected = sorted(((s, heat.score(s, now=now)) for s in [f"S{i}" for i in range(201)] if s in heat), key=lambda x: -x[1])[:10]
+    got = heat.top(10, now=now)
+    assert [s for s, _ in got] == [s for s, _ in expected]
+    assert len(heat._heap) <= 2 * len(heat) + 65
+
+
+def test_cold_symbols_are_evicted():
+    heat = HeatMap(half_life_hours=1, ttl=10 * HOUR)
+    heat.add('OLD', 50, now=0.0)
+    heat.put('NONEWS', 0, last_updated=0.0)
+    # add() sweeps cold entries as it goes
+    heat.add('NEW', 50, now=9 * HOUR)
+    assert 'OLD' not in heat and 'NONEWS' in heat
+    assert heat.evict(now=11 * HOUR) == 1
+    assert 'NONEWS' not in heat and 'NEW' in heat
+
+
+def test_news_state_round_trips_through_database(tmp_path, monkeypatch):
+    from src.config import Config
+    from src.database import Database
+    from src.news_scanner import NewsScanner
+    monkeypatch.setattr(Config, 'DB_PATH', str(tmp_path / 'state.db'))
+    db = Database()
+    scanner = NewsScanner()
+    scanner.close()
+    scanner.symbol_heat.add('SOL', 40, bearish=1, alerts=('利空:安全事件',))
+    scanner.last_published['BlockBeats'] = 'https://example.com/a'
+    assert db.save_news_state(*scanner.export_state())
+
+    restarted = NewsScanner()
+    restarted.close()
+    restarted.restore_state(*db.load_news_state())
+    entry = restarted.symbol_heat.get('SOL')
+    assert abs(entry['score'] - 40) < 0.01
+    assert entry['bearish_events'] == 1 and entry['alerts'] == ['利空:安全事件']
+    assert restarted.last_published == {'BlockBeats': 'https://example.com/a'}
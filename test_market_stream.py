@@ -0,0 +1,91 @@
+import json
+import os
+import time
+from src.candle_cache import CandleCache
+from src.market_data import MarketDataEngine
+from src.market_stream import MarketStream, ReplayServer
+
+SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'data', 'stream_replay_sample.jsonl')
+BAR_MS = 15 * 60 * 1000
+
+
+class OfflineExchange:
+    def __init__(self, rows):
+        self.rows = rows
+        self.ticker_calls = 0
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        return [list(r) for r in self.rows[-limit:]]
+
+    def fetch_ticker(self, symbol):
+        self.ticker_calls += 1
+        raise RuntimeError("REST should not be used while the stream is live")
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_replayed_ticker_and_mark_price_feed_engine_getters():
+    server = ReplayServer(SAMPLE, interval=0.01, repeat=True)
+    url = server.start()
+    stream = MarketStream(['BTC/USDT', 'ETH/USDT'], spot_url=url, futures_url=url, record_path='')
+    engine = MarketDataEngine()
+    engine.exchange = OfflineExchange([])
+    engine.stream = stream
+    stream.start()
+    try:
+        assert wait_for(lambda: stream.get_ticker('ETH/USDT') and stream.get_funding_rate('BTCUSDT') is not None)
+        ticker = engine.get_ticker('BTC/USDT')
+        assert ticker['symbol'] == 'BTC/USDT'
+        assert 1.9 < ticker['percentage'] < 2.2
+        assert engine.fetch_current_funding_rate('BTCUSDT') == 0.0001
+        assert engine.exchange.ticker_calls == 0
+    finally:
+        stream.stop()
+        server.stop()
+
+
+def test_streamed_kline_updates_cached_candles_without_rest():
+    now_bar = int(time.time() * 1000) // BAR_MS * BAR_MS
+    rows = [[now_bar - (50 - i) * BAR_MS, 1.0, 1.0, 1.0, 1.0, 1.0] for i in range(50)]
+    frames = []
+    for step, vol in enumerate((5.0, 7.5)):
+        frames.append({"stream": "btcusdt@kline_15m", "data": {"e": "kline", "E": now_bar + step, "s": "BTCUSDT", "k": {
+            "t": now_bar, "i": "15m", "o": "1.0", "h": "2.0", "l": "1.0", "c": "2.0", "v": str(vol), "x": False}}})
+    server = ReplayServer(frames, interval=0.01, repeat=True)
+    url = server.start()
+    cache = CandleCache(capacity=100, min_refresh=0)
+    stream = MarketStream(['BTC/USDT'], candles=cache, spot_url=url, futures_url=url, record_path='')
+    engine = MarketDataEngine(candles=cache)
+    engine.exchange = OfflineExchange(rows)
+    stream.start()
+    try:
+        assert wait_for(lambda: stream.frames > 0)
+        engine.fetch_candles('BTC/USDT', limit=50)
+        assert wait_for(lambda: cache.plan('BTC/USDT', '15m', 20)[0] is not None)
+        candles = engine.fetch_candles('BTC/USDT', limit=20)
+        assert candles.timestamp[-1] == now_bar
+        assert candles.close[-1] == 2.0
+        assert candles.volume[-1] in (5.0, 7.5)
+    finally:
+        stream.stop()
+        server.stop()
+
+
+def test_record_path_captures_frames_for_replay(tmp_path):
+    path = tmp_path / "frames.jsonl"
+    stream = MarketStream(['BTC/USDT'], record_path=str(path))
+    stream._record_file = open(path, 'a', encoding='utf-8')
+    with open(SAMPLE, encoding='utf-8') as f:
+        for line in f:
+            stream.handle_frame(line)
+    stream._record_file.close()
+    recorded = [json.loads(l) for l in path.read_text().splitlines()]
+    assert len(recorded) == 24
+    assert recorded[0]['stream'] == 'btcusdt@kline_15m'
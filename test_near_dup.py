@@ -0,0 +1,53 @@
+from src.near_dup import NearDuplicateIndex, normalise_text, number_tokens
+
+
+def article(title, summary, source, link):
+    return {'title': title, 'summary': summary, 'source': source, 'link': link}
+
+
+def syndicated_round():
+    return [
+        article("BlockBeats：币安将上线 XYZ 并开通现货交易", "据官方公告，币安将于今日18:00上线XYZ，开放XYZ/USDT交易对。", 'BlockBeats', 'https://bb/1'),
+        article("以太坊现货ETF昨日净流入1.2亿美元", "根据SoSoValue数据，昨日以太坊现货ETF总净流入1.2亿美元。", 'BlockBeats', 'https://bb/2'),
+        article("币安将上线XYZ，并开通XYZ/USDT现货交易对", "PANews 6月1日消息，据官方公告，币安将于今日18:00上线XYZ，开放XYZ/USDT交易对。", 'PANews', 'https://pa/9'),
+        article("比特币现货ETF昨日净流出3亿美元", "根据SoSoValue数据，昨日比特币现货ETF总净流出3亿美元。", 'PANews', 'https://pa/10'),
+        article("Binance will list XYZ with spot trading", "Binance will open trading for XYZ/USDT at 18:00 UTC today.", 'Twitter', 'https://x/1'),
+        article("Binance Will List XYZ (XYZ) with Spot Trading", "<p>Binance will open trading for XYZ/USDT at 18:00 UTC today.</p> https://t.co/abc", 'Twitter', 'https://x/2'),
+    ]
+
+
+def test_collapses_syndicated_copies_and_keeps_sources():
+    idx = NearDuplicateIndex(window_seconds=3600, threshold=0.5)
+    out = idx.collapse(syndicated_round(), now=0)
+    assert [a['link'] for a in out] == ['https://bb/1', 'https://bb/2', 'https://pa/10', 'https://x/1']
+    assert out[0]['sources'] == ['BlockBeats', 'PANews']
+    assert out[0]['duplicate_links'] == ['https://pa/9']
+    assert out[3]['sources'] == ['Twitter'] and out[3]['duplicate_links'] == ['https://x/2']
+    assert idx.duplicates == 2 and len(idx) == 4
+
+
+def test_templated_flashes_with_different_figures_stay_apart():
+    assert number_tokens("净流入1.2亿美元", "") == {'1.2'}
+    idx = NearDuplicateIndex(window_seconds=3600)
+    first, new1 = idx.add(article("以太坊现货ETF昨日净流入1.2亿美元", "", 'A', 'a'), now=0)
+    second, new2 = idx.add(article("以太坊现货ETF昨日净流入3亿美元", "", 'B', 'b'), now=1)
+    assert new1 and new2 and first is not second
+
+
+def test_later_rounds_and_same_link_are_duplicates_until_window_expires():
+    idx = NearDuplicateIndex(window_seconds=100)
+    rows = syndicated_round()
+    idx.collapse(rows[:2], now=0)
+    assert idx.collapse([dict(rows[2])], now=50) == []
+    assert idx.collapse([article("completely different", "", 'Other', 'https://bb/2')], now=60) == []
+    fresh = idx.collapse([dict(rows[2])], now=500)
+    assert [a['link'] for a in fresh] == ['https://pa/9']
+    assert len(idx) == 1
+    assert sum(len(b) for b in idx._buckets) == 16
+
+
+def test_short_texts_only_match_by_link():
+    idx = NearDuplicateIndex(window_seconds=100)
+    assert normalise_text("<b>GM</b>", "https://t.co/x") == "gm"
+    out = idx.collapse([article("GM", "", 'Twitter', 'l1'), article("gm!", "", 'Twitter', 'l2'), article("GM", "", 'Twitter', 'l1')], now=0)
+    assert [a['link'] for a in out] == ['l1', 'l2']
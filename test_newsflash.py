@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+from src.feed_fetcher import FeedResult
+from src.newsflash import NEWSFLASH_FEEDS, PAGE_KEY, NewsflashIngestor, parse_panews_newsflash_page
+from src.whale_watcher import WhaleWatcher
+
+PAGE = """<html><body>
+<div><a href="/zh/newsflash/1">Lookonchain：某鲸鱼买入 $25M ETH</a> 链上数据</div>
+<div><a href="/zh/newsflash/2">大额转账：$12M USDT 转入交易所 outflow</a></div>
+<div><a href="/zh/newsflash/2">duplicate</a></div>
+</body></html>"""
+
+
+class CountingFetcher:
+    def __init__(self, results):
+        self.results = results
+        self.rounds = 0
+
+    def fetch_many(self, urls, extra=None):
+        self.rounds += 1
+        out = dict(self.results)
+        for name, fn in (extra or {}).items():
+            out.setdefault(name, fn())
+        return out
+
+
+def entry(title, link):
+    return SimpleNamespace(title=title, summary='', link=link, published='now')
+
+
+def round_results():
+    return {
+        NEWSFLASH_FEEDS['BlockBeats']: FeedResult(NEWSFLASH_FEEDS['BlockBeats'], 200, [entry('Arkham: whale dumps $30M SOL', 'b1')]),
+        NEWSFLASH_FEEDS['PANews']: FeedResult(NEWSFLASH_FEEDS['PANews'], 304, []),
+        PAGE_KEY: parse_panews_newsflash_page(PAGE),
+    }
+
+
+def test_page_parser_dedups_links():
+    links = [a['link'] for a in parse_panews_newsflash_page(PAGE)]
+    assert links == ['https://www.panewslab.com/zh/newsflash/1', 'https://www.panewslab.com/zh/newsflash/2']
+
+
+def test_whale_and_transfer_scans_share_one_published_round():
+    fetcher = CountingFetcher({})
+    ingestor = NewsflashIngestor(fetcher, interval=60)
+    ingestor.publish(round_results())
+    whale = WhaleWatcher(newsflash=ingestor)
+
+    sol = whale.scan_whale_activity('SOL/USDT')
+    eth = whale.scan_whale_activity('ETH/USDT')
+    transfers = whale.scan_large_transfers()
+    assert sol['has_activity'] and sol['net_flow'] == -30_000_000 and sol['top_source'] == 'BlockBeats'
+    assert eth['has_activity'] and eth['net_flow'] == 25_000_000
+    assert whale.scan_whale_activity('BTC')['has_activity'] is False
+    assert [(t['amount_usd'], t['direction']) for t in transfers] == [(25_000_000, 'inflow'), (12_000_000, 'outflow')]
+    assert fetcher.rounds == 0
+
+
+def test_stale_snapshot_refreshes_once_and_keeps_missing_sources():
+    fetcher = CountingFetcher(round_results())
+    ingestor = NewsflashIngestor(fetcher, interval=60)
+    first = ingestor.snapshot()
+    assert ingestor.snapshot() is first and fetcher.rounds == 1
+    # a round where a source failed keeps that source's previous items
+    second = ingestor.publish({PAGE_KEY: []})
+    assert second is not first and second.feeds['BlockBeats'] == first.feeds['BlockBeats'] and second.page == first.page
@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from src.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'signal'
+
+    async def main():
+        flights = SingleFlight(ttl=0)
+        results = await asyncio.gather(*(flights.do(('analyze', 'BTC/USDT'), work) for _ in range(5)))
+        return flights, results
+
+    flights, results = asyncio.run(main())
+    assert results == ['signal'] * 5
+    assert len(calls) == 1
+    assert flights.shared == 4
+
+
+def test_exception_reaches_every_waiter_and_is_not_cached():
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError('exchange down')
+
+    async def main():
+        flights = SingleFlight(ttl=60)
+        first = await asyncio.gather(*(flights.do('k', work) for _ in range(3)), return_exceptions=True)
+        second = await asyncio.gather(flights.do('k', work), return_exceptions=True)
+        return first + second
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(calls) == 2
+
+
+def test_cancelled_waiter_does_not_cancel_shared_work():
+    async def work():
+        await asyncio.sleep(0.05)
+        return 'done'
+
+    async def main():
+        flights = SingleFlight(ttl=0)
+        impatient = asyncio.ensure_future(flights.do('k', work))
+        patient = asyncio.ensure_future(flights.do('k', work))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await impatient
+        return await patient
+
+    assert asyncio.run(main()) == 'done'
+
+
+def test_result_is_reused_within_ttl():
+    calls = []
+
+    async def work():
+        calls.append(1)
+        return 'signal'
+
+    async def main():
+        flights = SingleFlight(ttl=60)
+        a = await flights.do('k', work)
+        b = await flights.do('k', work)
+        flights.forget('k')
+        c = await flights.do('k', work)
+        return a, b, c
+
+    assert asyncio.run(main()) == ('signal',) * 3
+    assert len(calls) == 2
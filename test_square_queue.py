@@ -0,0 +1,89 @@
+import sqlite3
+import threading
+from src.config import Config
+from src.square_queue import CLAIM_SQL, claim_posts, ensure_claim_schema
+
+
+def connect():
+    return sqlite3.connect(Config.DB_PATH, timeout=5)
+
+
+def test_claims_up_to_limit_oldest_first_and_only_once(db):
+    ids = db.enqueue_posts([f"post {i}" for i in range(6)], approved=True)
+    db.enqueue_posts(["not approved"], approved=False)
+    conn = connect()
+    try:
+        first = claim_posts(conn, limit=4, lease_seconds=60)
+        assert [r[0] for r in first] == ids[:4]
+        assert [r[1] for r in first] == ["post 0", "post 1", "post 2", "post 3"]
+        second = claim_posts(conn, limit=4, lease_seconds=60)
+        assert [r[0] for r in second] == ids[4:]
+        assert claim_posts(conn, limit=4) == []
+        leases = conn.execute("SELECT COUNT(*) FROM square_queue WHERE status = 'processing' AND lease_until > CURRENT_TIMESTAMP").fetchone()[0]
+        assert leases == 6
+    finally:
+        conn.close()
+
+
+def test_concurrent_workers_never_claim_the_same_post(db):
+    db.enqueue_posts([f"post {i}" for i in range(60)], approved=True)
+    claimed = []
+    lock = threading.Lock()
+
+    def worker():
+        conn = connect()
+        try:
+            while True:
+                rows = claim_posts(conn, limit=3)
+                if not rows:
+                    return
+                with lock:
+                    claimed.extend(r[0] for r in rows)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(claimed) == 60 and len(set(claimed)) == 60
+
+
+def test_expired_leases_are_reclaimed_then_failed_after_max_attempts(db):
+    db.enqueue_posts(["crashy"], approved=True)
+    conn = connect()
+    try:
+        for attempt in range(3):
+            rows = claim_posts(conn, limit=1, lease_seconds=60, max_attempts=3)
+            assert [r[2] for r in rows] == [attempt]
+            # lease not yet expired: nobody else can take it
+            assert claim_posts(conn, limit=1, max_attempts=3) == []
+            # simulate the worker dying and the lease running out
+            conn.execute("UPDATE square_queue SET lease_until = datetime('now', '-1 seconds')")
+            conn.commit()
+        assert claim_posts(conn, limit=1, max_attempts=3) == []
+        assert conn.execute("SELECT status, attempts, lease_until FROM square_queue").fetchone() == ('failed', 3, None)
+    finally:
+        conn.close()
+
+
+def test_claim_uses_composite_index_and_old_tables_are_migrated(db, tmp_path):
+    conn = connect()
+    try:
+        inner = CLAIM_SQL[CLAIM_SQL.index('SELECT'):CLAIM_SQL.rindex(')')]
+        plan = " ".join(str(r[-1]) for r in conn.execute("EXPLAIN QUERY PLAN " + inner, (1,)))
+        assert 'idx_square_queue_claim' in plan
+    finally:
+        conn.close()
+
+    old = sqlite3.connect(str(tmp_path / 'old.db'))
+    try:
+        old.execute("CREATE TABLE square_queue (id INTEGER PRIMARY KEY, text TEXT, status TEXT, created_at TIMESTAMP, attempts INTEGER DEFAULT 0, next_try_at TIMESTAMP, bot_approved INTEGER DEFAULT 0)")
+        # a row left in 'processing' by the old two-step claim has no lease and is picked up again
+        old.execute("INSERT INTO square_queue (text, status, created_at, bot_approved) VALUES ('stuck', 'processing', CURRENT_TIMESTAMP, 1)")
+        ensure_claim_schema(old.cursor())
+        old.commit()
+        assert [r[1] for r in claim_posts(old, limit=5)] == ['stuck']
+    finally:
+        old.close()
@@ -0,0 +1,68 @@
+from src.symbol_index import SymbolIndex
+
+
+class FakeMarket:
+    def __init__(self):
+        self.loads = 0
+        self.spot = ['ADA/USDT', 'BTC/USDT', 'ETH/USDT', 'NEAR/USDT', 'PEPE/USDT', 'WIF/USDT', 'ZRO/USDT']
+        self.futures = ['1000PEPEUSDT', 'BTCUSDT', 'TRUMPUSDT']
+
+    def list_usdt_pairs(self, limit=100, reload=False):
+        self.loads += 1
+        return self.spot[:limit]
+
+    def list_futures_usdt_pairs(self, limit=1000):
+        return self.futures[:limit]
+
+
+def make_index(ttl=3600):
+    return SymbolIndex(FakeMarket(), ttl=ttl, aliases={'BTC': 'BTC', 'Bitcoin': 'BTC', '以太坊': 'ETH', 'Dogecoin': 'DOGE'})
+
+
+def test_extracts_full_universe_cashtags_cjk_and_aliases():
+    index = make_index()
+    # tickers past "C" and futures-only listings are attributed, not just the first 100 alphabetical pairs
+    assert index.extract("ZRO and WIF rally, TRUMP perps open") == ['TRUMP', 'WIF', 'ZRO']
+    assert index.extract("币安上线ZRO永续合约") == ['ZRO']
+    assert index.extract("$wif to the moon, $NEWCOIN airdrop") == ['NEWCOIN', 'WIF']
+    assert index.extract("bitcoin ETF inflows; 以太坊升级") == ['BTC', 'ETH']
+    # aliases only count for listed tickers, lower-case words and stop symbols are not tickers
+    assert index.extract("Dogecoin, near the ADAPTER, not NEAR") == []
+    assert index.extract("1000PEPE funding flips") == ['PEPE']
+
+
+def test_universe_refreshes_after_ttl():
+    index = make_index(ttl=0)
+    index.extract("BTC")
+    index.market.spot.append('NEWT/USDT')
+    assert index.extract("NEWT listing") == ['NEWT']
+    assert index.market.loads == 2
+
+
+class FakeExchange:
+    def __init__(self):
+        self.markets = None
+        self.reloads = 0
+        self.listed = ['BTC/USDT', 'ETH/USDT']
+
+    def load_markets(self, reload=False):
+        # mimics ccxt: the first load is cached and only reload=True fetches again
+        if self.markets is None or reload:
+            self.reloads += 1
+            self.markets = {s: {'quote': 'USDT', 'spot': True, 'active': True} for s in self.listed}
+        return self.markets
+
+
+def test_refresh_reloads_exchange_markets(monkeypatch):
+    from src.market_data import MarketDataEngine
+    market = MarketDataEngine()
+    try:
+        market.exchange = FakeExchange()
+        monkeypatch.setattr(market, 'list_futures_usdt_pairs', lambda limit=1000: [])
+        index = SymbolIndex(market, ttl=0, aliases={})
+        assert index.extract("BTC and NEWT") == ['BTC']
+        market.exchange.listed.append('NEWT/USDT')
+        assert index.extract("BTC and NEWT") == ['BTC', 'NEWT']
+        assert market.exchange.reloads == 2
+    finally:
+        market.close()